@@ -14,9 +14,9 @@ provider = os.getenv("LLM_PROVIDER", "local").lower()
 logger.info(f"Loading Graph for provider: {provider}")
 
 if provider == "gemini":
-    from gemini_bot_graph import app_graph
-elif provider == "local":
-    from local_bot_graph import app_graph
+    from gemini_bot_graph import app_graph, history
+elif provider in ("local", "local_batched", "local_cpu"):
+    from local_bot_graph import app_graph, history
 else:
     logger.warning(f"Unknown provider '{provider}', falling back to Local Graph")
-    from local_bot_graph import app_graph
+    from local_bot_graph import app_graph, history
@@ -0,0 +1,224 @@
+# ai_server/checkpointer.py
+"""
+대화 기억 저장소 (LangGraph checkpointer)
+
+MemorySaver는 모든 대화 상태를 프로세스 메모리의 dict에 무기한 보관하므로
+재시작하면 사라지고, 세션을 삭제해도 남아 있으며, 트래픽이 쌓일수록 메모리가 계속 늘어납니다.
+
+BoundedCheckpointer는 대화 상태를 SQLite 파일(AsyncSqliteSaver)에 저장하고 크기를 제한합니다.
+- 대화(thread)별 마지막 사용 시각을 thread_activity 테이블에 기록
+- 주기적으로(CHECKPOINT_SWEEP_INTERVAL) CHECKPOINT_TTL 동안 사용하지 않은 대화와
+  CHECKPOINT_MAX_THREADS를 넘는 가장 오래된 대화(LRU)를 삭제
+- 같은 주기에 최근 사용한 대화의 이전 체크포인트를 지워 대화마다 최신 상태 하나만 남김
+  (GraphState의 messages에 전체 대화가 누적되므로 이전 체크포인트는 필요 없음)
+- Django에서 세션을 삭제하면 DELETE /sessions/{session_id}로 해당 대화를 바로 삭제
+
+그래프는 모듈을 불러올 때 컴파일되지만 AsyncSqliteSaver는 실행 중인 이벤트 루프가 필요하므로,
+open() 전에는 MemorySaver를 사용하고 FastAPI 시작 시 open()으로 SQLite 저장소로 전환합니다.
+(그래프 모듈을 단독 실행하거나 평가 스크립트에서 쓸 때는 지금처럼 메모리에만 저장)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Iterator, Sequence
+
+from dotenv import load_dotenv
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+load_dotenv()
+
+logger = logging.getLogger("Checkpointer")
+
+CHECKPOINT_DB_PATH = os.getenv(
+    "CHECKPOINT_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints.sqlite")
+)
+# 이 시간(초) 동안 사용하지 않은 대화는 삭제 (기본 30일)
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", str(30 * 24 * 3600)))
+# 보관할 최대 대화 수 (넘으면 가장 오래 사용하지 않은 대화부터 삭제)
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "50000"))
+CHECKPOINT_SWEEP_INTERVAL = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL", "300"))
+
+
+class BoundedCheckpointer(BaseCheckpointSaver):
+    def __init__(self, path: str = CHECKPOINT_DB_PATH, ttl: float = CHECKPOINT_TTL,
+                 max_threads: int = CHECKPOINT_MAX_THREADS):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.max_threads = max_threads
+        self.saver = MemorySaver()
+        self._conn = None
+        # 마지막 정리 이후 체크포인트가 추가된 대화 (이전 체크포인트 정리 대상)
+        self._dirty = set()
+
+    @property
+    def persistent(self) -> bool:
+        return self._conn is not None
+
+    async def open(self):
+        """SQLite 저장소로 전환합니다. (FastAPI 시작 시 한 번 호출)"""
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = await aiosqlite.connect(self.path)
+        saver = AsyncSqliteSaver(self._conn)
+        await saver.setup()
+        async with saver.lock:
+            await self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS thread_activity (
+                    thread_id TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS thread_activity_last_access ON thread_activity (last_access);
+                """
+            )
+            await self._conn.commit()
+        self.saver = saver
+        logger.info(f"대화 기억 저장소: {self.path} (TTL {self.ttl:.0f}s, 최대 {self.max_threads}개 대화)")
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+            self.saver = MemorySaver()
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver 위임
+    # ------------------------------------------------------------------
+    def get_tuple(self, config):
+        return self.saver.get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None) -> Iterator:
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes: Sequence, task_id: str, task_path: str = ""):
+        return self.saver.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str):
+        return self.saver.delete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+    def get_delta_channel_history(self, *args, **kwargs):
+        return self.saver.get_delta_channel_history(*args, **kwargs)
+
+    async def aget_tuple(self, config):
+        return await self.saver.aget_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator:
+        async for item in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        if self.persistent:
+            thread_id = str(config["configurable"]["thread_id"])
+            async with self.saver.lock:
+                # 커밋은 바로 뒤 체크포인트 저장과 함께 됨
+                await self._conn.execute(
+                    "INSERT INTO thread_activity (thread_id, last_access) VALUES (?, ?) "
+                    "ON CONFLICT(thread_id) DO UPDATE SET last_access = excluded.last_access",
+                    (thread_id, time.time()),
+                )
+            self._dirty.add(thread_id)
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes: Sequence, task_id: str, task_path: str = ""):
+        return await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str):
+        """대화 하나의 모든 체크포인트를 삭제합니다. (세션 삭제 시)"""
+        await self.saver.adelete_thread(thread_id)
+        if self.persistent:
+            async with self.saver.lock:
+                await self._conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+                await self._conn.commit()
+        self._dirty.discard(str(thread_id))
+
+    async def aget_delta_channel_history(self, *args, **kwargs):
+        return await self.saver.aget_delta_channel_history(*args, **kwargs)
+
+    # ------------------------------------------------------------------
+    # 정리
+    # ------------------------------------------------------------------
+    async def sweep(self) -> dict:
+        """
+        만료/초과 대화를 삭제하고, 최근 사용한 대화의 이전 체크포인트를 지웁니다.
+
+        Returns:
+            dict: {"expired": 만료 삭제 수, "evicted": 개수 초과 삭제 수, "trimmed": 정리한 대화 수}
+        """
+        if not self.persistent:
+            return {"expired": 0, "evicted": 0, "trimmed": 0}
+
+        conn = self._conn
+        dirty, self._dirty = self._dirty, set()
+        cutoff = time.time() - self.ttl
+        async with self.saver.lock:
+            async with conn.execute("SELECT thread_id FROM thread_activity WHERE last_access < ?", (cutoff,)) as cur:
+                expired = [row[0] for row in await cur.fetchall()]
+            # 만료된 대화를 뺀 나머지 중 최근 max_threads개를 넘는 대화
+            async with conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_access >= ? "
+                "ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+                (cutoff, self.max_threads),
+            ) as cur:
+                evicted = [row[0] for row in await cur.fetchall()]
+
+            removed = [(thread_id,) for thread_id in expired + evicted]
+            for table in ("checkpoints", "writes", "thread_activity"):
+                await conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", removed)
+
+            trimmed = [(thread_id,) for thread_id in dirty - set(expired + evicted)]
+            # checkpoint_id는 시간순으로 정렬되는 uuid6이므로 네임스페이스별 최대값이 최신 체크포인트
+            # (체크포인트는 (thread_id, checkpoint_ns, checkpoint_id)로 구분되므로 네임스페이스까지 맞춰 비교)
+            await conn.executemany(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < ("
+                "SELECT MAX(latest.checkpoint_id) FROM checkpoints AS latest "
+                "WHERE latest.thread_id = checkpoints.thread_id AND latest.checkpoint_ns = checkpoints.checkpoint_ns)",
+                trimmed,
+            )
+            await conn.executemany(
+                "DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS ("
+                "SELECT 1 FROM checkpoints WHERE checkpoints.thread_id = writes.thread_id "
+                "AND checkpoints.checkpoint_ns = writes.checkpoint_ns AND checkpoints.checkpoint_id = writes.checkpoint_id)",
+                trimmed,
+            )
+            await conn.commit()
+
+        result = {"expired": len(expired), "evicted": len(evicted), "trimmed": len(trimmed)}
+        if expired or evicted:
+            logger.info(f"대화 기억 정리: {result}")
+        return result
+
+    async def run_sweeper(self, interval: float = CHECKPOINT_SWEEP_INTERVAL):
+        """interval초마다 sweep()을 실행합니다. (FastAPI 시작 시 백그라운드 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning(f"대화 기억 정리 실패: {e}")
+
+    async def stats(self) -> dict:
+        if not self.persistent:
+            return {"persistent": False}
+        async with self.saver.lock:
+            async with self._conn.execute("SELECT COUNT(*) FROM thread_activity") as cur:
+                threads = (await cur.fetchone())[0]
+            async with self._conn.execute("SELECT COUNT(*) FROM checkpoints") as cur:
+                checkpoints = (await cur.fetchone())[0]
+        return {"persistent": True, "threads": threads, "checkpoints": checkpoints, "max_threads": self.max_threads}
+
+
+# 두 그래프(local/gemini)가 함께 사용하는 저장소
+checkpointer = BoundedCheckpointer()
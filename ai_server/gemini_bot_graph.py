@@ -12,16 +12,19 @@ from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 
-from langgraph.checkpoint.memory import MemorySaver
 
 from llm.factory import LLMFactory
 from rag.retriever import Retriever
+from router import create_fast_router, parse_route_rewrite
+from checkpointer import checkpointer
+from history import HistoryManager, format_conversation, strip_thinking
 # Prompts
 from prompt import (
     GEMINI_ROUTE_SYSTEM,
-    GEMINI_REWRITE_SYSTEM,
+    GEMINI_ROUTE_REWRITE_SYSTEM,
     GEMINI_RAG_SYSTEM,
-    GEMINI_CHAT_SYSTEM
+    GEMINI_CHAT_SYSTEM,
+    GEMINI_SUMMARY_SYSTEM
 )
 
 logger = logging.getLogger("GeminiGraph")
@@ -30,49 +33,91 @@ class GraphState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
     context : str
     query : str
+    route : str
+    # 최근 턴 창 밖으로 밀려난 이전 대화의 요약과, 요약에 반영된 messages 앞부분의 개수 (history.py)
+    summary : str
+    summarized : int
 
 retriever_instance = Retriever()
+# 키워드/분류기로 먼저 판단하고, 확신도가 낮을 때만 LLM으로 라우팅
+fast_router = create_fast_router()
 
 def get_llm():
     return LLMFactory.get_llm()
 
-def route_question(state: GraphState):
+async def summarize_history(summary: str, messages: List[BaseMessage]) -> str:
+    """기존 요약과 최근 턴 창 밖으로 밀려난 대화를 합쳐 새 요약을 만듭니다. (HistoryManager에서 호출)"""
+    llm = get_llm()
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", GEMINI_SUMMARY_SYSTEM),
+        ("human", "위 내용을 요약해 주세요.")
+    ])
+
+    chain = prompt | llm | StrOutputParser()
+    text = await chain.ainvoke({"summary": summary or "(없음)", "conversation": format_conversation(messages)})
+    return strip_thinking(text)
+
+# 프롬프트에 넣을 대화: 이전 대화 요약 + 토큰 예산 안의 최근 턴 (history.py)
+history = HistoryManager(summarize_history)
+
+async def llm_route(question: str) -> str:
+    """LLM으로 검색(search) / 일상 대화(chat) 여부를 판단합니다."""
     llm = get_llm()
-    messages = state["messages"] # Gemini는 전체 대맥을 봐도 됨, 혹은 마지막 질문만
-    question = messages[-1].content
-    
     prompt = ChatPromptTemplate.from_messages([
         ("system", GEMINI_ROUTE_SYSTEM),
         ("human", "{question}")
     ])
 
     chain = prompt | llm | StrOutputParser()
-    decision = chain.invoke({"question": question}).strip().lower()
-    
-    logger.info(f"Dimini Route Decision: {decision} (Question: {question})")
-    
-    if "search" in decision:
-        return "rewrite"
-    else:
-        return "generate_chat"
+    decision = (await chain.ainvoke({"question": question})).strip().lower()
+    logger.info(f"Gemini Route Decision: {decision} (Question: {question})")
+    return "search" if "search" in decision else "chat"
 
-def rewrite_query(state: GraphState):
+async def llm_route_and_rewrite(messages: List[BaseMessage]):
+    """이전 대화를 참고해 라우팅과 질문 재구성을 LLM 호출 한 번으로 수행합니다."""
     llm = get_llm()
-    messages = state["messages"]
-    
     prompt = ChatPromptTemplate.from_messages([
-        ("system", GEMINI_REWRITE_SYSTEM),
+        ("system", GEMINI_ROUTE_REWRITE_SYSTEM),
         MessagesPlaceholder(variable_name="messages"),
     ])
-    
+
     chain = prompt | llm | StrOutputParser()
-    new_query = chain.invoke({"messages": messages}).strip()
-    logger.info(f"Gemini Rewritten Query: {new_query}")
-    return {"query": new_query}
+    route, query = parse_route_rewrite(await chain.ainvoke({"messages": messages}), messages[-1].content)
+    logger.info(f"Route + Rewrite: {route} / {query}")
+    return route, query
+
+async def route_node(state: GraphState):
+    """
+    검색 여부(route)와 검색 질의(query)를 정합니다.
+    - 이전 대화가 없으면 재구성할 맥락이 없으므로 질문을 그대로 검색 질의로 사용하고,
+      빠른 라우터가 판단하지 못한 경우에만 LLM 라우팅을 호출
+    - 이전 대화가 있으면 라우팅과 질문 재구성을 LLM 호출 한 번으로 처리
+      (빠른 라우터가 일상 대화로 판단하면 재구성할 필요가 없으므로 호출하지 않음)
+    """
+    messages = state["messages"]
+    question = messages[-1].content
+
+    fast_route = None
+    if fast_router is not None:
+        decision = fast_router.route(question)
+        fast_route = decision.route
+        if fast_route is not None:
+            logger.info(f"Fast Route Decision: {fast_route} ({decision.source}, {decision.confidence:.2f})")
+
+    if len(messages) <= 1:
+        return {"route": fast_route or await llm_route(question), "query": question}
+    if fast_route == "chat":
+        return {"route": "chat", "query": question}
+
+    route, query = await llm_route_and_rewrite(history.window(state))
+    return {"route": fast_route or route, "query": query}
+
+def select_branch(state: GraphState):
+    return "retrieve" if state["route"] == "search" else "generate_chat"
 
-def retrieve_node(state: GraphState):
+async def retrieve_node(state: GraphState):
     query = state["query"]
-    docs = retriever_instance.retriever.invoke(query)
+    docs = await retriever_instance.aretrieve(query)
     
     # 문서 내용 + 메타데이터를 포함한 구조화된 컨텍스트 생성
     context_parts = []
@@ -105,7 +150,7 @@ def retrieve_node(state: GraphState):
         
     return {"context": context_text}
     
-def generate_node(state: GraphState):
+async def generate_node(state: GraphState):
     llm = get_llm()
     context = state["context"]
     
@@ -117,14 +162,14 @@ def generate_node(state: GraphState):
     ])
 
     chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({
+    response = await chain.ainvoke({
         "context" : context,
-        "messages" : state["messages"]
+        "messages" : history.window(state)
     })
     
     return {"messages": [AIMessage(content=response)]}
 
-def generate_chat_node(state: GraphState):
+async def generate_chat_node(state: GraphState):
     llm = get_llm()
     logger.info("Generating simple chat response with Gemini...")
     
@@ -134,31 +179,31 @@ def generate_chat_node(state: GraphState):
     ])
     
     chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({"messages": state["messages"]})
+    response = await chain.ainvoke({"messages": history.window(state)})
     
     return {"messages": [AIMessage(content=response)]}
 
 
 workflow = StateGraph(GraphState)
 
-workflow.add_node("rewrite", rewrite_query)
+workflow.add_node("route", route_node)
 workflow.add_node("retrieve", retrieve_node)
 workflow.add_node("generate_node", generate_node)
 workflow.add_node("generate_chat", generate_chat_node)
 
+workflow.add_edge(START, "route")
 workflow.add_conditional_edges(
-    START,
-    route_question,
+    "route",
+    select_branch,
     {
-        "rewrite" : "rewrite",
+        "retrieve" : "retrieve",
         "generate_chat" : "generate_chat"
     }
 )
 
-workflow.add_edge("rewrite", "retrieve")
 workflow.add_edge("retrieve", "generate_node")
 workflow.add_edge("generate_node", END)
 workflow.add_edge("generate_chat", END)
 
-memory = MemorySaver()
-app_graph = workflow.compile(checkpointer=memory)
+# 대화 기억: SQLite 저장소 (TTL/LRU 정리, checkpointer.py)
+app_graph = workflow.compile(checkpointer=checkpointer)
@@ -0,0 +1,206 @@
+# ai_server/history.py
+"""
+대화 기록 창 (토큰 예산 + 누적 요약)
+
+그래프는 GraphState의 messages(세션의 전체 대화)를 모든 프롬프트에 그대로 넣었으므로
+대화가 길어질수록 프리필 시간과 컨텍스트 사용량이 계속 늘어났습니다.
+
+HistoryManager는 프롬프트에 넣을 대화를 [이전 대화 요약] + 최근 턴 원문 + 현재 질문으로 제한합니다.
+- 최근 턴은 HISTORY_MAX_TURNS개, 모델 토크나이저 기준 HISTORY_TOKEN_BUDGET 토큰 안에서 원문 그대로 유지
+  (AI 답변의 사고 과정 <think>...</think>는 빼고 최종 답변만 넣음)
+- 답변을 보낸 뒤(arefresh) 최근 턴이 한도를 넘었으면 절반으로 줄이고, 밀려난 턴을 LLM으로
+  기존 요약에 합쳐 새 요약을 만듦
+- 요약(summary)과 요약에 반영된 메시지 수(summarized)는 GraphState에 저장되므로
+  대화 기억 저장소(checkpointer.py)와 함께 재시작 후에도 유지되고, 세션을 삭제하면 함께 삭제됨
+- 한 번 줄이면 한도에 다시 닿을 때까지 요약과 창의 시작 위치가 그대로이므로, 요약은 몇 턴에 한 번만 만들고
+  그 사이의 턴들은 프롬프트 앞부분이 같아 로컬 모델의 접두사 KV 캐시(llm/prefix_cache.py)도 계속 적중
+
+요약은 응답 이후 백그라운드에서 만들므로 답변 지연에 포함되지 않습니다.
+요약이 아직 갱신되지 않았으면 한도를 넘는 오래된 턴은 그 요청의 프롬프트에서만 제외하고,
+다음 갱신에서 빠짐없이 요약에 반영합니다.
+"""
+
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+load_dotenv()
+
+logger = logging.getLogger("History")
+
+# 프롬프트에 원문으로 넣을 최근 턴(질문 + 답변) 수
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "6"))
+# 원문으로 넣을 최근 턴의 토큰 상한 (현재 질문과 요약은 제외)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2048"))
+
+SUMMARY_PREFIX = "[이전 대화 요약]\n"
+
+
+def strip_thinking(text: str) -> str:
+    """
+    답변에서 사고 과정을 뺍니다.
+    로컬 모델은 프롬프트가 <think>로 끝나므로 답변에는 여는 태그 없이 </think>만 있습니다.
+    """
+    if "</think>" in text:
+        text = text.rsplit("</think>", 1)[1]
+    return text.replace("<think>", "").strip()
+
+
+def format_conversation(messages: List[BaseMessage]) -> str:
+    """요약 프롬프트에 넣을 대화 텍스트"""
+    lines = []
+    for message in messages:
+        speaker = "사용자" if isinstance(message, HumanMessage) else "돌의정령"
+        lines.append(f"{speaker}: {strip_thinking(message.content)}")
+    return "\n".join(lines)
+
+
+def create_token_counter() -> Callable[[str], int]:
+    """
+    로컬 모델이면 모델 토크나이저로 토큰 수를 셉니다.
+    Gemini 토크나이저는 로컬에서 쓸 수 없으므로 글자 수로 넉넉하게 어림합니다. (한국어는 글자당 1토큰 이하)
+    """
+    provider = os.getenv("LLM_PROVIDER", "local").lower()
+    model_path = os.getenv("MODEL_PATH")
+    if provider != "gemini" and model_path:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    return len
+
+
+def _split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """사용자 메시지마다 새 턴을 시작해 [질문, 답변] 묶음으로 나눕니다."""
+    turns = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _clean(message: BaseMessage) -> BaseMessage:
+    if isinstance(message, AIMessage):
+        return AIMessage(content=strip_thinking(message.content))
+    return message
+
+
+class HistoryManager:
+    def __init__(self, summarize: Callable[[str, List[BaseMessage]], Awaitable[str]],
+                 count_tokens: Optional[Callable[[str], int]] = None,
+                 max_turns: int = HISTORY_MAX_TURNS, token_budget: int = HISTORY_TOKEN_BUDGET):
+        """
+        Args:
+            summarize: (기존 요약, 새로 밀려난 메시지) -> 새 요약 을 만드는 코루틴 함수 (그래프 모듈의 LLM 사용)
+            count_tokens: 텍스트 토큰 수 함수 (없으면 처음 사용할 때 create_token_counter())
+        """
+        self.summarize = summarize
+        self._count_tokens = count_tokens
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+
+        # 요약을 만드는 중인 대화 (같은 대화의 요약을 동시에 두 번 만들지 않도록)
+        self._refreshing = set()
+
+    def count_tokens(self, text: str) -> int:
+        if self._count_tokens is None:
+            self._count_tokens = create_token_counter()
+        return self._count_tokens(text)
+
+    def _turn_tokens(self, turn: List[BaseMessage]) -> int:
+        return sum(self.count_tokens(message.content) for message in turn)
+
+    def _fit(self, turns: List[List[BaseMessage]], max_turns: int, budget: int) -> int:
+        """최근 턴부터 max_turns개, budget 토큰 안에 들어가는 턴 수를 반환합니다."""
+        count, used = 0, 0
+        for turn in reversed(turns):
+            if count >= max_turns:
+                break
+            used += self._turn_tokens(turn)
+            if used > budget:
+                break
+            count += 1
+        return count
+
+    def _chunks(self, turns: List[List[BaseMessage]]):
+        """
+        턴들을 token_budget 안에 들어가는 묶음으로 나눕니다. (요약 프롬프트 하나에 넣을 양)
+        예산보다 긴 턴은 단독 묶음으로 둡니다. (답변을 만들 때 이미 모델 컨텍스트에 들어갔던 턴)
+        """
+        chunk, used = [], 0
+        for turn in turns:
+            tokens = self._turn_tokens(turn)
+            if chunk and used + tokens > self.token_budget:
+                yield chunk
+                chunk, used = [], 0
+            chunk.append(turn)
+            used += tokens
+        if chunk:
+            yield chunk
+
+    def window(self, state: dict) -> List[BaseMessage]:
+        """
+        프롬프트의 MessagesPlaceholder에 넣을 대화를 만듭니다.
+
+        Args:
+            state: GraphState (messages의 마지막 메시지가 현재 질문, summary/summarized는 이전 대화 요약)
+
+        Returns:
+            list: [요약 SystemMessage] + 최근 턴 + 현재 질문
+        """
+        messages = state["messages"]
+        summary = state.get("summary") or ""
+        turns = _split_turns(messages[state.get("summarized") or 0:-1])
+        kept = self._fit(turns, self.max_turns, self.token_budget)
+        if kept < len(turns):
+            logger.debug(f"아직 요약되지 않은 이전 턴 {len(turns) - kept}개를 이번 프롬프트에서 제외")
+
+        window = [SystemMessage(content=SUMMARY_PREFIX + summary)] if summary else []
+        for turn in turns[len(turns) - kept:]:
+            window.extend(_clean(message) for message in turn)
+        window.append(messages[-1])
+        return window
+
+    async def arefresh(self, config: dict, state: dict) -> Optional[dict]:
+        """
+        답변을 보낸 뒤 호출합니다. 최근 턴이 한도를 넘었으면 절반으로 줄이고 밀려난 턴을 요약에 합칩니다.
+
+        Args:
+            config: 그래프 실행 config (thread_id)
+            state: 답변까지 기록된 GraphState
+
+        Returns:
+            dict: GraphState에 반영할 {"summary", "summarized"} (갱신할 필요가 없거나 실패하면 None)
+        """
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        if thread_id in self._refreshing:
+            return None
+        self._refreshing.add(thread_id)
+        try:
+            messages = state.get("messages") or []
+            summary = state.get("summary") or ""
+            start = state.get("summarized") or 0
+            turns = _split_turns(messages[start:])
+            if self._fit(turns, self.max_turns, self.token_budget) == len(turns):
+                return None
+
+            # 한도의 절반만 남겨, 다시 한도에 닿을 때까지 요약과 창의 시작 위치를 유지
+            kept = self._fit(turns, max(1, self.max_turns // 2), self.token_budget // 2)
+            dropped = turns[:len(turns) - kept]
+            # 밀려난 턴이 많으면(요약 없이 길어진 기존 대화 등) 예산 단위로 나눠 차례로 요약에 합침
+            for chunk in self._chunks(dropped):
+                summary = (await self.summarize(summary, [m for turn in chunk for m in turn])).strip()
+
+            upto = start + sum(len(turn) for turn in dropped)
+            logger.info(f"대화 요약 갱신 (thread {thread_id}): 메시지 {upto}개 요약, 최근 {kept}턴 유지")
+            return {"summary": summary, "summarized": upto}
+        except Exception as e:
+            logger.warning(f"대화 요약 갱신 실패 (thread {thread_id}): {e}")
+            return None
+        finally:
+            self._refreshing.discard(thread_id)
@@ -0,0 +1,77 @@
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+import os
+from dotenv import load_dotenv
+import logging
+
+from .engine import BatchedLLM, ContinuousBatchingEngine, SamplingParams
+from .prefix_cache import PrefixCache, kv_bytes_per_token
+
+logger = logging.getLogger("LLM")
+
+load_dotenv()
+
+MODEL_PATH = os.getenv("MODEL_PATH")
+# 동시에 디코딩할 최대 요청 수 / 실행 중인 요청들의 (프롬프트 + 최대 생성 토큰) 합계 상한
+LLM_MAX_BATCH_SIZE = int(os.getenv("LLM_MAX_BATCH_SIZE", "8"))
+LLM_MAX_BATCH_TOKENS = int(os.getenv("LLM_MAX_BATCH_TOKENS", "16384"))
+# 접두사 KV 캐시 용량 (MB, GPU 메모리) - 0이면 사용하지 않음
+LLM_PREFIX_CACHE_MB = int(os.getenv("LLM_PREFIX_CACHE_MB", "2048"))
+
+
+class BatchedLLMLoader:
+    """
+    로컬 모델을 연속 배칭 엔진(llm/engine.py)으로 서빙하는 로더 (LLM_PROVIDER=local_batched)
+    동시 요청이 한 배치에서 함께 생성되어, 대기 중인 사용자가 많을수록 처리량이 늘어납니다.
+    """
+    _instance = None
+    _llm = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(BatchedLLMLoader, cls).__new__(cls, *args, **kwargs)
+            cls._instance._load_model()
+        return cls._instance
+
+    def _load_model(self):
+        """
+        메모리에 로드
+        """
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
+            model = AutoModelForCausalLM.from_pretrained(
+                MODEL_PATH,
+                torch_dtype=torch.float16,
+                device_map="cuda"
+                )
+            model.eval()
+
+            prefix_cache = None
+            if LLM_PREFIX_CACHE_MB > 0:
+                prefix_cache = PrefixCache(max_bytes=LLM_PREFIX_CACHE_MB * 1024 * 1024)
+                logger.info(f"접두사 KV 캐시: {LLM_PREFIX_CACHE_MB}MB "
+                            f"(약 {prefix_cache.max_bytes // kv_bytes_per_token(model)} 토큰)")
+
+            engine = ContinuousBatchingEngine(
+                model,
+                tokenizer,
+                max_batch_size=LLM_MAX_BATCH_SIZE,
+                max_batch_tokens=LLM_MAX_BATCH_TOKENS,
+                prefix_cache=prefix_cache,
+            )
+            # 샘플링 설정은 LocalLLMLoader의 pipeline과 동일
+            self._llm = BatchedLLM(engine=engine, params=SamplingParams(
+                max_new_tokens=1024,
+                temperature=0.7,
+                top_p=0.9,
+                top_k=40,
+                repetition_penalty=1.1,
+            ))
+            logger.info(f"연속 배칭 엔진 로드 완료 (max_batch_size={LLM_MAX_BATCH_SIZE}, max_batch_tokens={LLM_MAX_BATCH_TOKENS})")
+        except Exception as e:
+            logger.error(f"LLM 로드 실패: {e}")
+            raise
+
+    def get_llm(self):
+        return self._llm
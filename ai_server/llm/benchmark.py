@@ -0,0 +1,120 @@
+# ai_server/llm/benchmark.py
+"""
+로컬 LLM 추론 백엔드별 생성 속도(tokens/s) 비교
+
+    python -m llm.benchmark                                  # 사용 가능한 모든 백엔드
+    python -m llm.benchmark --backends cpu-bf16,cpu-int8 --cores 0-7
+
+- cuda-fp16: 현재 LocalLLMLoader 경로 (float16, device_map="cuda")
+- cpu-fp32 / cpu-bf16 / cpu-int8: CPULLMLoader 경로 (llm/cpu_loader.py)
+
+백엔드마다 같은 프롬프트를 greedy로 정확히 --max-new-tokens개씩 생성해
+첫 토큰 지연 시간과 디코딩 속도를 측정합니다. (ai_server 디렉터리에서 실행)
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import time
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from .cpu_loader import MODEL_PATH, bf16_supported, configure_threads, load_cpu_model
+
+PROMPTS = [
+    "메이플스토리에서 주간 보스는 언제 초기화돼?",
+    "스타포스 강화할 때 파괴 방지는 언제 쓰는 게 좋아?",
+    "200레벨 이후에 사냥하기 좋은 곳 추천해줘.",
+    "안녕 돌의정령! 오늘 뭐 하고 놀까?",
+]
+
+BACKENDS = ("cuda-fp16", "cpu-fp32", "cpu-bf16", "cpu-int8")
+
+
+def load_backend(name: str, model_path: str):
+    if name == "cuda-fp16":
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = AutoModelForCausalLM.from_pretrained(model_path, torch_dtype=torch.float16, device_map="cuda")
+        return model.eval(), tokenizer
+    dtype, quantize = {
+        "cpu-fp32": ("float32", "none"),
+        "cpu-bf16": ("bfloat16", "none"),
+        "cpu-int8": ("float32", "int8"),
+    }[name]
+    return load_cpu_model(model_path, dtype=dtype, quantize=quantize)
+
+
+def model_size_mb(model) -> float:
+    # 동적 양자화된 Linear의 가중치는 parameters()에 나오지 않으므로 state_dict로 계산
+    total = 0
+    for value in model.state_dict().values():
+        if isinstance(value, torch.Tensor):
+            total += value.numel() * value.element_size()
+        elif isinstance(value, tuple):  # 양자화 Linear의 (packed weight, bias)
+            total += sum(v.numel() * v.element_size() for v in value if isinstance(v, torch.Tensor))
+    return total / 1024 / 1024
+
+
+@torch.inference_mode()
+def run(model, tokenizer, max_new_tokens: int):
+    device = model.device
+    options = dict(do_sample=False, pad_token_id=tokenizer.eos_token_id)
+
+    def generate(prompt, tokens):
+        inputs = tokenizer(prompt, return_tensors="pt").to(device)
+        start = time.perf_counter()
+        output = model.generate(**inputs, max_new_tokens=tokens, min_new_tokens=tokens, **options)
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        return time.perf_counter() - start, output.shape[1] - inputs["input_ids"].shape[1]
+
+    generate(PROMPTS[0], 4)  # 워밍업
+    first_token, decode_speed = [], []
+    for prompt in PROMPTS:
+        prefill_time, _ = generate(prompt, 1)
+        total_time, tokens = generate(prompt, max_new_tokens)
+        first_token.append(prefill_time * 1000)
+        # 첫 토큰(프리필) 시간을 뺀 순수 디코딩 속도
+        decode_speed.append((tokens - 1) / max(total_time - prefill_time, 1e-9))
+    return statistics.median(first_token), statistics.median(decode_speed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 LLM 백엔드별 tokens/s 비교")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--backends", default=None, help=f"쉼표로 구분 ({', '.join(BACKENDS)})")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0, help="CPU 스레드 수 (0이면 기본값)")
+    parser.add_argument("--cores", default="", help='CPU 코어 고정 (예: "0-7")')
+    args = parser.parse_args()
+
+    if args.backends:
+        backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    else:
+        backends = [b for b in BACKENDS
+                    if (b != "cuda-fp16" or torch.cuda.is_available()) and (b != "cpu-bf16" or bf16_supported())]
+    configure_threads(args.threads, args.cores)
+
+    rows = []
+    for name in backends:
+        start = time.perf_counter()
+        model, tokenizer = load_backend(name, args.model)
+        load_time = time.perf_counter() - start
+        ttft, speed = run(model, tokenizer, args.max_new_tokens)
+        rows.append((name, load_time, model_size_mb(model), ttft, speed))
+        print(f"{name}: {speed:.1f} tokens/s")
+        del model
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    print("\n" + "=" * 72)
+    print(f" [로컬 LLM 백엔드 비교] {os.path.basename(os.path.normpath(args.model))}, "
+          f"CPU 스레드 {torch.get_num_threads()}개, 생성 {args.max_new_tokens} 토큰")
+    print("=" * 72)
+    print(f"{'backend':<11} {'load(s)':>8} {'weights(MB)':>12} {'first token(ms)':>16} {'tokens/s':>10} {'vs base':>8}")
+    base = rows[0][4] if rows else 0
+    for name, load_time, size, ttft, speed in rows:
+        print(f"{name:<11} {load_time:>8.1f} {size:>12.0f} {ttft:>16.0f} {speed:>10.1f} {speed / base:>7.2f}x")
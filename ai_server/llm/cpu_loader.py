@@ -0,0 +1,137 @@
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+from .streaming import StreamingHuggingFacePipeline
+
+import os
+from dotenv import load_dotenv
+import logging
+
+logger = logging.getLogger("LLM")
+
+load_dotenv()
+
+MODEL_PATH = os.getenv("MODEL_PATH")
+# 가중치 형식: auto(지원하면 bfloat16, 아니면 float32) / bfloat16 / float32
+LLM_CPU_DTYPE = os.getenv("LLM_CPU_DTYPE", "auto").lower()
+# 동적 양자화: int8(Linear 가중치를 int8로, 활성값은 실행 시 양자화) / none
+LLM_CPU_QUANTIZE = os.getenv("LLM_CPU_QUANTIZE", "int8").lower()
+# 연산 스레드 수 (0이면 LLM_CPU_CORES 개수, 그것도 없으면 torch 기본값 = 물리 코어 수)
+LLM_CPU_THREADS = int(os.getenv("LLM_CPU_THREADS", "0"))
+# 프로세스를 고정할 CPU 코어 (예: "0-7", "0,2,4,6"), 비우면 고정하지 않음
+LLM_CPU_CORES = os.getenv("LLM_CPU_CORES", "")
+
+
+def parse_cores(spec: str) -> list:
+    """"0-3,8,10-11" 형식의 코어 목록을 정수 리스트로 변환합니다."""
+    cores = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cores.update(range(int(start), int(end) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def configure_threads(threads: int = LLM_CPU_THREADS, cores: str = LLM_CPU_CORES):
+    """
+    추론 스레드를 설정합니다.
+    코어를 지정하면 프로세스를 그 코어들에만 고정해(sched_setaffinity) 다른 워커/프로세스와
+    같은 코어를 두고 경쟁하거나 스레드가 코어 사이를 옮겨 다니며 캐시를 잃지 않도록 합니다.
+    """
+    core_list = parse_cores(cores) if cores else []
+    if core_list:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, core_list)
+        else:
+            logger.warning("이 플랫폼은 CPU 코어 고정을 지원하지 않습니다. (LLM_CPU_CORES 무시)")
+    threads = threads or len(core_list)
+    if threads:
+        torch.set_num_threads(threads)
+    logger.info(f"CPU 추론 스레드: {torch.get_num_threads()}개, 코어 고정: {core_list or '없음'}")
+
+
+def bf16_supported() -> bool:
+    """CPU가 bfloat16 연산 명령어(AVX512-BF16 또는 AMX)를 지원하는지 확인합니다."""
+    checks = ("_is_avx512_bf16_supported", "_is_amx_tile_supported")
+    return any(getattr(torch.cpu, name, lambda: False)() for name in checks)
+
+
+def resolve_dtype(dtype: str = LLM_CPU_DTYPE, quantize: str = LLM_CPU_QUANTIZE) -> torch.dtype:
+    # 동적 int8 양자화는 float32 Linear만 변환하므로 나머지 연산도 float32로 둠
+    if quantize == "int8":
+        return torch.float32
+    if dtype == "bfloat16" or (dtype == "auto" and bf16_supported()):
+        return torch.bfloat16
+    return torch.float32
+
+
+def load_cpu_model(model_path: str = MODEL_PATH, dtype: str = LLM_CPU_DTYPE, quantize: str = LLM_CPU_QUANTIZE):
+    """
+    CPU 추론용으로 모델을 로드합니다. (CPULLMLoader와 llm/benchmark.py에서 함께 사용)
+
+    Returns:
+        tuple: (model, tokenizer)
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_path,
+        torch_dtype=resolve_dtype(dtype, quantize),
+        low_cpu_mem_usage=True,
+        )
+    model.eval()
+
+    if quantize == "int8":
+        # Linear 가중치를 int8로 저장해 메모리 대역폭(디코딩의 병목)을 약 1/4로 줄임
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif quantize != "none":
+        raise ValueError(f"지원하지 않는 LLM_CPU_QUANTIZE 값: {quantize} (int8 / none)")
+    return model, tokenizer
+
+
+class CPULLMLoader:
+    """
+    GPU 없이 CPU에서 로컬 모델을 실행하는 로더 (LLM_PROVIDER=local_cpu)
+    스테이징/CI/GPU 서버가 부족할 때의 추가 처리 용량으로 사용합니다.
+    """
+    _instance = None
+    _llm = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(CPULLMLoader, cls).__new__(cls, *args, **kwargs)
+            cls._instance._load_model()
+        return cls._instance
+
+    def _load_model(self):
+        """
+        메모리에 로드
+        """
+        try:
+            configure_threads()
+            model, tokenizer = load_cpu_model()
+            logger.info(f"CPU 모델 로드 완료 (dtype={resolve_dtype()}, quantize={LLM_CPU_QUANTIZE})")
+
+            # 생성 설정은 LocalLLMLoader와 동일
+            pipe = pipeline(
+                "text-generation",
+                model=model,
+                tokenizer=tokenizer,
+                max_new_tokens=1024,
+                do_sample=True,
+                temperature=0.7,
+                top_p=0.9,
+                top_k=40,
+                repetition_penalty=1.1, # 반복 방지
+                return_full_text=False  # 질문 포함하지 않고 답변만 반환
+            )
+
+            self._llm = StreamingHuggingFacePipeline(pipeline=pipe)
+        except Exception as e:
+            logger.error(f"LLM 로드 실패: {e}")
+            raise
+
+    def get_llm(self):
+        return self._llm
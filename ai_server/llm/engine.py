@@ -0,0 +1,612 @@
+# ai_server/llm/engine.py
+"""
+로컬 LLM 연속 배칭(Continuous Batching) 추론 엔진
+
+transformers pipeline은 요청 하나씩 generate를 실행하므로 동시 요청이 많아도 처리량이 늘지 않습니다.
+이 엔진은 스케줄러 스레드 하나가 실행 중인 모든 요청을 한 배치로 묶어 토큰 단위(iteration)로 디코딩합니다.
+
+- 새 요청은 다음 토큰 경계에서 프리필(prefill) 후 실행 중인 배치에 합류
+- 끝난 요청은 바로 배치에서 빠지고, 그 자리에 대기 중인 요청이 들어옴
+- 배치 크기(max_batch_size)와 KV 토큰 예산(max_batch_tokens = 프롬프트 + 최대 생성 토큰 합계)으로 합류를 제한
+- 요청별로 토큰이 생성되는 즉시 스트리밍 (동기 이터레이터 / async 이터레이터)
+- prefix_cache를 주면 공통 접두사(시스템 프롬프트, 같은 세션의 이전 턴)의 KV를 재사용해
+  새 토큰만 프리필 (llm/prefix_cache.py)
+
+길이가 다른 시퀀스의 KV 캐시는 왼쪽을 0으로 채워(left-pad) 하나의 텐서로 쌓고,
+attention_mask로 패딩을 가리며 position_ids는 시퀀스별 실제 위치를 사용합니다.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import torch
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from pydantic import Field
+from transformers import DynamicCache
+
+from .prefix_cache import PrefixCache
+from .streaming import StopMatcher
+
+logger = logging.getLogger("LLM_Engine")
+
+
+@dataclass
+class SamplingParams:
+    max_new_tokens: int = 1024
+    temperature: float = 0.7   # 0이면 greedy
+    top_p: float = 0.9
+    top_k: int = 40
+    repetition_penalty: float = 1.1
+
+
+class GenerationRequest:
+    """
+    엔진에 제출된 요청 하나. 생성된 텍스트 조각을 순서대로 전달합니다.
+
+    이벤트: ("token", 텍스트 조각) / ("done", 종료 사유) / ("error", 메시지)
+    """
+
+    def __init__(self, prompt_ids: List[int], params: SamplingParams, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.prompt_ids = list(prompt_ids)
+        self.params = params
+        self.output_ids: List[int] = []
+        self.finish_reason: Optional[str] = None
+        self.cancelled = False
+        self.created_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+
+        self._text_offset = 0
+        self._loop = loop
+        self._queue = asyncio.Queue() if loop is not None else queue.Queue()
+
+    @property
+    def reserved_tokens(self) -> int:
+        """배치 합류 시 예약하는 KV 토큰 수 (프롬프트 + 최대 생성 길이)"""
+        return len(self.prompt_ids) + self.params.max_new_tokens
+
+    def cancel(self):
+        """생성을 중단합니다. 스케줄러가 다음 토큰 경계에서 배치에서 제거합니다."""
+        self.cancelled = True
+
+    def _emit(self, event):
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+            except RuntimeError:
+                # 요청한 쪽 이벤트 루프가 이미 닫힘
+                self.cancelled = True
+        else:
+            self._queue.put(event)
+
+    def __iter__(self) -> Iterator[str]:
+        """생성된 텍스트 조각을 순서대로 반환합니다. (loop 없이 제출한 요청용)"""
+        while True:
+            kind, value = self._queue.get()
+            if kind == "token":
+                yield value
+            elif kind == "error":
+                raise RuntimeError(value)
+            else:
+                return
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """__iter__의 비동기 버전 (loop를 지정해 제출한 요청용). 중간에 멈추면 생성도 취소합니다."""
+        try:
+            while True:
+                kind, value = await self._queue.get()
+                if kind == "token":
+                    yield value
+                elif kind == "error":
+                    raise RuntimeError(value)
+                else:
+                    return
+        finally:
+            if self.finish_reason is None:
+                self.cancel()
+
+
+@dataclass
+class _Batch:
+    """실행 중인 시퀀스들의 KV 캐시 (레이어별 (key, value), 왼쪽 패딩) 와 마스크"""
+    requests: List[GenerationRequest] = field(default_factory=list)
+    layers: list = field(default_factory=list)     # [(key, value)] - (batch, heads, seq, dim)
+    attention_mask: Optional[torch.Tensor] = None  # (batch, seq)
+    next_tokens: Optional[torch.Tensor] = None     # (batch,) 다음 스텝에 넣을 토큰
+
+
+def _cache_layers(cache) -> list:
+    """모델이 반환한 KV 캐시를 레이어별 (key, value) 텐서 목록으로 변환합니다."""
+    if isinstance(cache, (tuple, list)):
+        return [(k, v) for k, v in cache]
+    if hasattr(cache, "layers"):
+        return [(layer.keys, layer.values) for layer in cache.layers]
+    return list(zip(cache.key_cache, cache.value_cache))
+
+
+def _build_cache(layers) -> DynamicCache:
+    cache = DynamicCache()
+    for index, (key, value) in enumerate(layers):
+        cache.update(key, value, index)
+    return cache
+
+
+def _left_pad(tensor: torch.Tensor, length: int, dim: int) -> torch.Tensor:
+    pad = length - tensor.shape[dim]
+    if pad <= 0:
+        return tensor
+    shape = list(tensor.shape)
+    shape[dim] = pad
+    return torch.cat([tensor.new_zeros(shape), tensor], dim=dim)
+
+
+class ContinuousBatchingEngine:
+    def __init__(self, model, tokenizer, max_batch_size: int = 8, max_batch_tokens: int = 16384,
+                 max_prefill_tokens: Optional[int] = None, stop_token_ids: Optional[List[int]] = None,
+                 prefix_cache: Optional[PrefixCache] = None):
+        """
+        Args:
+            model: transformers CausalLM (eval 모드)
+            tokenizer: encode(text) / decode(ids, skip_special_tokens=True)를 제공하는 토크나이저
+            max_batch_size: 동시에 디코딩할 최대 요청 수
+            max_batch_tokens: 실행 중인 요청들의 (프롬프트 + 최대 생성 토큰) 합계 상한
+            max_prefill_tokens: 한 스텝에서 프리필할 프롬프트 토큰 상한 (디코딩이 오래 멈추지 않도록)
+            stop_token_ids: 생성을 끝내는 토큰 (기본값: 모델 generation_config / 토크나이저의 eos)
+            prefix_cache: 끝난 요청의 KV를 보관해 같은 접두사로 시작하는 요청의 프리필에 재사용
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = next(model.parameters()).device
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_prefill_tokens = max_prefill_tokens or max_batch_tokens
+        self.stop_token_ids = set(stop_token_ids or self._default_stop_ids())
+        self.prefix_cache = prefix_cache
+
+        self._waiting = deque()
+        self._cond = threading.Condition()
+        self._batch = _Batch()
+        self._thread = None
+        self._stopped = False
+        # prefill_tokens: 프리필에서 실제로 계산한 프롬프트 토큰 / cached_tokens: 접두사 캐시로 건너뛴 토큰
+        self.stats = {"steps": 0, "generated_tokens": 0, "max_running": 0, "prefill_tokens": 0, "cached_tokens": 0}
+
+    def _default_stop_ids(self) -> List[int]:
+        ids = []
+        generation_config = getattr(self.model, "generation_config", None)
+        for value in (getattr(generation_config, "eos_token_id", None), getattr(self.tokenizer, "eos_token_id", None)):
+            if isinstance(value, int):
+                ids.append(value)
+            elif value:
+                ids.extend(value)
+        return ids
+
+    # ------------------------------------------------------------------
+    # 요청 제출
+    # ------------------------------------------------------------------
+    def submit(self, prompt, params: Optional[SamplingParams] = None,
+               loop: Optional[asyncio.AbstractEventLoop] = None) -> GenerationRequest:
+        """
+        요청을 대기열에 넣고 바로 반환합니다. 반환된 요청을 순회하면 생성된 텍스트를 받을 수 있습니다.
+
+        Args:
+            prompt (str | List[int]): 프롬프트 텍스트 또는 토큰 ID
+            loop: async로 순회할 경우 현재 이벤트 루프
+        """
+        prompt_ids = self.tokenizer.encode(prompt) if isinstance(prompt, str) else prompt
+        request = GenerationRequest(prompt_ids, params or SamplingParams(), loop=loop)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("엔진이 종료되었습니다.")
+            self._waiting.append(request)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-engine", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return request
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            snapshot = {"running": len(self._batch.requests), "waiting": len(self._waiting), **self.stats}
+            if self.prefix_cache is not None:
+                snapshot["prefix_cache"] = self.prefix_cache.snapshot()
+            return snapshot
+
+    # ------------------------------------------------------------------
+    # 스케줄러
+    # ------------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._waiting and not self._batch.requests:
+                    self._cond.wait()
+                if self._stopped:
+                    pending = list(self._waiting) + self._batch.requests
+                    self._waiting.clear()
+                    break
+                admitted = self._admit_locked()
+
+            try:
+                with torch.inference_mode():
+                    if admitted:
+                        self._prefill(admitted)
+                    if self._batch.requests:
+                        self._decode_step()
+            except Exception as e:
+                logger.exception("배치 추론 실패")
+                with self._cond:
+                    failed = self._batch.requests + admitted
+                    self._batch = _Batch()
+                for request in failed:
+                    if request.finish_reason is None:
+                        request.finish_reason = "error"
+                        request._emit(("error", str(e)))
+
+        for request in pending:
+            request.finish_reason = "shutdown"
+            request._emit(("error", "엔진이 종료되었습니다."))
+
+    def _admit_locked(self) -> List[GenerationRequest]:
+        """배치 크기/토큰 예산 안에서 대기 중인 요청을 꺼냅니다. (_cond를 잡은 상태에서 호출)"""
+        admitted = []
+        reserved = sum(r.reserved_tokens for r in self._batch.requests)
+        prefill_tokens = 0
+        while self._waiting:
+            request = self._waiting[0]
+            if request.cancelled:
+                self._waiting.popleft()
+                request.finish_reason = "cancelled"
+                request._emit(("done", "cancelled"))
+                continue
+            running = len(self._batch.requests) + len(admitted)
+            if running >= self.max_batch_size:
+                break
+            # 예산보다 큰 요청도 배치가 비어 있으면 단독으로 실행 (영원히 대기하지 않도록)
+            if running and (reserved + request.reserved_tokens > self.max_batch_tokens
+                            or prefill_tokens + len(request.prompt_ids) > self.max_prefill_tokens):
+                break
+            self._waiting.popleft()
+            admitted.append(request)
+            reserved += request.reserved_tokens
+            prefill_tokens += len(request.prompt_ids)
+        return admitted
+
+    def _prefill(self, requests: List[GenerationRequest]):
+        """새 요청들의 프롬프트를 처리하고 KV 캐시를 실행 중인 배치에 합칩니다."""
+        misses = []
+        for request in requests:
+            length, layers = self.prefix_cache.lookup(request.prompt_ids) if self.prefix_cache else (0, None)
+            if layers is None:
+                misses.append(request)
+            else:
+                self._prefill_cached(request, length, layers)
+        if misses:
+            self._prefill_batch(misses)
+
+    def _prefill_batch(self, requests: List[GenerationRequest]):
+        """캐시된 접두사가 없는 요청들의 프롬프트 전체를 한 번에(왼쪽 패딩) 처리합니다."""
+        length = max(len(r.prompt_ids) for r in requests)
+        input_ids = torch.zeros((len(requests), length), dtype=torch.long, device=self.device)
+        attention_mask = torch.zeros((len(requests), length), dtype=torch.long, device=self.device)
+        for row, request in enumerate(requests):
+            ids = torch.tensor(request.prompt_ids, dtype=torch.long, device=self.device)
+            input_ids[row, length - len(ids):] = ids
+            attention_mask[row, length - len(ids):] = 1
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)
+        self.stats["prefill_tokens"] += sum(len(r.prompt_ids) for r in requests)
+
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=DynamicCache(),
+            use_cache=True,
+        )
+        next_tokens = self._sample(outputs.logits[:, -1, :], requests)
+        self._merge(requests, _cache_layers(outputs.past_key_values), attention_mask, next_tokens)
+
+    def _prefill_cached(self, request: GenerationRequest, length: int, layers: list):
+        """캐시된 접두사 KV(length 토큰) 뒤의 나머지 프롬프트만 처리합니다."""
+        total = len(request.prompt_ids)
+        outputs = self.model(
+            input_ids=torch.tensor([request.prompt_ids[length:]], dtype=torch.long, device=self.device),
+            attention_mask=torch.ones((1, total), dtype=torch.long, device=self.device),
+            position_ids=torch.arange(length, total, device=self.device).unsqueeze(0),
+            past_key_values=_build_cache(layers),
+            use_cache=True,
+        )
+        self.stats["prefill_tokens"] += total - length
+        self.stats["cached_tokens"] += length
+        next_tokens = self._sample(outputs.logits[:, -1, :], [request])
+        self._merge([request], _cache_layers(outputs.past_key_values),
+                    torch.ones((1, total), dtype=torch.long, device=self.device), next_tokens)
+
+    def _merge(self, requests, layers, attention_mask, next_tokens):
+        batch = self._batch
+        if not batch.requests:
+            batch.requests, batch.layers = list(requests), layers
+            batch.attention_mask, batch.next_tokens = attention_mask, next_tokens
+        else:
+            length = max(batch.attention_mask.shape[1], attention_mask.shape[1])
+            batch.layers = [
+                (torch.cat([_left_pad(k, length, 2), _left_pad(nk, length, 2)]),
+                 torch.cat([_left_pad(v, length, 2), _left_pad(nv, length, 2)]))
+                for (k, v), (nk, nv) in zip(batch.layers, layers)
+            ]
+            batch.attention_mask = torch.cat([_left_pad(batch.attention_mask, length, 1),
+                                              _left_pad(attention_mask, length, 1)])
+            batch.next_tokens = torch.cat([batch.next_tokens, next_tokens])
+            batch.requests = batch.requests + list(requests)
+        self.stats["max_running"] = max(self.stats["max_running"], len(batch.requests))
+
+        # 프리필에서 나온 첫 토큰 전달 (첫 토큰에서 바로 끝날 수도 있음)
+        self._emit_tokens(next_tokens.tolist(), requests, offset=len(batch.requests) - len(requests))
+
+    def _decode_step(self):
+        batch = self._batch
+        attention_mask = torch.cat([batch.attention_mask, batch.attention_mask.new_ones((len(batch.requests), 1))], dim=1)
+        # 시퀀스별 실제 위치 = 패딩을 제외한 이전 토큰 수
+        position_ids = batch.attention_mask.sum(dim=1, keepdim=True)
+
+        outputs = self.model(
+            input_ids=batch.next_tokens.unsqueeze(1),
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=_build_cache(batch.layers),
+            use_cache=True,
+        )
+        batch.layers = _cache_layers(outputs.past_key_values)
+        batch.attention_mask = attention_mask
+        batch.next_tokens = self._sample(outputs.logits[:, -1, :], batch.requests)
+        self.stats["steps"] += 1
+        self._emit_tokens(batch.next_tokens.tolist(), batch.requests, offset=0)
+
+    def _emit_tokens(self, tokens: List[int], requests: List[GenerationRequest], offset: int):
+        """샘플링된 토큰을 요청별로 기록/전달하고, 끝난 요청을 배치에서 제거합니다."""
+        finished = []
+        for index, (request, token) in enumerate(zip(requests, tokens)):
+            if request.first_token_at is None:
+                request.first_token_at = time.perf_counter()
+            if request.cancelled:
+                finished.append((offset + index, "cancelled"))
+                continue
+            if token in self.stop_token_ids:
+                finished.append((offset + index, "stop"))
+                continue
+
+            request.output_ids.append(token)
+            self.stats["generated_tokens"] += 1
+            self._emit_text(request)
+            if len(request.output_ids) >= request.params.max_new_tokens:
+                finished.append((offset + index, "length"))
+
+        if finished:
+            self._remove([index for index, _ in finished], [reason for _, reason in finished])
+
+    def _emit_text(self, request: GenerationRequest, final: bool = False):
+        # 전체를 다시 디코딩해 새로 늘어난 부분만 전달 (여러 토큰에 걸친 글자가 깨지지 않도록)
+        text = self.tokenizer.decode(request.output_ids, skip_special_tokens=True)
+        if not final and text.endswith("�"):
+            return
+        if len(text) > request._text_offset:
+            request._emit(("token", text[request._text_offset:]))
+            request._text_offset = len(text)
+
+    def _remove(self, indices: List[int], reasons: List[str]):
+        batch = self._batch
+        for index, reason in zip(indices, reasons):
+            request = batch.requests[index]
+            self._emit_text(request, final=True)
+            if self.prefix_cache is not None:
+                # 이 시퀀스의 KV (앞쪽 패딩 제외) = 프롬프트 + 지금까지 입력된 생성 토큰
+                length = int(batch.attention_mask[index].sum())
+                self.prefix_cache.insert((request.prompt_ids + request.output_ids)[:length],
+                                         [(k[index:index + 1, :, -length:], v[index:index + 1, :, -length:])
+                                          for k, v in batch.layers])
+            request.finish_reason = reason
+            request._emit(("done", reason))
+
+        removed = set(indices)
+        keep = [i for i in range(len(batch.requests)) if i not in removed]
+        with self._cond:
+            if not keep:
+                self._batch = _Batch()
+                return
+            index = torch.tensor(keep, device=self.device)
+            mask = batch.attention_mask.index_select(0, index)
+            # 남은 시퀀스 모두에서 패딩인 앞쪽 열은 잘라냄
+            start = int((mask.sum(dim=0) > 0).nonzero()[0])
+            batch.attention_mask = mask[:, start:]
+            batch.layers = [(k.index_select(0, index)[:, :, start:], v.index_select(0, index)[:, :, start:])
+                            for k, v in batch.layers]
+            batch.next_tokens = batch.next_tokens.index_select(0, index)
+            batch.requests = [batch.requests[i] for i in keep]
+
+    # ------------------------------------------------------------------
+    # 샘플링
+    # ------------------------------------------------------------------
+    def _sample(self, logits: torch.Tensor, requests: List[GenerationRequest]) -> torch.Tensor:
+        logits = logits.float()
+        tokens = torch.empty(len(requests), dtype=torch.long, device=logits.device)
+        for row, request in enumerate(requests):
+            params = request.params
+            scores = logits[row]
+            if params.repetition_penalty != 1.0:
+                seen = torch.tensor(request.prompt_ids + request.output_ids, device=scores.device).unique()
+                values = scores[seen]
+                scores[seen] = torch.where(values > 0, values / params.repetition_penalty,
+                                           values * params.repetition_penalty)
+            if params.temperature <= 0:
+                tokens[row] = scores.argmax()
+                continue
+
+            scores = scores / params.temperature
+            if params.top_k > 0:
+                kth = torch.topk(scores, min(params.top_k, scores.shape[-1])).values[-1]
+                scores = scores.masked_fill(scores < kth, float("-inf"))
+            if params.top_p < 1.0:
+                sorted_scores, sorted_index = scores.sort(descending=True)
+                cumulative = sorted_scores.softmax(-1).cumsum(-1)
+                # 누적 확률이 top_p를 넘는 지점 이후 제거 (첫 토큰은 항상 유지)
+                drop = cumulative - sorted_scores.softmax(-1) > params.top_p
+                scores[sorted_index[drop]] = float("-inf")
+            tokens[row] = torch.multinomial(scores.softmax(-1), 1)[0]
+        return tokens
+
+
+class BatchedLLM(LLM):
+    """
+    ContinuousBatchingEngine을 LangChain LLM으로 감싼 어댑터
+    HuggingFacePipeline 대신 사용하면 그래프의 동시 요청이 같은 배치에서 함께 생성됩니다.
+    """
+
+    engine: Any
+    params: SamplingParams = Field(default_factory=SamplingParams)
+
+    @property
+    def _llm_type(self) -> str:
+        return "continuous_batching"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        return "".join(chunk.text for chunk in self._stream(prompt, stop=stop, run_manager=run_manager))
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None,
+                     run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        return "".join([chunk.text async for chunk in self._astream(prompt, stop=stop, run_manager=run_manager)])
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        request = self.engine.submit(prompt, self.params)
+        stopper = StopMatcher(stop)
+        try:
+            for text in request:
+                text, stopped = stopper.feed(text)
+                if text:
+                    if run_manager:
+                        run_manager.on_llm_new_token(text)
+                    yield GenerationChunk(text=text)
+                if stopped:
+                    break
+            else:
+                text = stopper.flush()
+                if text:
+                    if run_manager:
+                        run_manager.on_llm_new_token(text)
+                    yield GenerationChunk(text=text)
+        finally:
+            request.cancel()
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        request = self.engine.submit(prompt, self.params, loop=asyncio.get_running_loop())
+        stopper = StopMatcher(stop)
+        try:
+            async for text in request:
+                text, stopped = stopper.feed(text)
+                if text:
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text)
+                    yield GenerationChunk(text=text)
+                if stopped:
+                    break
+            else:
+                text = stopper.flush()
+                if text:
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text)
+                    yield GenerationChunk(text=text)
+        finally:
+            request.cancel()
+
+
+# --- 테스트 실행 코드 (CPU, 작은 랜덤 모델) ---
+if __name__ == "__main__":
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    class ByteTokenizer:
+        """UTF-8 바이트 단위 토크나이저 (256 = eos)"""
+        eos_token_id = 256
+
+        def encode(self, text):
+            return list(text.encode("utf-8"))
+
+        def decode(self, ids, skip_special_tokens=True):
+            return bytes(i for i in ids if i < 256).decode("utf-8", errors="replace")
+
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=257, hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=1024, eos_token_id=256,
+    )
+    model = LlamaForCausalLM(config).eval()
+    tokenizer = ByteTokenizer()
+    prompts = [f"질문 {i}: " + "메이플" * (i % 5 + 1) for i in range(16)]
+    # 요청마다 길이를 다르게 해서 먼저 끝난 자리에 대기 요청이 합류하도록 함
+    params = [SamplingParams(max_new_tokens=8 + 8 * (i % 4), temperature=0, repetition_penalty=1.0) for i in range(16)]
+
+    # 1. 정확성: 배치로 생성한 결과가 model.generate(greedy)로 하나씩 생성한 결과와 같은지 확인
+    engine = ContinuousBatchingEngine(model, tokenizer, max_batch_size=4)
+    requests = [engine.submit(prompt, p) for prompt, p in zip(prompts, params)]
+    for request in requests:
+        "".join(request)
+    matches = 0
+    with torch.inference_mode():
+        for request, p in zip(requests, params):
+            input_ids = torch.tensor([request.prompt_ids])
+            reference = model.generate(input_ids, attention_mask=torch.ones_like(input_ids), do_sample=False,
+                                       max_new_tokens=p.max_new_tokens, pad_token_id=256, eos_token_id=256)
+            reference = [t for t in reference[0, input_ids.shape[1]:].tolist() if t != 256]
+            matches += reference == request.output_ids
+    print(f"greedy 결과 일치: {matches}/{len(requests)} (최대 동시 실행 {engine.stats['max_running']})")
+    engine.shutdown()
+
+    # 2. 처리량: 16개 요청을 동시에 보냈을 때 배치 크기별 tokens/s
+    for max_batch_size in (1, 4, 16):
+        engine = ContinuousBatchingEngine(model, tokenizer, max_batch_size=max_batch_size)
+        start = time.perf_counter()
+        requests = [engine.submit(prompt, SamplingParams(max_new_tokens=64, temperature=0.7)) for prompt in prompts]
+        for request in requests:
+            "".join(request)
+        elapsed = time.perf_counter() - start
+        tokens = sum(len(r.output_ids) for r in requests)
+        ttft = sorted(r.first_token_at - r.created_at for r in requests)[len(requests) // 2] * 1000
+        print(f"max_batch_size={max_batch_size:<3} {tokens / elapsed:8.1f} tokens/s  "
+              f"(총 {tokens} 토큰, {elapsed:.2f}s, 첫 토큰 p50 {ttft:.0f}ms, 스텝 {engine.stats['steps']})")
+        engine.shutdown()
+
+    # 3. 접두사 캐시: 같은 시스템 프롬프트 + 이전 턴을 포함하는 대화를 캐시 없이/있을 때 비교
+    system = "<|im_start|>system\n너는 메이플스토리 도우미 돌의정령이야. " * 8
+    turns = ["보스 초기화 언제야?", "그럼 주간 보스는?", "검은 마법사도 같아?", "고마워!"]
+    greedy = SamplingParams(max_new_tokens=32, temperature=0, repetition_penalty=1.0)
+    results = []
+    for prefix_cache in (None, PrefixCache(max_bytes=64 * 1024 * 1024)):
+        engine = ContinuousBatchingEngine(model, tokenizer, prefix_cache=prefix_cache)
+        outputs = []
+        for session in range(3):
+            prompt = system + f"(세션 {session})"
+            for turn in turns:
+                prompt += f"\nuser: {turn}\nassistant: "
+                answer = "".join(engine.submit(prompt, greedy))
+                prompt += answer
+                outputs.append(answer)
+        results.append(outputs)
+        print(f"prefix_cache={'on ' if prefix_cache else 'off'} 프리필 계산 {engine.stats['prefill_tokens']} 토큰, "
+              f"캐시 재사용 {engine.stats['cached_tokens']} 토큰")
+        engine.shutdown()
+    print(f"캐시 사용 전후 답변 일치: {sum(a == b for a, b in zip(*results))}/{len(results[0])}")
@@ -4,6 +4,8 @@ import logging
 from dotenv import load_dotenv
 
 from .llm_loader import LocalLLMLoader
+from .batched_loader import BatchedLLMLoader
+from .cpu_loader import CPULLMLoader
 from .gemini_loader import GeminiLoader
 
 load_dotenv()
@@ -20,6 +22,10 @@ class LLMFactory:
             return GeminiLoader()
         elif provider == "local":
             return LocalLLMLoader()
+        elif provider == "local_batched":
+            return BatchedLLMLoader()
+        elif provider == "local_cpu":
+            return CPULLMLoader()
         else:
             logger.warning(f"Unknown provider '{provider}', falling back to Local")
             return LocalLLMLoader()
@@ -1,6 +1,6 @@
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
-from langchain_huggingface import HuggingFacePipeline
+from .streaming import StreamingHuggingFacePipeline
 
 import os
 from dotenv import load_dotenv
@@ -49,7 +49,7 @@ class LocalLLMLoader:
                 return_full_text=False  # 질문 포함하지 않고 답변만 반환
             )
 
-            self._llm = HuggingFacePipeline(pipeline=pipe)
+            self._llm = StreamingHuggingFacePipeline(pipeline=pipe)
         except Exception as e:
             logger.error(f"LLM 로드 실패: {e}")
             raise
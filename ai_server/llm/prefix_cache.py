@@ -0,0 +1,154 @@
+# ai_server/llm/prefix_cache.py
+"""
+프롬프트 접두사 KV 캐시 (Prefix Cache)
+
+로컬 모델 프롬프트는 매번 같은 시스템 프롬프트(LOCAL_RAG_SYSTEM / LOCAL_CHAT_SYSTEM)로 시작하고,
+같은 세션의 다음 턴은 이전 턴의 대화 전체를 앞부분으로 그대로 포함합니다.
+이 캐시는 끝난 요청의 KV 캐시(프롬프트 + 생성한 답변)를 보관했다가, 새 요청의 토큰이
+같은 접두사로 시작하면 그 부분의 KV를 재사용해 나머지 토큰만 프리필하도록 합니다.
+
+- 토큰을 block_size개씩 나눈 블록의 연쇄 해시로 색인해, 가장 긴 공통 접두사를 블록 단위로 찾음
+  (접두사를 공유하는 항목이면 어느 것이든 사용 가능 - 인과적 어텐션이라 앞부분 KV는 동일)
+- 새 항목이 기존 항목을 접두사로 포함하면(같은 세션의 다음 턴) 기존 항목은 지움
+- 전체 KV 텐서 크기(바이트)가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 제거(LRU)
+
+ContinuousBatchingEngine의 스케줄러 스레드에서만 사용하므로 잠금이 없습니다.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger("LLM_PrefixCache")
+
+
+@dataclass
+class _Entry:
+    ids: List[int]      # 블록 단위로 자른 토큰 (길이 = num_blocks * block_size)
+    hashes: List[int]   # 블록별 연쇄 해시
+    layers: list        # [(key, value)] - (1, heads, seq, dim)
+    size: int           # KV 텐서 바이트 수
+
+
+class PrefixCache:
+    def __init__(self, max_bytes: int, block_size: int = 16):
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+
+        # 항목 번호 : _Entry (순서 = LRU, 앞쪽이 가장 오래 사용하지 않은 항목)
+        self._entries = OrderedDict()
+        # 블록 연쇄 해시 : 그 블록까지를 접두사로 가진 항목 번호들 (dict를 순서 있는 집합으로 사용)
+        self._index = {}
+        self._next_key = 0
+        self._bytes = 0
+        self.stats = {"lookups": 0, "hits": 0, "hit_tokens": 0, "evictions": 0}
+
+    def _hashes(self, ids: List[int], num_blocks: int) -> List[int]:
+        hashes = []
+        value = None
+        for i in range(num_blocks):
+            value = hash((value, tuple(ids[i * self.block_size:(i + 1) * self.block_size])))
+            hashes.append(value)
+        return hashes
+
+    def lookup(self, ids: List[int]) -> Tuple[int, Optional[list]]:
+        """
+        ids와 가장 길게 일치하는 접두사의 KV를 찾습니다.
+        다음 토큰 logits가 필요하므로 마지막 토큰은 항상 새로 계산하도록 남깁니다.
+
+        Returns:
+            tuple: (재사용할 토큰 수, 레이어별 (key, value) 또는 None)
+        """
+        self.stats["lookups"] += 1
+        key = None
+        num_blocks = 0
+        for i, value in enumerate(self._hashes(ids, (len(ids) - 1) // self.block_size)):
+            keys = self._index.get(value)
+            if not keys:
+                break
+            key = next(reversed(keys))
+            num_blocks = i + 1
+        if key is None:
+            return 0, None
+
+        entry = self._entries[key]
+        length = num_blocks * self.block_size
+        # 해시 충돌 대비 실제 토큰 비교
+        if entry.ids[:length] != ids[:length]:
+            return 0, None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        self.stats["hit_tokens"] += length
+        return length, [(k[:, :, :length], v[:, :, :length]) for k, v in entry.layers]
+
+    def insert(self, ids: List[int], layers: list):
+        """
+        한 시퀀스의 KV(배치 크기 1, 패딩 없음)를 저장합니다. 블록 크기의 배수까지만 저장합니다.
+
+        Args:
+            ids: KV에 해당하는 토큰 (KV 길이와 같아야 함)
+            layers: 레이어별 (key, value) - (1, heads, len(ids), dim)
+        """
+        num_blocks = len(ids) // self.block_size
+        if num_blocks == 0 or self.max_bytes <= 0:
+            return
+        hashes = self._hashes(ids, num_blocks)
+
+        # 같은 접두사를 이미 다 가진 항목이 있으면 사용 시점만 갱신
+        keys = self._index.get(hashes[-1])
+        if keys:
+            self._entries.move_to_end(next(reversed(keys)))
+            return
+
+        # 새 항목의 앞부분과 똑같은 기존 항목(예: 같은 세션의 이전 턴)은 중복이므로 제거
+        for i, value in enumerate(hashes):
+            for key in list(self._index.get(value, ())):
+                if len(self._entries[key].hashes) == i + 1:
+                    self._remove(key)
+
+        length = num_blocks * self.block_size
+        # 배치 텐서의 일부를 그대로 잡고 있지 않도록 복사
+        layers = [(k[:, :, :length].clone(), v[:, :, :length].clone()) for k, v in layers]
+        size = sum(k.numel() * k.element_size() + v.numel() * v.element_size() for k, v in layers)
+        if size > self.max_bytes:
+            return
+        while self._entries and self._bytes + size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = _Entry(list(ids[:length]), hashes, layers, size)
+        self._bytes += size
+        for value in hashes:
+            self._index.setdefault(value, {})[key] = None
+
+    def clear(self):
+        self._entries.clear()
+        self._index.clear()
+        self._bytes = 0
+
+    def snapshot(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes, **self.stats}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for value in entry.hashes:
+            keys = self._index.get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._index[value]
+
+
+def kv_bytes_per_token(model) -> int:
+    """모델의 토큰 하나당 KV 캐시 크기 (바이트) - 캐시 용량 로그용"""
+    config = model.config
+    heads = getattr(config, "num_key_value_heads", None) or config.num_attention_heads
+    head_dim = getattr(config, "head_dim", None) or config.hidden_size // config.num_attention_heads
+    dtype_size = torch.finfo(model.dtype).bits // 8 if model.dtype.is_floating_point else 4
+    return 2 * config.num_hidden_layers * heads * head_dim * dtype_size
@@ -0,0 +1,196 @@
+# ai_server/llm/streaming.py
+"""
+로컬 모델 토큰 스트리밍
+
+HuggingFacePipeline은 그래프에서 ainvoke로 호출되면 답변 전체를 생성한 뒤 한 번에 반환하므로,
+/stream에서도 첫 글자를 받기까지 답변 전체 생성 시간을 기다려야 했습니다.
+
+StreamingHuggingFacePipeline은 pipeline(generate)을 백그라운드 스레드에서 실행하고
+(Async)TextIteratorStreamer로 디코딩된 텍스트를 받는 즉시 on_llm_new_token 콜백으로 넘깁니다.
+astream_events에서는 on_llm_stream 이벤트가 되어 토큰 단위로 SSE까지 전달되고,
+첫 토큰까지의 시간이 프롬프트 프리필 시간으로 줄어듭니다.
+"""
+
+import logging
+import threading
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import torch
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from langchain_huggingface import HuggingFacePipeline
+from transformers import AsyncTextIteratorStreamer, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+logger = logging.getLogger("LLM_Streaming")
+
+
+class StopMatcher:
+    """스트리밍 텍스트에서 stop 문자열을 찾아 그 앞까지만 내보냅니다."""
+
+    def __init__(self, stop: Optional[List[str]]):
+        self.stop = [s for s in (stop or []) if s]
+        self.keep = max((len(s) for s in self.stop), default=1) - 1
+        self.buffer = ""
+
+    def feed(self, text: str):
+        if not self.stop:
+            return text, False
+        self.buffer += text
+        positions = [self.buffer.find(s) for s in self.stop if s in self.buffer]
+        if positions:
+            return self.buffer[:min(positions)], True
+        # stop 문자열이 조각 경계에 걸칠 수 있으므로 끝부분은 남겨 둠
+        cut = max(0, len(self.buffer) - self.keep)
+        out, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return out, False
+
+    def flush(self) -> str:
+        """생성이 끝났을 때 남겨 둔 끝부분을 반환합니다."""
+        out, self.buffer = self.buffer, ""
+        return out
+
+
+class _CancelCriteria(StoppingCriteria):
+    """소비하는 쪽이 중간에 멈추면(stop 문자열, 클라이언트 연결 끊김) 다음 토큰에서 generate를 끝냄"""
+
+    def __init__(self, cancelled: threading.Event):
+        self.cancelled = cancelled
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.cancelled.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+class _TokenStreamerMixin:
+    """
+    TextStreamer는 공백/줄바꿈(또는 한자)이 나올 때까지 텍스트를 모아 두었다가 내보내므로
+    (한글은 한자 범위에 포함되지 않아 어절 단위로 늦게 전달됨) 토큰마다 바로 내보내도록 바꿉니다.
+    여러 토큰에 걸친 글자는 완성될 때까지(디코딩 결과가 "\ufffd"로 끝나지 않을 때까지) 보류합니다.
+    """
+
+    def put(self, value):
+        if len(value.shape) > 1:
+            value = value[0]
+        if self.skip_prompt and self.next_tokens_are_prompt:
+            self.next_tokens_are_prompt = False
+            return
+
+        self.token_cache.extend(value.tolist())
+        text = self.tokenizer.decode(self.token_cache, **self.decode_kwargs)
+        if text.endswith("\ufffd"):
+            return
+        printable_text = text[self.print_len:]
+        if text.endswith("\n"):
+            # 줄 단위로 캐시를 비워 매번 다시 디코딩하는 길이를 제한 (TextStreamer와 동일)
+            self.token_cache = []
+            self.print_len = 0
+        else:
+            self.print_len = len(text)
+        if printable_text:
+            self.on_finalized_text(printable_text)
+
+
+class _TokenIteratorStreamer(_TokenStreamerMixin, TextIteratorStreamer):
+    pass
+
+
+class _AsyncTokenIteratorStreamer(_TokenStreamerMixin, AsyncTextIteratorStreamer):
+    pass
+
+
+class StreamingHuggingFacePipeline(HuggingFacePipeline):
+    """invoke/ainvoke도 내부적으로 스트리밍해 생성되는 토큰마다 콜백을 호출하는 HuggingFacePipeline"""
+
+    def _start(self, prompt: str, streamer, cancelled: threading.Event, **kwargs) -> list:
+        """generate를 백그라운드 스레드에서 시작합니다. 실패하면 반환한 리스트에 예외를 담고 스트리머를 닫습니다."""
+        errors = []
+
+        def run():
+            try:
+                self.pipeline(
+                    prompt,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_CancelCriteria(cancelled)]),
+                    **kwargs.get("pipeline_kwargs", {}),
+                )
+            except Exception as e:
+                logger.error(f"스트리밍 생성 실패: {e}")
+                errors.append(e)
+                # 소비하는 쪽이 영원히 기다리지 않도록 종료 신호
+                streamer.end()
+
+        threading.Thread(target=run, name="llm-generate", daemon=True).start()
+        return errors
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        streamer = _TokenIteratorStreamer(self.pipeline.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancelled = threading.Event()
+        errors = self._start(prompt, streamer, cancelled, **kwargs)
+        matcher = StopMatcher(stop)
+        try:
+            for text in streamer:
+                text, stopped = matcher.feed(text)
+                if text:
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+                if stopped:
+                    break
+            else:
+                if errors:
+                    raise errors[0]
+                text = matcher.flush()
+                if text:
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+        finally:
+            cancelled.set()
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        # 생성 스레드가 현재 이벤트 루프의 큐에 텍스트를 넣어 줌 (토큰마다 스레드 전환 없음)
+        streamer = _AsyncTokenIteratorStreamer(self.pipeline.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        cancelled = threading.Event()
+        errors = self._start(prompt, streamer, cancelled, **kwargs)
+        matcher = StopMatcher(stop)
+        try:
+            async for text in streamer:
+                text, stopped = matcher.feed(text)
+                if text:
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+                if stopped:
+                    break
+            else:
+                if errors:
+                    raise errors[0]
+                text = matcher.flush()
+                if text:
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+        finally:
+            cancelled.set()
+
+    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> LLMResult:
+        generations = []
+        for prompt in prompts:
+            text = "".join(chunk.text for chunk in self._stream(prompt, stop=stop, run_manager=run_manager, **kwargs))
+            generations.append([Generation(text=text)])
+        return LLMResult(generations=generations)
+
+    async def _agenerate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> LLMResult:
+        generations = []
+        for prompt in prompts:
+            chunks = [chunk.text async for chunk in self._astream(prompt, stop=stop, run_manager=run_manager, **kwargs)]
+            generations.append([Generation(text="".join(chunks))])
+        return LLMResult(generations=generations)
@@ -1,26 +1,52 @@
 # ai_server/main.py
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 import uvicorn
+import asyncio
 import logging
 import re
 import json
-from langchain_core.messages import HumanMessage
+from contextlib import asynccontextmanager
+from typing import Optional
+from langchain_core.messages import HumanMessage, AIMessage
 
 # [핵심] 우리가 만든 그래프 가져오기
-from bot_graph import app_graph
+from bot_graph import app_graph, history
+from checkpointer import checkpointer
+from semantic_cache import create_semantic_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("AI_Server")
 
-app = FastAPI(title="MapleStory AI Server (LangGraph)")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 대화 기억을 SQLite 저장소로 전환하고, 오래된 대화를 주기적으로 정리
+    await checkpointer.open()
+    sweeper = asyncio.create_task(checkpointer.run_sweeper())
+    yield
+    sweeper.cancel()
+    await checkpointer.close()
+
+app = FastAPI(title="MapleStory AI Server (LangGraph)", lifespan=lifespan)
+
+# 표현만 다른 같은 질문에 그래프 실행 없이 답하는 캐시 (비활성화 시 None)
+semantic_cache = create_semantic_cache()
 
 # 요청 데이터 모델 (session_id 추가됨!)
 class QueryRequest(BaseModel):
     session_id: str
     message: str
+    # RAG 문서 버전 (시맨틱 캐시 범위, 없으면 캐시를 사용하지 않음)
+    corpus_version: Optional[str] = None
+
+# 캐시 등으로 그래프를 거치지 않고 응답한 대화를 기록할 때 사용
+class HistoryRequest(BaseModel):
+    session_id: str
+    message: str
+    response: str
 
 def parse_thinking_response(text: str):
     """
@@ -42,13 +68,76 @@ def parse_thinking_response(text: str):
     else:
         return "", text.strip()
 
+async def _record_history(config: dict, message: str, response: str):
+    """그래프를 실행하지 않고 질문/답변 한 쌍을 대화 기억(thread)에 추가합니다."""
+    # generate_node가 답변을 만든 것처럼 기록하면 다음 실행은 다시 START부터 시작됨
+    await app_graph.aupdate_state(
+        config,
+        {"messages": [HumanMessage(content=message), AIMessage(content=response)]},
+        as_node="generate_node",
+    )
+
+async def _refresh_history(config: dict):
+    """
+    대화가 길어졌으면 오래된 턴을 대화 요약에 합쳐 GraphState(summary, summarized)에 저장합니다. (history.py)
+    응답을 보낸 뒤 백그라운드로 실행하므로 답변 지연에 포함되지 않습니다.
+    """
+    try:
+        state = await app_graph.aget_state(config)
+        update = await history.arefresh(config, state.values)
+        if update:
+            # messages는 건드리지 않으므로 요약하는 동안 추가된 대화도 그대로 유지됨
+            await app_graph.aupdate_state(config, update, as_node="generate_node")
+    except Exception as e:
+        logger.warning(f"대화 요약 저장 실패: {e}")
+
+async def _semantic_lookup(request: QueryRequest, config: dict):
+    """
+    세션의 첫 질문이면 시맨틱 캐시를 조회합니다. 적중하면 대화 기억에도 기록합니다.
+    (이어지는 질문은 앞선 대화 맥락에 따라 답이 달라지므로 캐시를 사용하지 않음)
+
+    Returns:
+        tuple: (질문 벡터, 캐시 항목) - 벡터는 답변 생성 후 캐시 저장에 사용하며,
+               캐시 대상이 아닌 요청이면 (None, None)
+    """
+    if semantic_cache is None or not request.corpus_version:
+        return None, None
+    try:
+        state = await app_graph.aget_state(config)
+        if state.values.get("messages"):
+            return None, None
+        vector = await semantic_cache.aembed(request.message)
+        hit = semantic_cache.lookup(vector, request.corpus_version)
+    except Exception as e:
+        logger.warning(f"시맨틱 캐시 조회 실패: {e}")
+        return None, None
+
+    if hit:
+        logger.info(f"시맨틱 캐시 적중 (유사도 {hit['similarity']:.3f}): {hit['question']}")
+        try:
+            await _record_history(config, request.message, hit["response"])
+        except Exception as e:
+            logger.warning(f"캐시 응답의 대화 기록 추가 실패: {e}")
+    return vector, hit
+
+def _semantic_store(request: QueryRequest, vector, answer: str, thinking: str):
+    if vector is not None:
+        semantic_cache.put(vector, request.corpus_version, request.message, answer, thinking)
+
 @app.post("/generate")
-async def generate_response(request: QueryRequest):
+async def generate_response(request: QueryRequest, background_tasks: BackgroundTasks):
     try:
         logger.info(f"요청 수신 (Session: {request.session_id}): {request.message}")
         
         # 1. LangGraph 설정 (thread_id = session_id)
         config = {"configurable": {"thread_id": request.session_id}}
+
+        vector, hit = await _semantic_lookup(request, config)
+        if hit:
+            return {
+                "response": hit["response"],
+                "thinking": hit["thinking"]
+            }
         
         # 2. 그래프 실행
         # 사용자의 질문을 HumanMessage 형태로 주입
@@ -64,6 +153,8 @@ async def generate_response(request: QueryRequest):
         # 3. 결과 파싱
         ai_full_response = output["messages"][-1].content
         thinking, answer = parse_thinking_response(ai_full_response)
+        _semantic_store(request, vector, answer, thinking)
+        background_tasks.add_task(_refresh_history, config)
         
         return {
             "response": answer,
@@ -74,11 +165,43 @@ async def generate_response(request: QueryRequest):
         logger.error(f"에러 발생: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/history")
+async def append_history(request: HistoryRequest, background_tasks: BackgroundTasks):
+    """
+    그래프를 실행하지 않고 질문/답변 한 쌍을 대화 기억(thread)에 추가합니다.
+    (Django 답변 캐시로 응답한 경우, 다음 질문에서 맥락을 이어가기 위해 호출)
+    """
+    try:
+        config = {"configurable": {"thread_id": request.session_id}}
+        await _record_history(config, request.message, request.response)
+        background_tasks.add_task(_refresh_history, config)
+        return {"status": "ok"}
+    except Exception as e:
+        logger.error(f"대화 기록 추가 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """
+    세션의 대화 기억(thread)을 삭제합니다.
+    (Django에서 채팅 세션을 삭제할 때 호출)
+    """
+    try:
+        await checkpointer.adelete_thread(session_id)
+        logger.info(f"대화 기억 삭제 (Session: {session_id})")
+        return {"status": "deleted", "session_id": session_id}
+    except Exception as e:
+        logger.error(f"대화 기억 삭제 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/stream")
 async def stream_response(request: QueryRequest):
     """
     스트리밍 답변 생성 엔드포인트
     SSE(Server-Sent Events) 형식으로 데이터를 전송합니다.
+
+    토큰(token) 이벤트를 모두 보낸 뒤, [DONE] 직전에 최종 답변과 사고 과정을 담은
+    요약(summary) 이벤트를 한 번 보냅니다. Django는 이 이벤트만 읽어 DB에 저장합니다.
     """
     try:
         logger.info(f"스트리밍 요청 수신 (Session: {request.session_id}): {request.message}")
@@ -86,7 +209,20 @@ async def stream_response(request: QueryRequest):
         config = {"configurable": {"thread_id": request.session_id}}
         input_message = HumanMessage(content=request.message)
 
+        vector, hit = await _semantic_lookup(request, config)
+        if hit:
+            async def cached_generator():
+                payload = {"type": "token", "content": hit["response"]}
+                yield f"data: {json.dumps(payload)}\n\n"
+                payload = {"type": "summary", "response": hit["response"], "thinking": hit["thinking"]}
+                yield f"data: {json.dumps(payload)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(cached_generator(), media_type="text/event-stream")
+
         async def event_generator():
+            full_text = []
+            failed = False
             try:
                 # astream_events를 사용하여 생성 과정을 실시간으로 스트리밍
                 # version="v2"는 LangChain 최신 표준 (권장)
@@ -97,29 +233,45 @@ async def stream_response(request: QueryRequest):
                 ):
                     event_type = event["event"]
                     
-                    # LLM이 텍스트를 생성하는 이벤트 (on_chat_model_stream)
-                    if event_type == "on_chat_model_stream":
+                    # LLM이 텍스트를 생성하는 이벤트
+                    # - on_chat_model_stream: 채팅 모델(Gemini), chunk는 AIMessageChunk
+                    # - on_llm_stream: 로컬 모델(스트리밍 파이프라인/배칭 엔진), chunk는 GenerationChunk
+                    if event_type in ("on_chat_model_stream", "on_llm_stream"):
                         # 메타데이터에서 현재 실행 중인 노드 이름을 확인
                         node_name = event.get("metadata", {}).get("langgraph_node", "")
                         
                         # "generate_node" 또는 "generate_chat" 노드에서 나온 출력만 전송
-                        # (route_question, rewrite_query 등의 중간 과정 토큰은 숨김)
+                        # (route 노드의 라우팅/질문 재구성 등 중간 과정 토큰은 숨김)
                         if node_name in ["generate_node", "generate_chat", "generate_chat_node"]:
                             chunk = event["data"]["chunk"]
-                            if chunk.content:
+                            content = chunk.content if event_type == "on_chat_model_stream" else chunk.text
+                            if content:
+                                full_text.append(content)
                                 # SSE 포맷: data: JSON\n\n
-                                payload = {"type": "token", "content": chunk.content}
+                                payload = {"type": "token", "content": content}
                                 yield f"data: {json.dumps(payload)}\n\n"
                             
             except Exception as e:
                 logger.error(f"스트리밍 중 에러: {e}")
+                failed = True
                 payload = {"type": "error", "content": str(e)}
                 yield f"data: {json.dumps(payload)}\n\n"
+
+            # 최종 답변 요약 (스트리밍된 토큰 전체에서 thinking과 답변을 분리)
+            thinking, answer = parse_thinking_response("".join(full_text))
+            if not failed:
+                _semantic_store(request, vector, answer, thinking)
+            # ok: 중간에 오류 없이 끝까지 생성했는지 (Django는 완료된 답변만 답변 캐시에 저장)
+            payload = {"type": "summary", "response": answer, "thinking": thinking, "ok": not failed}
+            yield f"data: {json.dumps(payload)}\n\n"
             
             # 종료 신호
             yield "data: [DONE]\n\n"
 
-        return StreamingResponse(event_generator(), media_type="text/event-stream")
+        # 스트림을 모두 보낸 뒤 대화 요약 갱신
+        return StreamingResponse(
+            event_generator(), media_type="text/event-stream", background=BackgroundTask(_refresh_history, config)
+        )
 
     except Exception as e:
         logger.error(f"스트리밍 시작 실패: {e}")
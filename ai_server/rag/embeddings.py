@@ -8,6 +8,7 @@ from langchain_core.embeddings import Embeddings
 from sentence_transformers import SentenceTransformer
 import torch
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -50,3 +51,20 @@ class QwenEmbeddings(Embeddings):
             normalize_embeddings=True
         )
         return embedding.tolist()
+
+
+_shared_embeddings = None
+_shared_lock = threading.Lock()
+
+
+def get_embeddings() -> QwenEmbeddings:
+    """
+    프로세스 공용 임베딩 모델을 반환합니다.
+    벡터 저장소와 시맨틱 캐시가 같은 모델을 사용하므로 한 번만 로드합니다.
+    """
+    global _shared_embeddings
+    if _shared_embeddings is None:
+        with _shared_lock:
+            if _shared_embeddings is None:
+                _shared_embeddings = QwenEmbeddings()
+    return _shared_embeddings
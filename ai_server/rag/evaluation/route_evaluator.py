@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+try:
+    from ...router import FastRouter, normalize
+except ImportError:
+    # For running as script directly
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from router import FastRouter, normalize
+
+
+class RouteEvaluator:
+    """
+    빠른 라우터(ai_server/router.py)의 정확도와 지연 시간을 라벨 데이터(route_testset.json)로 측정합니다.
+    --with-llm 옵션을 주면 확신도가 낮아 LLM으로 넘어간 질문을 실제 LLM으로 판단해
+    전체 정확도와 LLM 호출 지연 시간도 함께 측정합니다.
+    """
+
+    def __init__(self, router: FastRouter, llm_route=None):
+        self.router = router
+        self.llm_route = llm_route
+
+    def run_batch(self, testset_path: str, repeat: int = 200):
+        with open(testset_path, 'r', encoding='utf-8') as f:
+            testset = json.load(f)
+
+        results = []
+        for item in testset:
+            decision = self.router.route(item['question'])
+            p_search = self.router.search_probability(normalize(item['question']))
+            results.append({
+                "question": item['question'],
+                "label": item['route'],
+                "decision": decision,
+                "classifier": "search" if p_search >= 0.5 else "chat",
+            })
+
+        # 지연 시간: 질문별로 repeat회 실행한 평균 (ms)
+        latencies = []
+        for item in testset:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                self.router.route(item['question'])
+            latencies.append((time.perf_counter() - start) * 1000 / repeat)
+
+        llm_latencies = []
+        if self.llm_route is not None:
+            for result in results:
+                if result['decision'].route is None:
+                    start = time.perf_counter()
+                    result['llm'] = self.llm_route(result['question'])
+                    llm_latencies.append((time.perf_counter() - start) * 1000)
+
+        return results, latencies, llm_latencies
+
+
+def make_llm_route():
+    """그래프와 같은 프롬프트로 LLM 라우팅 함수를 만듭니다. (LLM_PROVIDER 설정을 따름)"""
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from llm.factory import LLMFactory
+    from prompt import GEMINI_ROUTE_SYSTEM, LOCAL_ROUTE_HUMAN, LOCAL_ROUTE_SYSTEM
+
+    if os.getenv("LLM_PROVIDER", "local").lower() == "gemini":
+        messages = [("system", GEMINI_ROUTE_SYSTEM), ("human", "{question}")]
+    else:
+        messages = [("system", LOCAL_ROUTE_SYSTEM), ("human", LOCAL_ROUTE_HUMAN)]
+    chain = ChatPromptTemplate.from_messages(messages) | LLMFactory.get_llm() | StrOutputParser()
+
+    def llm_route(question):
+        return "search" if "search" in chain.invoke({"question": question}).strip().lower() else "chat"
+    return llm_route
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="빠른 라우터 정확도/지연 시간 평가")
+    parser.add_argument("--testset", default=os.path.join(current_dir, "route_testset.json"))
+    parser.add_argument("--with-llm", action="store_true", help="LLM으로 넘어간 질문을 실제 LLM으로 판단")
+    parser.add_argument("--repeat", type=int, default=200, help="지연 시간 측정 반복 횟수")
+    args = parser.parse_args()
+
+    router = FastRouter.from_file()
+    evaluator = RouteEvaluator(router, make_llm_route() if args.with_llm else None)
+    results, latencies, llm_latencies = evaluator.run_batch(args.testset, args.repeat)
+
+    total = len(results)
+    decided = [r for r in results if r['decision'].route is not None]
+    fallback = [r for r in results if r['decision'].route is None]
+    correct = sum(r['decision'].route == r['label'] for r in decided)
+
+    print("\n" + "=" * 50)
+    print(" [빠른 라우터 평가 결과] ")
+    print("=" * 50)
+    print(f"테스트 질문: {total}개 (search {sum(r['label'] == 'search' for r in results)}, "
+          f"chat {sum(r['label'] == 'chat' for r in results)})")
+    for source in ("keyword", "classifier", "fallback"):
+        group = [r for r in results if r['decision'].source == source]
+        if source == "fallback":
+            print(f"  - LLM 위임: {len(group)}개 ({len(group) / total:.1%})")
+        else:
+            hits = sum(r['decision'].route == r['label'] for r in group)
+            accuracy = f"{hits / len(group):.1%}" if group else "-"
+            print(f"  - {source}: {len(group)}개, 정확도 {accuracy}")
+    print(f"빠른 라우터가 결정한 질문 정확도: {correct}/{len(decided)} "
+          f"({correct / len(decided) if decided else 0:.1%})")
+    classifier_correct = sum(r['classifier'] == r['label'] for r in results)
+    print(f"분류기 단독 정확도 (규칙/임계값 없이): {classifier_correct}/{total} ({classifier_correct / total:.1%})")
+    print(f"지연 시간: 평균 {statistics.mean(latencies):.3f}ms, p50 {_percentile(latencies, 0.5):.3f}ms, "
+          f"p99 {_percentile(latencies, 0.99):.3f}ms, 최대 {max(latencies):.3f}ms")
+
+    if args.with_llm:
+        overall = correct + sum(r.get('llm') == r['label'] for r in fallback)
+        print(f"LLM 위임 포함 전체 정확도: {overall}/{total} ({overall / total:.1%})")
+        if llm_latencies:
+            print(f"LLM 라우팅 지연 시간: 평균 {statistics.mean(llm_latencies):.1f}ms, "
+                  f"p50 {_percentile(llm_latencies, 0.5):.1f}ms")
+
+    wrong = [r for r in decided if r['decision'].route != r['label']]
+    if wrong:
+        print("\n[오분류]")
+        for r in wrong:
+            print(f"  {r['question']} -> {r['decision'].route} ({r['decision'].source}, "
+                  f"{r['decision'].confidence:.2f}) / 정답 {r['label']}")
+    if fallback:
+        print("\n[LLM 위임]")
+        for r in fallback:
+            print(f"  {r['question']} (확신도 {r['decision'].confidence:.2f}) / 정답 {r['label']}")
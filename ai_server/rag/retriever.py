@@ -5,6 +5,7 @@
 Vector Store(의미 검색)와 BM25(키워드 검색)를 결합한 Hybrid Search를 구현합니다.
 """
 
+import asyncio
 import logging
 import sys
 import os
@@ -148,6 +149,13 @@ class Retriever:
             logger.error(f"검색 실행 오류: {e}")
             return []
 
+    async def aretrieve(self, query: str) -> List[Document]:
+        """
+        retrieve의 비동기 버전
+        BM25 점수 계산과 pgvector 조회는 동기 작업이므로 스레드에서 실행해 이벤트 루프를 막지 않습니다.
+        """
+        return await asyncio.to_thread(self.retrieve, query)
+
 # --- 테스트 실행 코드 ---
 if __name__ == "__main__":
     test_query = "메이플스토리 크리스마스 이벤트"
@@ -17,13 +17,13 @@ dotenv.load_dotenv()
 #기존 모듈
 #기존 모듈
 try:
-    from .embeddings import QwenEmbeddings
+    from .embeddings import get_embeddings
     from .document_loader import DocumentLoader
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-    from ai_server.rag.embeddings import QwenEmbeddings
+    from ai_server.rag.embeddings import get_embeddings
     from ai_server.rag.document_loader import DocumentLoader
 
 logger = logging.getLogger(__name__)
@@ -36,7 +36,7 @@ def get_vectorstore():
     """
     pgvector 저장소 객체를 가져오는 함수
     """
-    embedding_model = QwenEmbeddings()
+    embedding_model = get_embeddings()
 
     vectorstore = PGVector(
         embeddings=embedding_model,
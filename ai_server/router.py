@@ -0,0 +1,206 @@
+# ai_server/router.py
+"""
+빠른 질문 라우터 (search / chat)
+
+그래프의 route_question이 매 질문마다 LLM을 한 번 호출해 검색 여부를 판단하던 것을
+CPU에서 1ms 안에 끝나는 두 단계 판단으로 대체합니다.
+
+1. 키워드/의도 규칙: 게임 용어(search) 또는 인사/감사 등 일상 대화 패턴(chat) 중
+   한쪽만 해당하면 바로 결정
+2. 분류기: 글자 n-gram을 해싱한 특징 벡터에 대한 로지스틱 회귀
+   (router_data.json의 라벨 데이터로 서버 시작 시 numpy로 학습, 1초 미만)
+
+분류기 확신도가 FAST_ROUTER_CONFIDENCE 미만이면 route=None을 반환하고,
+그래프는 기존처럼 LLM에게 판단을 맡깁니다.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("FastRouter")
+
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "true").lower() == "true"
+# 분류기 결과를 그대로 쓰는 최소 확률 (미만이면 LLM으로 판단)
+FAST_ROUTER_CONFIDENCE = float(os.getenv("FAST_ROUTER_CONFIDENCE", "0.8"))
+
+ROUTER_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "router_data.json")
+
+# 해싱 특징 차원 (2^14) 및 글자 n-gram 범위
+FEATURE_DIM = 1 << 14
+NGRAM_RANGE = (1, 3)
+
+# 질문에 포함되면 게임 정보 검색이 필요한 단어
+SEARCH_KEYWORDS = (
+    "이벤트", "보스", "아이템", "스킬", "직업", "전직", "메소", "패치", "업데이트", "점검",
+    "공지", "보상", "쿠폰", "스타포스", "큐브", "잠재", "에디셔널", "강화", "주문서", "사냥터",
+    "레벨업", "퀘스트", "몬스터", "유니온", "심볼", "어센틱", "아케인", "링크", "코어", "경험치",
+    "경매장", "캐시샵", "코디", "펫", "랭킹", "길드", "하이퍼", "6차", "5차", "헥사", "몬컬",
+    "컨텐츠", "콘텐츠", "시즌", "버닝", "챌린저스", "초기화", "세트", "장비", "무기", "보조무기",
+)
+# 전체 질문이 이 패턴이면 일상 대화
+CHAT_PATTERNS = re.compile(
+    r"^(안녕|하이|ㅎㅇ|hi|hello|반가워|반갑|고마워|고맙|감사|땡큐|ㄱㅅ|잘\s?자|굿\s?나잇|바이|ㅂㅂ|"
+    r"잘\s?가|ㅋ+|ㅎ+|ㅠ+|ㅜ+|심심|배고파|졸려|피곤|사랑해|좋아해|너\s?(는|가)?\s?누구|넌\s?누구|"
+    r"이름이\s?뭐|뭐\s?해|오늘\s?날씨)"
+)
+
+
+@dataclass
+class RouteDecision:
+    route: Optional[str]   # "search" / "chat" / None (확신도가 낮아 LLM 판단 필요)
+    confidence: float      # 결정한 경로의 확률 (규칙으로 결정하면 1.0)
+    source: str            # "keyword" / "classifier" / "fallback"
+
+
+_space_re = re.compile(r"\s+")
+_think_re = re.compile(r"<think>.*?(</think>|$)", re.DOTALL)
+_json_object_re = re.compile(r"\{.*?\}", re.DOTALL)
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _space_re.sub(" ", text).strip()
+
+
+def _feature_indices(text: str) -> np.ndarray:
+    """글자 n-gram(공백 포함, 양끝 경계 표시)을 해싱한 특징 인덱스 (중복 포함)"""
+    padded = f"^{text}$"
+    indices = []
+    for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+        for i in range(len(padded) - n + 1):
+            indices.append(zlib.crc32(padded[i:i + n].encode("utf-8")) & (FEATURE_DIM - 1))
+    return np.asarray(indices, dtype=np.int64)
+
+
+class FastRouter:
+    def __init__(self, confidence: float = FAST_ROUTER_CONFIDENCE):
+        self.confidence = confidence
+        self.weights = np.zeros(FEATURE_DIM, dtype=np.float64)
+        self.bias = 0.0
+
+    # ------------------------------------------------------------------
+    # 학습
+    # ------------------------------------------------------------------
+    def fit(self, questions: List[str], routes: List[str], epochs: int = 1000, lr: float = 2.0, l2: float = 1e-4):
+        """
+        로지스틱 회귀를 전체 배치 경사하강법으로 학습합니다.
+        학습 데이터에 실제로 나타난 특징 열만 사용하므로 수백 건 기준 수백 ms 안에 끝납니다.
+        """
+        rows = [_feature_indices(normalize(question)) for question in questions]
+        columns = np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+        x = np.zeros((len(rows), len(columns)), dtype=np.float64)
+        for row, indices in enumerate(rows):
+            if len(indices):
+                np.add.at(x[row], np.searchsorted(columns, indices), 1.0)
+                x[row] /= np.linalg.norm(x[row])
+        y = np.asarray([1.0 if route == "search" else 0.0 for route in routes])
+
+        w = np.zeros(len(columns))
+        b = 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ w + b)))
+            error = p - y
+            w -= lr * (x.T @ error / len(y) + l2 * w)
+            b -= lr * float(error.mean())
+
+        # 학습에 없던 특징의 가중치는 0
+        self.weights = np.zeros(FEATURE_DIM, dtype=np.float64)
+        self.weights[columns] = w
+        self.bias = b
+        return self
+
+    @classmethod
+    def from_file(cls, path: str = ROUTER_DATA_PATH, **kwargs) -> "FastRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        start = time.perf_counter()
+        router = cls(**kwargs).fit([item["question"] for item in data], [item["route"] for item in data])
+        logger.info(f"빠른 라우터 학습 완료 (예시 {len(data)}개, {(time.perf_counter() - start) * 1000:.0f}ms)")
+        return router
+
+    # ------------------------------------------------------------------
+    # 판단
+    # ------------------------------------------------------------------
+    def keyword_route(self, text: str) -> Optional[str]:
+        """규칙으로 판단할 수 있으면 "search"/"chat", 아니면 None"""
+        is_search = any(keyword in text for keyword in SEARCH_KEYWORDS)
+        is_chat = CHAT_PATTERNS.match(text) is not None
+        if is_search != is_chat:
+            return "search" if is_search else "chat"
+        return None
+
+    def search_probability(self, text: str) -> float:
+        indices = _feature_indices(text)
+        if not len(indices):
+            return 0.5
+        # 정규화된 희소 벡터와 가중치의 내적 (같은 n-gram은 개수만큼 더해짐)
+        unique, counts = np.unique(indices, return_counts=True)
+        score = float(self.weights[unique] @ counts) / float(np.sqrt(counts @ counts)) + self.bias
+        return 1.0 / (1.0 + np.exp(-score))
+
+    def route(self, question: str) -> RouteDecision:
+        text = normalize(question)
+        keyword = self.keyword_route(text)
+        if keyword is not None:
+            return RouteDecision(keyword, 1.0, "keyword")
+
+        p_search = self.search_probability(text)
+        route = "search" if p_search >= 0.5 else "chat"
+        confidence = p_search if route == "search" else 1.0 - p_search
+        if confidence >= self.confidence:
+            return RouteDecision(route, confidence, "classifier")
+        return RouteDecision(None, confidence, "fallback")
+
+
+def parse_route_rewrite(text: str, question: str):
+    """
+    라우팅/질문 재구성 통합 LLM 출력({"route": ..., "query": ...})을 파싱합니다.
+    JSON 형식이 어긋나면 route는 "search" 포함 여부로, query는 원래 질문으로 대신합니다.
+
+    Returns:
+        tuple: (route, query)
+    """
+    text = _think_re.sub("", text or "").strip()
+    match = _json_object_re.search(text)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            route = "chat" if str(data.get("route", "")).strip().lower() == "chat" else "search"
+            return route, str(data.get("query") or "").strip() or question
+        except (ValueError, AttributeError):
+            pass
+    return ("search" if "search" in text.lower() else "chat"), question
+
+
+def create_fast_router() -> Optional[FastRouter]:
+    """환경 변수 설정으로 빠른 라우터를 만듭니다. 비활성화되어 있거나 학습 데이터가 없으면 None을 반환합니다."""
+    if not FAST_ROUTER_ENABLED:
+        logger.info("빠른 라우터 비활성화 (FAST_ROUTER_ENABLED=false), 모든 질문을 LLM으로 라우팅합니다.")
+        return None
+    try:
+        return FastRouter.from_file()
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"빠른 라우터 학습 데이터 로드 실패, LLM 라우팅을 사용합니다: {e}")
+        return None
+
+
+# --- 테스트 실행 코드 ---
+if __name__ == "__main__":
+    router = FastRouter.from_file()
+    for question in ["안녕 돌의정령!", "이번 겨울 이벤트 언제까지야?", "200 이후로 어디서 사냥해?", "오늘 기분 어때?"]:
+        start = time.perf_counter()
+        decision = router.route(question)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{question} -> {decision.route} ({decision.source}, {decision.confidence:.2f}, {elapsed:.3f}ms)")
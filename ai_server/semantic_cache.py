@@ -0,0 +1,160 @@
+# ai_server/semantic_cache.py
+"""
+의미 기반 답변 캐시 (Semantic Cache)
+
+최근에 답변한 질문과 의미가 같은 질문(표현만 다른 질문)이 들어오면
+LangGraph(라우팅/검색/생성)를 실행하지 않고 캐시된 답변을 반환합니다.
+
+- 질문을 QwenEmbeddings(검색용 임베딩과 같은 모델)로 정규화 벡터로 만들고,
+  캐시된 질문 벡터들과의 내적(= 코사인 유사도)이 임계값 이상인 가장 가까운 항목을 사용
+- 인덱스는 고정 크기 numpy 행렬(최대 SEMANTIC_CACHE_MAX_SIZE개)에 대한 전체 내적 검색으로,
+  수천 개 규모에서는 행렬곱 한 번(1ms 미만)이라 별도 ANN 라이브러리 없이 정확한 최근접을 찾음
+- 항목은 코퍼스 버전(Django가 요청에 담아 보내는 RAG 문서 버전)별로 유효하며,
+  버전이 바뀌면 캐시 전체를 비움
+- TTL이 지난 항목은 검색에서 제외되고, 가득 차면 가장 오래 사용하지 않은 항목부터 교체(LRU)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("SemanticCache")
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+# 표현만 다른 같은 질문으로 볼 코사인 유사도 (낮추면 적중률이 오르지만 다른 질문에 같은 답을 줄 위험이 커짐)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "600"))
+SEMANTIC_CACHE_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_MAX_SIZE", "2000"))
+
+
+class SemanticCache:
+    def __init__(self, embeddings, threshold=SEMANTIC_CACHE_THRESHOLD,
+                 ttl=SEMANTIC_CACHE_TTL, max_size=SEMANTIC_CACHE_MAX_SIZE):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+
+        self._lock = threading.Lock()
+        self._version = None
+        # 슬롯 번호 : 캐시 항목 (순서 = LRU, 앞쪽이 가장 오래 사용하지 않은 항목)
+        self._entries = OrderedDict()
+        self._free_slots = list(range(self.max_size - 1, -1, -1))
+        self._vectors = None  # (max_size, dim) float32, 첫 저장 시 임베딩 차원에 맞춰 생성
+        self._expires_at = np.zeros(self.max_size)  # 빈 슬롯은 0 (항상 만료 상태)
+
+    def embed(self, text: str) -> np.ndarray:
+        """질문을 정규화된 임베딩 벡터로 변환합니다."""
+        vector = np.asarray(self.embeddings.embed_query(text.strip()), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """embed의 비동기 버전 (임베딩 계산 동안 이벤트 루프를 막지 않도록 스레드에서 실행)"""
+        return await asyncio.to_thread(self.embed, text)
+
+    def lookup(self, vector: np.ndarray, corpus_version: str):
+        """
+        가장 유사한 캐시 항목의 답변을 반환합니다. 임계값 미만이거나 없으면 None을 반환합니다.
+
+        Returns:
+            dict: {"response": str, "thinking": str, "question": str, "similarity": float}
+        """
+        with self._lock:
+            self._sync_version(corpus_version)
+            if not self._entries:
+                return None
+
+            scores = self._vectors @ vector
+            scores[self._expires_at <= time.monotonic()] = -np.inf
+            slot = int(np.argmax(scores))
+            similarity = float(scores[slot])
+            if similarity < self.threshold:
+                return None
+
+            self._entries.move_to_end(slot)
+            return {**self._entries[slot], "similarity": similarity}
+
+    def put(self, vector: np.ndarray, corpus_version: str, question: str, response: str, thinking: str = ""):
+        """답변을 캐시에 저장합니다. 빈 답변은 저장하지 않습니다."""
+        if not response:
+            return
+        with self._lock:
+            self._sync_version(corpus_version)
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._reset(dim=vector.shape[0])
+
+            # 거의 같은 질문이 이미 있으면 그 슬롯을 갱신
+            slot = None
+            if self._entries:
+                scores = self._vectors @ vector
+                best = int(np.argmax(scores))
+                if best in self._entries and scores[best] >= self.threshold:
+                    slot = best
+            if slot is None:
+                slot = self._free_slots.pop() if self._free_slots else self._entries.popitem(last=False)[0]
+
+            self._vectors[slot] = vector
+            self._expires_at[slot] = time.monotonic() + self.ttl
+            self._entries[slot] = {"question": question, "response": response, "thinking": thinking or ""}
+            self._entries.move_to_end(slot)
+
+    def clear(self):
+        with self._lock:
+            self._reset(dim=None if self._vectors is None else self._vectors.shape[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            live = int(np.count_nonzero(self._expires_at > time.monotonic()))
+            return {"entries": live, "max_size": self.max_size, "corpus_version": self._version}
+
+    def _sync_version(self, corpus_version):
+        """코퍼스 버전이 바뀌었으면 캐시를 비웁니다. (_lock을 잡은 상태에서 호출)"""
+        if corpus_version != self._version:
+            if self._entries:
+                logger.info(f"코퍼스 버전 변경({self._version} -> {corpus_version}), 시맨틱 캐시를 비웁니다.")
+            self._reset(dim=None if self._vectors is None else self._vectors.shape[1])
+            self._version = corpus_version
+
+    def _reset(self, dim):
+        self._entries.clear()
+        self._free_slots = list(range(self.max_size - 1, -1, -1))
+        self._expires_at[:] = 0
+        # 빈 슬롯의 벡터는 0이므로 유사도 0으로 계산됨 (만료 처리로 어차피 제외)
+        self._vectors = None if dim is None else np.zeros((self.max_size, dim), dtype=np.float32)
+
+
+def create_semantic_cache():
+    """환경 변수 설정으로 시맨틱 캐시를 만듭니다. 비활성화되어 있으면 None을 반환합니다."""
+    if not SEMANTIC_CACHE_ENABLED:
+        logger.info("시맨틱 캐시 비활성화 (SEMANTIC_CACHE_ENABLED=false)")
+        return None
+    from rag.embeddings import get_embeddings
+    return SemanticCache(get_embeddings())
+
+
+# --- 테스트 실행 코드 ---
+if __name__ == "__main__":
+    from rag.embeddings import get_embeddings
+
+    cache = SemanticCache(get_embeddings())
+    cache.put(cache.embed("보스 초기화 시간이 언제야?"), "v1", "보스 초기화 시간이 언제야?",
+              "주간 보스는 매주 목요일 자정에 초기화됩니다.")
+
+    for question in ["보스 초기화는 언제 돼?", "주간 보스 리셋 시간 알려줘", "이번 이벤트 기간이 언제까지야?"]:
+        start = time.perf_counter()
+        vector = cache.embed(question)
+        hit = cache.lookup(vector, "v1")
+        elapsed = (time.perf_counter() - start) * 1000
+        similarity = float(cache._vectors[0] @ vector)
+        print(f"[{'HIT ' if hit else 'MISS'}] {question} (유사도 {similarity:.3f}, {elapsed:.1f}ms)")
+
+    print("코퍼스 버전 변경 후:", cache.lookup(cache.embed("보스 초기화 시간이 언제야?"), "v2"))
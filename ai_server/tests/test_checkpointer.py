@@ -0,0 +1,121 @@
+import os
+import tempfile
+import time
+import unittest
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from checkpointer import BoundedCheckpointer
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _reply(state: State):
+    return {"messages": [AIMessage(content=f"답변 {len(state['messages'])}")]}
+
+
+class BoundedCheckpointerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpointer = BoundedCheckpointer(path=os.path.join(directory.name, "checkpoints.sqlite"),
+                                                ttl=3600, max_threads=2)
+        await self.checkpointer.open()
+        self.addAsyncCleanup(self.checkpointer.close)
+
+        builder = StateGraph(State)
+        builder.add_node("reply", _reply)
+        builder.add_edge(START, "reply")
+        builder.add_edge("reply", END)
+        self.graph = builder.compile(checkpointer=self.checkpointer)
+
+    def _config(self, thread_id):
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def _chat(self, thread_id, turns=3):
+        for i in range(turns):
+            await self.graph.ainvoke({"messages": [HumanMessage(content=f"질문 {i}")]}, self._config(thread_id))
+
+    async def _query(self, sql, *params):
+        async with self.checkpointer._conn.execute(sql, params) as cur:
+            return await cur.fetchall()
+
+    async def _set_last_access(self, thread_id, seconds_ago):
+        await self.checkpointer._conn.execute(
+            "UPDATE thread_activity SET last_access = ? WHERE thread_id = ?", (time.time() - seconds_ago, thread_id))
+        await self.checkpointer._conn.commit()
+
+    async def _checkpoint_counts(self):
+        rows = await self._query(
+            "SELECT thread_id, checkpoint_ns, COUNT(*) FROM checkpoints GROUP BY thread_id, checkpoint_ns")
+        return {(thread_id, ns): count for thread_id, ns, count in rows}
+
+    async def test_sweep_expires_evicts_and_trims(self):
+        for thread_id in ("expired", "lru", "recent", "newest"):
+            await self._chat(thread_id)
+        await self._set_last_access("expired", 7200)
+        await self._set_last_access("lru", 300)
+        await self._set_last_access("recent", 200)
+        await self._set_last_access("newest", 100)
+        self.assertGreater((await self._checkpoint_counts())[("recent", "")], 1)
+
+        result = await self.checkpointer.sweep()
+
+        self.assertEqual(result, {"expired": 1, "evicted": 1, "trimmed": 2})
+        self.assertEqual(await self._checkpoint_counts(), {("recent", ""): 1, ("newest", ""): 1})
+        self.assertEqual(sorted(row[0] for row in await self._query("SELECT thread_id FROM thread_activity")),
+                         ["newest", "recent"])
+        self.assertEqual(await self._query(
+            "SELECT DISTINCT thread_id FROM writes WHERE thread_id IN ('expired', 'lru')"), [])
+        # 남은 writes는 남은 체크포인트의 것뿐
+        self.assertEqual(await self._query(
+            "SELECT COUNT(*) FROM writes w WHERE NOT EXISTS (SELECT 1 FROM checkpoints c WHERE "
+            "c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id)"),
+            [(0,)])
+
+        # 최신 체크포인트 하나로 전체 대화가 유지되고 이어서 대화할 수 있음
+        state = await self.graph.aget_state(self._config("recent"))
+        self.assertEqual(len(state.values["messages"]), 6)
+        await self._chat("recent", turns=1)
+        state = await self.graph.aget_state(self._config("recent"))
+        self.assertEqual([m.content for m in state.values["messages"]][-2:], ["질문 0", "답변 7"])
+        self.assertEqual((await self.graph.aget_state(self._config("lru"))).values, {})
+
+    async def test_trim_keeps_latest_checkpoint_per_namespace(self):
+        await self._chat("thread")
+        parent = (await self.checkpointer.aget_tuple(self._config("thread"))).checkpoint
+        # 하위 그래프 네임스페이스의 체크포인트 두 개 (이전 것은 부모의 최신 체크포인트와 id가 같음)
+        config = {"configurable": {"thread_id": "thread", "checkpoint_ns": "sub:1"}}
+        for step, checkpoint_id in enumerate((parent["id"], str(uuid6()))):
+            checkpoint = {**parent, "id": checkpoint_id, "channel_values": {}}
+            config = await self.checkpointer.aput(config, checkpoint, {"step": step}, {})
+        newest_sub = config["configurable"]["checkpoint_id"]
+
+        await self.checkpointer.sweep()
+
+        self.assertEqual(await self._checkpoint_counts(), {("thread", ""): 1, ("thread", "sub:1"): 1})
+        self.assertEqual(await self._query("SELECT checkpoint_id FROM checkpoints WHERE checkpoint_ns = 'sub:1'"),
+                         [(newest_sub,)])
+        self.assertEqual(await self._query("SELECT checkpoint_id FROM checkpoints WHERE checkpoint_ns = ''"),
+                         [(parent["id"],)])
+
+    async def test_untouched_threads_are_not_trimmed_again(self):
+        await self._chat("thread")
+        await self.checkpointer.sweep()
+        self.assertEqual(await self.checkpointer.sweep(), {"expired": 0, "evicted": 0, "trimmed": 0})
+
+    async def test_delete_thread(self):
+        await self._chat("thread")
+        await self._chat("other", turns=1)
+        await self.checkpointer.adelete_thread("thread")
+
+        self.assertEqual(list(await self._checkpoint_counts()), [("other", "")])
+        self.assertEqual(await self._query("SELECT thread_id FROM thread_activity"), [("other",)])
+        self.assertEqual(await self.checkpointer.sweep(), {"expired": 0, "evicted": 0, "trimmed": 1})
@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+
+import torch
+from transformers import LlamaConfig, LlamaForCausalLM
+
+from llm.engine import ContinuousBatchingEngine, SamplingParams
+
+EOS = 256
+
+
+class ByteTokenizer:
+    """UTF-8 바이트 단위 토크나이저 (256 = eos)"""
+    eos_token_id = EOS
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode(self, ids, skip_special_tokens=True):
+        return bytes(i for i in ids if i < 256).decode("utf-8", errors="replace")
+
+
+def tiny_model():
+    """CPU에서 바로 만들 수 있는 작은 랜덤 Llama 모델"""
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=257, hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=1024, eos_token_id=EOS,
+    )
+    return LlamaForCausalLM(config).eval()
+
+
+def greedy(max_new_tokens):
+    return SamplingParams(max_new_tokens=max_new_tokens, temperature=0, repetition_penalty=1.0)
+
+
+def reference_ids(model, prompt_ids, max_new_tokens):
+    """model.generate(greedy)로 하나씩 생성한 토큰 (eos 제외)"""
+    input_ids = torch.tensor([prompt_ids])
+    with torch.inference_mode():
+        output = model.generate(input_ids, attention_mask=torch.ones_like(input_ids), do_sample=False,
+                                max_new_tokens=max_new_tokens, pad_token_id=EOS, eos_token_id=EOS)
+    return [t for t in output[0, input_ids.shape[1]:].tolist() if t != EOS]
+
+
+class ContinuousBatchingEngineTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = tiny_model()
+        cls.tokenizer = ByteTokenizer()
+
+    def setUp(self):
+        self.engine = ContinuousBatchingEngine(self.model, self.tokenizer, max_batch_size=4)
+        self.addCleanup(self.engine.shutdown)
+
+    def test_staggered_requests_match_generate(self):
+        prompts = [f"질문 {i}: " + "메이플" * (i % 5 + 1) for i in range(12)]
+        # 요청마다 생성 길이가 달라 먼저 끝난 자리에 대기 요청이 합류하고, 길이가 다른 KV가 한 배치에 섞임
+        lengths = [8 + 8 * (i % 4) for i in range(12)]
+
+        requests = [self.engine.submit(prompt, greedy(n)) for prompt, n in zip(prompts[:6], lengths[:6])]
+        # 첫 요청이 디코딩을 시작한 뒤 나머지를 제출해 실행 중인 배치에 합류시킴
+        next(iter(requests[0]))
+        requests += [self.engine.submit(prompt, greedy(n)) for prompt, n in zip(prompts[6:], lengths[6:])]
+        for request in requests:
+            "".join(request)
+
+        for request, n in zip(requests, lengths):
+            self.assertEqual(request.output_ids, reference_ids(self.model, request.prompt_ids, n))
+            self.assertIn(request.finish_reason, ("stop", "length"))
+        self.assertEqual(self.engine.stats["max_running"], 4)
+        self.assertEqual(self.engine.snapshot()["running"], 0)
+
+    def test_cancelled_request_leaves_batch(self):
+        long = self.engine.submit("취소할 요청: 메이플", greedy(200))
+        others = [self.engine.submit(f"다른 요청 {i}", greedy(24)) for i in range(3)]
+        next(iter(long))
+        long.cancel()
+        list(long)
+
+        self.assertEqual(long.finish_reason, "cancelled")
+        self.assertLess(len(long.output_ids), 200)
+        # 취소된 행을 배치에서 빼도 남은 요청의 결과는 그대로
+        for request in others:
+            "".join(request)
+            self.assertEqual(request.output_ids, reference_ids(self.model, request.prompt_ids, 24))
+
+    def test_async_iteration_and_cancel_on_break(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            full = self.engine.submit("비동기 요청", greedy(16), loop=loop)
+            text = "".join([chunk async for chunk in full])
+
+            partial = self.engine.submit("중간에 멈추는 요청", greedy(200), loop=loop)
+            async for _ in partial:
+                break
+            return full, text, partial
+
+        full, text, partial = asyncio.run(run())
+        self.assertEqual(full.output_ids, reference_ids(self.model, full.prompt_ids, 16))
+        self.assertEqual(text, self.tokenizer.decode(full.output_ids))
+        self.assertTrue(partial.cancelled)
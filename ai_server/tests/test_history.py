@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from history import SUMMARY_PREFIX, HistoryManager, format_conversation, strip_thinking
+
+CONFIG = {"configurable": {"thread_id": "thread"}}
+
+
+class FakeSummarizer:
+    """밀려난 메시지를 그대로 이어 붙인 요약 (요약에 반영된 메시지를 호출 기록으로 확인)"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, summary, messages):
+        self.calls.append(list(messages))
+        return "|".join(filter(None, [summary] + [m.content for m in messages]))
+
+    @property
+    def summarized(self):
+        return [m for call in self.calls for m in call]
+
+
+def _turn(i, answer_length=10):
+    return [HumanMessage(content=f"질문{i}"),
+            AIMessage(content=f"<think>사고{i}</think>" + f"답{i}".ljust(answer_length, "."))]
+
+
+def _contents(messages):
+    return [(type(m).__name__, m.content) for m in messages]
+
+
+class HistoryManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.summarizer = FakeSummarizer()
+        self.history = HistoryManager(self.summarizer, count_tokens=len, max_turns=4, token_budget=10000)
+
+    def _refresh(self, state):
+        update = asyncio.run(self.history.arefresh(CONFIG, state))
+        if update:
+            state.update(update)
+        return update
+
+    def _expected_window(self, state, question):
+        messages = state["messages"]
+        expected = [SystemMessage(content=SUMMARY_PREFIX + state["summary"])] if state.get("summary") else []
+        for message in messages[state.get("summarized", 0):]:
+            if isinstance(message, AIMessage):
+                message = AIMessage(content=strip_thinking(message.content))
+            expected.append(message)
+        return expected + [question]
+
+    def test_short_conversation_is_not_summarized(self):
+        state = {"messages": _turn(0) + _turn(1)}
+        self.assertIsNone(self._refresh(state))
+        self.assertEqual(self.summarizer.calls, [])
+
+        question = HumanMessage(content="질문2")
+        window = self.history.window({**state, "messages": state["messages"] + [question]})
+        self.assertEqual(_contents(window), _contents(self._expected_window(state, question)))
+
+    def test_window_after_each_refresh_is_summary_plus_unsummarized_turns(self):
+        state = {"messages": []}
+        for i in range(15):
+            question = HumanMessage(content=f"질문{i}")
+            window = self.history.window({**state, "messages": state["messages"] + [question]})
+            self.assertEqual(_contents(window), _contents(self._expected_window(state, question)))
+
+            state["messages"] = state["messages"] + _turn(i)
+            update = self._refresh(state)
+            start = state.get("summarized", 0)
+            if update:
+                # 한도(4턴)를 넘으면 절반(2턴)만 남김
+                self.assertEqual(len(state["messages"]) - start, 2 * 2)
+            self.assertLessEqual(len(state["messages"]) - start, 4 * 2)
+            # 요약에 반영된 메시지 + 남은 메시지 = 전체 대화 (빠지거나 두 번 들어간 메시지 없음)
+            self.assertEqual(self.summarizer.summarized, state["messages"][:start])
+
+        # 5턴째마다 3턴씩 요약 (4, 7, 10, 13번째 답변 뒤)
+        self.assertEqual(state["summarized"], 12 * 2)
+        self.assertEqual(len(self.summarizer.calls), 4)
+        # 요약에는 사고 과정 없이 최종 답변만 (format_conversation)
+        self.assertNotIn("사고", format_conversation(self.summarizer.summarized))
+
+    def test_token_budget_limits_kept_turns(self):
+        history = HistoryManager(self.summarizer, count_tokens=len, max_turns=100, token_budget=120)
+        # 턴 하나 = 질문 3자 + 답변(<think> 포함) 34자 = 37토큰이므로 예산 안에는 3턴
+        state = {"messages": [m for i in range(4) for m in _turn(i, answer_length=16)]}
+        self.assertEqual(sum(len(m.content) for m in _turn(0, answer_length=16)), 37)
+
+        question = HumanMessage(content="질문4")
+        window = history.window({**state, "messages": state["messages"] + [question]})
+        # 아직 요약되지 않은 가장 오래된 턴은 이번 프롬프트에서만 빠짐
+        self.assertEqual(_contents(window), _contents([
+            m if isinstance(m, HumanMessage) else AIMessage(content=strip_thinking(m.content))
+            for m in state["messages"][2:]
+        ] + [question]))
+
+        update = asyncio.run(history.arefresh(CONFIG, state))
+        # 절반 예산(60토큰)에 들어가는 최근 1턴만 남기고 3턴을 요약
+        self.assertEqual(update["summarized"], 6)
+        self.assertEqual(self.summarizer.summarized, state["messages"][:6])
+
+    def test_long_backlog_is_summarized_in_chunks(self):
+        history = HistoryManager(self.summarizer, count_tokens=len, max_turns=4, token_budget=100)
+        turns = [_turn(i, answer_length=16) for i in range(10)]
+        # 예산보다 긴 턴은 단독 묶음
+        turns[3] = [HumanMessage(content="질문3"), AIMessage(content="긴 답변" * 50)]
+        state = {"messages": [m for turn in turns for m in turn]}
+
+        update = asyncio.run(history.arefresh(CONFIG, state))
+
+        kept = len(state["messages"]) - update["summarized"]
+        self.assertEqual(kept, 2)
+        self.assertEqual(self.summarizer.summarized, state["messages"][:update["summarized"]])
+        self.assertGreater(len(self.summarizer.calls), 1)
+        for call in self.summarizer.calls:
+            if len(call) > 2:
+                self.assertLessEqual(sum(len(m.content) for m in call), 100)
+        self.assertIn([turns[3][0], turns[3][1]], self.summarizer.calls)
+        # 요약은 묶음마다 이전 요약에 이어서 만듦
+        self.assertTrue(update["summary"].startswith("질문0|"))
+
+    def test_failed_summary_keeps_previous_state(self):
+        async def failing(summary, messages):
+            raise RuntimeError("LLM 오류")
+
+        history = HistoryManager(failing, count_tokens=len, max_turns=2, token_budget=10000)
+        state = {"messages": [m for i in range(5) for m in _turn(i)], "summary": "이전 요약", "summarized": 2}
+        self.assertIsNone(asyncio.run(history.arefresh(CONFIG, state)))
+        self.assertEqual(history._refreshing, set())
+
+    def test_strip_thinking(self):
+        self.assertEqual(strip_thinking("사고 과정</think>\n\n최종 답변"), "최종 답변")
+        self.assertEqual(strip_thinking("<think>사고</think>답변"), "답변")
+        self.assertEqual(strip_thinking("<think>끝나지 않은 사고"), "끝나지 않은 사고")
+        self.assertEqual(strip_thinking("답변만"), "답변만")
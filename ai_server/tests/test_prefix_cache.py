@@ -0,0 +1,103 @@
+import unittest
+
+import torch
+
+from llm.engine import ContinuousBatchingEngine
+from llm.prefix_cache import PrefixCache
+from tests.test_engine import ByteTokenizer, greedy, tiny_model
+
+
+def _layers(ids, num_layers=2):
+    """토큰 값을 그대로 담은 가짜 KV - (1, heads=1, len(ids), dim=1) float32, 토큰당 16바이트 (2 레이어)"""
+    tensor = torch.tensor(ids, dtype=torch.float32).view(1, 1, -1, 1)
+    return [(tensor.clone(), tensor.clone()) for _ in range(num_layers)]
+
+
+def _kv_ids(layers):
+    return [int(x) for x in layers[0][0].flatten().tolist()]
+
+
+class PrefixCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = PrefixCache(max_bytes=1 << 20, block_size=4)
+        self.ids = list(range(12))
+
+    def test_hit_length_is_whole_blocks_of_common_prefix(self):
+        self.cache.insert(self.ids, _layers(self.ids))
+
+        length, layers = self.cache.lookup(self.ids + [100, 101])
+        self.assertEqual(length, 12)
+        self.assertEqual(_kv_ids(layers), self.ids)
+        # 다음 토큰 logits가 필요하므로 완전히 같은 프롬프트도 마지막 블록은 다시 계산
+        self.assertEqual(self.cache.lookup(self.ids)[0], 8)
+        # 5번째 토큰부터 다르면 첫 블록만 재사용
+        length, layers = self.cache.lookup(self.ids[:5] + [100] * 8)
+        self.assertEqual(length, 4)
+        self.assertEqual(_kv_ids(layers), self.ids[:4])
+        self.assertEqual(self.cache.lookup([100] + self.ids), (0, None))
+
+    def test_only_whole_blocks_are_stored(self):
+        self.cache.insert(self.ids[:10], _layers(self.ids[:10]))
+        self.assertEqual(self.cache.snapshot()["bytes"], 16 * 8)
+        self.cache.insert(self.ids[:3], _layers(self.ids[:3]))
+        self.assertEqual(self.cache.snapshot()["entries"], 1)
+
+    def test_entry_that_is_prefix_of_new_entry_is_dropped(self):
+        self.cache.insert(self.ids[:8], _layers(self.ids[:8]))
+        self.cache.insert(self.ids, _layers(self.ids))
+        self.assertEqual(self.cache.snapshot()["entries"], 1)
+        self.assertEqual(self.cache.snapshot()["bytes"], 16 * 12)
+
+        # 이미 더 긴 항목에 포함된 접두사는 새로 저장하지 않음
+        self.cache.insert(self.ids[:8], _layers(self.ids[:8]))
+        self.assertEqual(self.cache.snapshot()["entries"], 1)
+        self.assertEqual(self.cache.lookup(self.ids + [100])[0], 12)
+
+    def test_least_recently_used_entries_are_evicted_over_max_bytes(self):
+        # 8토큰 항목 하나 = 2 레이어 * (key, value) * 8토큰 * 4바이트 = 128바이트, 두 개까지 저장
+        cache = PrefixCache(max_bytes=300, block_size=4)
+        first, second, third = ([base + i for i in range(8)] for base in (0, 100, 200))
+        cache.insert(first, _layers(first))
+        cache.insert(second, _layers(second))
+        cache.lookup(first + [1])
+        cache.insert(third, _layers(third))
+
+        self.assertEqual(cache.lookup(first + [1])[0], 8)
+        self.assertEqual(cache.lookup(second + [1]), (0, None))
+        self.assertEqual(cache.lookup(third + [1])[0], 8)
+        snapshot = cache.snapshot()
+        self.assertEqual((snapshot["entries"], snapshot["bytes"], snapshot["evictions"]), (2, 256, 1))
+
+        # max_bytes보다 큰 항목은 저장하지 않고 기존 항목도 유지
+        big = list(range(300, 340))
+        cache.insert(big, _layers(big))
+        self.assertEqual(cache.lookup(big + [1]), (0, None))
+        self.assertEqual(cache.snapshot()["entries"], 2)
+
+
+class PrefixCacheEngineTests(unittest.TestCase):
+    def test_greedy_output_is_unchanged_with_cache(self):
+        model, tokenizer = tiny_model(), ByteTokenizer()
+        system = "<|im_start|>system\n너는 메이플스토리 도우미 돌의정령이야. " * 4
+        turns = ["보스 초기화 언제야?", "그럼 주간 보스는?", "고마워!"]
+
+        results, engines = [], []
+        for prefix_cache in (None, PrefixCache(max_bytes=16 * 1024 * 1024)):
+            engine = ContinuousBatchingEngine(model, tokenizer, prefix_cache=prefix_cache)
+            self.addCleanup(engine.shutdown)
+            outputs = []
+            for session in range(2):
+                prompt = system + f"(세션 {session})"
+                for turn in turns:
+                    prompt += f"\nuser: {turn}\nassistant: "
+                    request = engine.submit(prompt, greedy(24))
+                    prompt += "".join(request)
+                    outputs.append(request.output_ids)
+            results.append(outputs)
+            engines.append(engine)
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(engines[0].stats["cached_tokens"], 0)
+        # 두 번째 세션의 시스템 프롬프트와 같은 세션의 이전 턴을 재사용
+        self.assertGreater(engines[1].stats["cached_tokens"], 0)
+        self.assertLess(engines[1].stats["prefill_tokens"], engines[0].stats["prefill_tokens"])
@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+import semantic_cache
+from semantic_cache import SemanticCache
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _similar(vector, similarity):
+    """vector와 코사인 유사도가 similarity인 단위 벡터 (3차원, vector는 첫 두 축 위)"""
+    return _unit(*(similarity * vector[:2]), np.sqrt(1 - similarity ** 2))
+
+
+class SemanticCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch.object(semantic_cache.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SemanticCache(embeddings=None, threshold=0.95, ttl=60, max_size=2)
+        self.boss = _unit(1, 0, 0)
+
+    def test_similarity_threshold(self):
+        self.cache.put(self.boss, 'v1', '보스 초기화 시간이 언제야?', '목요일 자정입니다.', '규칙 확인')
+
+        hit = self.cache.lookup(_similar(self.boss, 0.97), 'v1')
+        self.assertEqual(hit['response'], '목요일 자정입니다.')
+        self.assertEqual(hit['thinking'], '규칙 확인')
+        self.assertAlmostEqual(hit['similarity'], 0.97, places=4)
+        self.assertIsNone(self.cache.lookup(_similar(self.boss, 0.9), 'v1'))
+
+    def test_corpus_version_change_clears_cache(self):
+        self.cache.put(self.boss, 'v1', '질문', '답변')
+        self.assertIsNone(self.cache.lookup(self.boss, 'v2'))
+        # 이전 버전으로 돌아가도 비워진 항목은 되살아나지 않음
+        self.assertIsNone(self.cache.lookup(self.boss, 'v1'))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_expired_entry_is_not_returned(self):
+        self.cache.put(self.boss, 'v1', '질문', '답변')
+        self.now += 59
+        self.assertIsNotNone(self.cache.lookup(self.boss, 'v1'))
+        self.now += 2
+        self.assertIsNone(self.cache.lookup(self.boss, 'v1'))
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_least_recently_used_entry_is_replaced(self):
+        event, shop = _unit(0, 1, 0), _unit(0, 0, 1)
+        self.cache.put(self.boss, 'v1', '보스', '보스 답변')
+        self.cache.put(event, 'v1', '이벤트', '이벤트 답변')
+        self.cache.lookup(self.boss, 'v1')
+        self.cache.put(shop, 'v1', '상점', '상점 답변')
+
+        self.assertEqual(self.cache.lookup(self.boss, 'v1')['response'], '보스 답변')
+        self.assertIsNone(self.cache.lookup(event, 'v1'))
+        self.assertEqual(self.cache.lookup(shop, 'v1')['response'], '상점 답변')
+
+    def test_similar_question_updates_existing_entry(self):
+        self.cache.put(self.boss, 'v1', '보스 초기화 언제야?', '이전 답변')
+        self.cache.put(_similar(self.boss, 0.99), 'v1', '보스 초기화는 언제 돼?', '새 답변')
+        self.cache.put(_unit(0, 1, 0), 'v1', '이벤트', '이벤트 답변')
+
+        self.assertEqual(self.cache.lookup(self.boss, 'v1')['response'], '새 답변')
+        self.assertEqual(self.cache.stats()['entries'], 2)
+
+    def test_empty_response_is_not_stored(self):
+        self.cache.put(self.boss, 'v1', '질문', '')
+        self.assertIsNone(self.cache.lookup(self.boss, 'v1'))
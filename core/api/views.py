@@ -1,7 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from core.services import get_notice_list, get_ranking_list
+from core.services import (
+    load_notice_data_from_json,
+    load_ranking_data_from_json,
+    load_carousel_data_from_json,
+)
+from core.refresher import load_refresh_status
+from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,12 +15,15 @@ logger = logging.getLogger(__name__)
 class HomeDataAPIView(APIView):
     """
     메인 페이지에 필요한 데이터(공지사항, 랭킹 등)를 반환하는 API
+    데이터는 백그라운드 갱신기(manage.py refresh_data)가 미리 준비한 JSON 파일에서만 읽습니다.
     """
     def get(self, request):
         try:
-            # 기존 서비스 함수 활용
-            notice = get_notice_list() or {}
-            ranking = get_ranking_list() or {}
+            # 준비된 데이터만 읽음 (요청 처리 중에는 Nexon API를 호출하지 않음)
+            notice = load_notice_data_from_json() or {}
+            ranking = load_ranking_data_from_json() or {}
+            if not isinstance(notice, dict):
+                notice = {}
             
             # 데이터 추출 로직
             def extract_list(data, keys):
@@ -46,7 +55,8 @@ class HomeDataAPIView(APIView):
                     "events": notice_events[:5],
                     "cashshop": notice_cashshops[:5],
                 },
-                "ranking": ranking_list[:10]
+                "ranking": ranking_list[:10],
+                "carousel": load_carousel_data_from_json() or {"events": [], "cashItems": []},
             }
             
             return Response(processed_data)
@@ -56,5 +66,28 @@ class HomeDataAPIView(APIView):
             # 에러 발생 시 빈 데이터 반환하여 프론트엔드 에러 방지
             return Response({
                 "notices": {"updates": [], "events": [], "cashshop": []},
-                "ranking": []
+                "ranking": [],
+                "carousel": {"events": [], "cashItems": []},
             })
+
+
+class RefreshStatusAPIView(APIView):
+    """
+    백그라운드 데이터 갱신 상태(작업별 마지막 갱신 시각, 소요 시간, 오류)를 반환하는 모니터링 API
+    """
+    def get(self, request):
+        status_data = load_refresh_status()
+        now = datetime.now(timezone.utc)
+
+        jobs = {}
+        for name, entry in status_data.items():
+            entry = dict(entry)
+            last_success_at = entry.get('last_success_at')
+            # 마지막 성공 이후 경과 시간(초) - 오래되면 갱신기가 멈춘 것으로 판단할 수 있음
+            entry['age_seconds'] = (
+                int((now - datetime.fromisoformat(last_success_at)).total_seconds())
+                if last_success_at else None
+            )
+            jobs[name] = entry
+
+        return Response({"jobs": jobs})
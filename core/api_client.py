@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
+import asyncio
 import requests
+import aiohttp
 import logging
 import os
 from dotenv import load_dotenv
@@ -11,13 +13,8 @@ NEXON_API_KEY = os.getenv('NEXON_API_KEY')
 logger = logging.getLogger(__name__)
 
 
-def get_api_data(endpoint, params=None):
-    """공통 Nexon API 호출 유틸
-
-    - 헤더에 `x-nxopen-api-key`를 포함
-    - 날짜 파라미터가 필요한 엔드포인트에 대해 기본 날짜를 추가
-    - 오류 로깅 후 None 반환
-    """
+def _build_request(endpoint, params=None):
+    """Nexon API 요청에 필요한 url, 헤더, 파라미터를 만듭니다."""
     headers = {'x-nxopen-api-key': NEXON_API_KEY}
     url = f'{BASE_URL}{endpoint}'
 
@@ -32,6 +29,18 @@ def get_api_data(endpoint, params=None):
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         params['date'] = yesterday
 
+    return url, headers, params
+
+
+def get_api_data(endpoint, params=None):
+    """공통 Nexon API 호출 유틸
+
+    - 헤더에 `x-nxopen-api-key`를 포함
+    - 날짜 파라미터가 필요한 엔드포인트에 대해 기본 날짜를 추가
+    - 오류 로깅 후 None 반환
+    """
+    url, headers, params = _build_request(endpoint, params)
+
     try:
         response = requests.get(url, headers=headers, params=params)
 
@@ -44,3 +53,25 @@ def get_api_data(endpoint, params=None):
     except requests.RequestException as e:
         logger.error(f'API 요청 중 예외 발생: {url}, 오류: {e}')
         return None
+
+
+async def aget_api_data(session, endpoint, params=None):
+    """공통 Nexon API 호출 유틸 (비동기)
+
+    - `get_api_data`와 동일한 규칙으로 요청하되, 전달받은 aiohttp 세션(커넥션 풀)을 사용
+    - 오류 로깅 후 None 반환
+    """
+    url, headers, params = _build_request(endpoint, params)
+
+    try:
+        async with session.get(url, headers=headers, params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                text = await response.text()
+                logger.error(f'API 요청 실패: {url}, 상태 코드: {response.status}, 파라미터: {params}, 응답: {text}')
+                return None
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f'API 요청 중 예외 발생: {url}, 오류: {e}')
+        return None
@@ -0,0 +1,129 @@
+"""
+공지사항 HTML 변환 벤치마크
+
+기존 방식(BeautifulSoup html.parser + get_text)과 core.notice_html 변환기를
+같은 공지사항 본문들로 비교합니다.
+
+사용 예:
+    # 넥슨 API에서 최신 공지 본문을 받아 파일로 기록한 뒤 벤치마크
+    python manage.py bench_notice_html --record notice_bodies.json
+
+    # 기록해 둔 본문으로 벤치마크
+    python manage.py bench_notice_html --input notice_bodies.json --repeat 20
+"""
+
+import json
+import time
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand, CommandError
+
+from core.api_client import get_api_data
+from core.notice_html import clear_cache, convert_notice_html, html_to_text
+
+DETAIL_ENDPOINTS = [
+    ('/notice', '/notice/detail', 'notice'),
+    ('/notice-event', '/notice-event/detail', 'event_notice'),
+    ('/notice-cashshop', '/notice-cashshop/detail', 'cashshop_notice'),
+    ('/notice-update', '/notice-update/detail', 'update_notice'),
+]
+
+
+def _sample_bodies():
+    """기록된 본문이 없을 때 사용할, 표와 이미지가 많은 이벤트 공지 형태의 샘플"""
+    rows = ''.join(
+        f'<tr><td>{i}일차</td><td><img src="https://example.com/item{i}.png">'
+        f'<span>보상 아이템 {i}</span></td><td><b>{i * 10}</b>개</td></tr>'
+        for i in range(1, 41)
+    )
+    paragraphs = ''.join(
+        f'<p><span style="font-size:14px">이벤트 안내 문단 {i} - 참여 조건과 주의사항을 확인하세요.</span><br>'
+        f'<img src="https://example.com/banner{i}.jpg"></p>'
+        for i in range(1, 31)
+    )
+    body = (
+        '<div class="event"><h2>겨울 출석 이벤트</h2>'
+        f'{paragraphs}<table><thead><tr><th>일차</th><th>보상</th><th>수량</th></tr></thead>'
+        f'<tbody>{rows}</tbody></table><script>trackEvent("notice");</script></div>'
+    )
+    return [{'notice_id': i, 'contents': body.replace('겨울', f'겨울 {i}')} for i in range(20)]
+
+
+def _bs4_text(raw_html):
+    """기존 get_notice_detail의 변환 방식"""
+    soup = BeautifulSoup(raw_html, 'html.parser')
+    return soup.get_text(separator='\n').strip()
+
+
+class Command(BaseCommand):
+    help = '공지사항 HTML 변환 성능을 기존 BeautifulSoup 방식과 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', help='기록된 공지 본문 JSON 파일 ([{"notice_id", "contents"}, ...])')
+        parser.add_argument('--record', help='넥슨 API에서 최신 공지 본문을 받아 이 경로에 기록한 뒤 사용')
+        parser.add_argument('--limit', type=int, default=5, help='--record 시 카테고리별로 가져올 공지 수')
+        parser.add_argument('--repeat', type=int, default=10, help='본문 전체를 반복 변환할 횟수')
+
+    def handle(self, *args, **options):
+        if options['record']:
+            bodies = self._record(options['record'], options['limit'])
+        elif options['input']:
+            with open(options['input'], 'r', encoding='utf-8') as f:
+                bodies = json.load(f)
+        else:
+            self.stdout.write('기록된 본문이 없어 내장 샘플을 사용합니다. (--input / --record 참고)')
+            bodies = _sample_bodies()
+
+        bodies = [b for b in bodies if b.get('contents')]
+        if not bodies:
+            raise CommandError('벤치마크할 공지 본문이 없습니다.')
+
+        repeat = max(1, options['repeat'])
+        total_bytes = sum(len(b['contents'].encode('utf-8')) for b in bodies)
+        self.stdout.write(f'본문 {len(bodies)}건, 총 {total_bytes / 1024:.1f} KiB, 반복 {repeat}회')
+
+        results = [
+            ('BeautifulSoup(html.parser)', self._measure(lambda b: _bs4_text(b['contents']), bodies, repeat)),
+            ('notice_html (캐시 없음)', self._measure(lambda b: html_to_text(b['contents']), bodies, repeat)),
+        ]
+
+        clear_cache()
+        for body in bodies:
+            convert_notice_html(body['notice_id'], body['contents'])
+        results.append((
+            'notice_html (캐시 적중)',
+            self._measure(lambda b: convert_notice_html(b['notice_id'], b['contents']), bodies, repeat),
+        ))
+
+        baseline = results[0][1]
+        for name, per_body_ms in results:
+            speedup = baseline / per_body_ms if per_body_ms else float('inf')
+            self.stdout.write(f'{name:<28} {per_body_ms:9.3f} ms/건  (x{speedup:.1f})')
+
+    def _measure(self, convert, bodies, repeat):
+        """본문 1건당 평균 변환 시간(ms)을 반환합니다."""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for body in bodies:
+                convert(body)
+        elapsed = time.perf_counter() - start
+        return elapsed * 1000 / (repeat * len(bodies))
+
+    def _record(self, path, limit):
+        """넥슨 API에서 최신 공지 본문을 받아 JSON 파일로 기록합니다."""
+        bodies = []
+        for list_endpoint, detail_endpoint, item_key in DETAIL_ENDPOINTS:
+            listing = get_api_data(list_endpoint) or {}
+            for item in listing.get(item_key, [])[:limit]:
+                notice_id = item.get('notice_id')
+                detail = get_api_data(detail_endpoint, params={'notice_id': notice_id}) or {}
+                contents = detail.get('contents') or detail.get('content')
+                if contents:
+                    bodies.append({'notice_id': notice_id, 'title': item.get('title', ''), 'contents': contents})
+                # API 호출 간 지연 (429 에러 방지)
+                time.sleep(0.5)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(bodies, f, ensure_ascii=False, indent=2)
+        self.stdout.write(f'공지 본문 {len(bodies)}건을 {path}에 기록했습니다.')
+        return bodies
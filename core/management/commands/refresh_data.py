@@ -0,0 +1,44 @@
+"""
+메인 페이지 데이터(공지사항, 랭킹, 캐러셀) 백그라운드 갱신 명령
+
+사용 예:
+    # 설정된 주기(DATA_REFRESH_INTERVALS)에 따라 계속 갱신
+    python manage.py refresh_data
+
+    # 한 번만 갱신하고 종료 (cron 등에서 사용)
+    python manage.py refresh_data --once --only notices carousel
+"""
+
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.refresher import REFRESH_JOBS, DataRefresher
+
+
+class Command(BaseCommand):
+    help = '공지사항, 랭킹, 캐러셀 데이터를 주기적으로 갱신합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='모든 작업을 한 번만 실행하고 종료')
+        parser.add_argument('--only', nargs='+', choices=list(REFRESH_JOBS.keys()), help='실행할 작업 이름')
+        parser.add_argument('--jitter', type=float, help='갱신 주기에 더할 무작위 편차 비율 (예: 0.1 = ±10%%)')
+
+    def handle(self, *args, **options):
+        refresher = DataRefresher(jobs=options['only'], jitter=options['jitter'])
+
+        if options['once']:
+            results = asyncio.run(refresher.refresh_all())
+            for name, ok in results.items():
+                status = refresher.status[name]
+                self.stdout.write(f"{name}: {'성공' if ok else '실패'} ({status['last_duration_ms']}ms)")
+            if not all(results.values()):
+                raise CommandError('일부 데이터 갱신에 실패했습니다.')
+            return
+
+        intervals = ', '.join(f'{name}={refresher.intervals[name]}s' for name in refresher.jobs)
+        self.stdout.write(f'데이터 갱신 서비스를 시작합니다. ({intervals}, jitter=±{refresher.jitter:.0%})')
+        try:
+            asyncio.run(refresher.run_forever())
+        except KeyboardInterrupt:
+            self.stdout.write('데이터 갱신 서비스를 종료합니다.')
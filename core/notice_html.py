@@ -0,0 +1,171 @@
+"""
+공지사항 본문 HTML → 텍스트 변환기
+
+넥슨 API의 공지사항 상세 HTML을 RAG용 텍스트로 변환합니다.
+- lxml(C 기반 파서)을 사용하여 BeautifulSoup html.parser보다 빠르게 처리
+- 표(table)는 Markdown 표로 변환하여 구조를 유지
+- 이미지, 스크립트, 스타일 등 텍스트가 아닌 요소는 제거
+- 변환 결과는 (notice_id, 본문 해시) 기준으로 캐시
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import lxml.html
+from lxml import etree
+
+# 변환 시 통째로 제거할 태그
+DROP_TAGS = ('script', 'style', 'img', 'noscript', 'iframe', 'svg', 'video', 'audio', 'object', 'embed')
+
+# 앞뒤로 줄바꿈을 넣어야 하는 블록 태그
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'header', 'footer', 'aside', 'blockquote',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'pre', 'hr', 'center', 'figure', 'figcaption', 'caption', 'address',
+}
+
+# 변환 결과 캐시 최대 개수
+CACHE_MAX_SIZE = 512
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+_blank_lines_re = re.compile(r'\n\s*\n\s*\n+')
+_inline_space_re = re.compile(r'[ \t\r\f\v\xa0]+')
+
+
+def _collapse(text):
+    """셀/인라인 텍스트의 연속 공백을 하나로 합칩니다."""
+    return ' '.join(text.split())
+
+
+def _table_to_markdown(table):
+    """<table> 요소를 Markdown 표 문자열로 변환합니다."""
+    rows = []
+    for tr in table.xpath('./tr|./thead/tr|./tbody/tr|./tfoot/tr'):
+        cells = []
+        for cell in tr.xpath('./th|./td'):
+            text = _collapse(cell.text_content()).replace('|', '\\|')
+            cells.append(text)
+            # colspan 만큼 빈 칸을 채워 열 정렬을 맞춤
+            try:
+                span = int(cell.get('colspan', 1))
+            except ValueError:
+                span = 1
+            cells.extend([''] * (min(span, 50) - 1))
+        if any(cells):
+            rows.append(cells)
+
+    if not rows:
+        return ''
+
+    width = max(len(row) for row in rows)
+    lines = []
+    for i, row in enumerate(rows):
+        row = row + [''] * (width - len(row))
+        lines.append('| ' + ' | '.join(row) + ' |')
+        if i == 0:
+            lines.append('|' + '|'.join([' --- '] * width) + '|')
+    return '\n'.join(lines)
+
+
+def _render(el, out):
+    """요소를 재귀적으로 순회하며 텍스트 조각을 out에 추가합니다."""
+    tag = el.tag if isinstance(el.tag, str) else None
+
+    if tag is None:
+        # 주석, 처리 지시문 등은 건너뛰고 뒤따르는 텍스트만 유지
+        pass
+    elif tag == 'table':
+        out.append('\n\n' + _table_to_markdown(el) + '\n\n')
+    elif tag == 'br':
+        out.append('\n')
+    else:
+        is_block = tag in BLOCK_TAGS
+        if is_block:
+            out.append('\n')
+        if tag == 'li':
+            out.append('- ')
+        if el.text:
+            out.append(el.text)
+        for child in el:
+            _render(child, out)
+        if is_block and tag != 'li':
+            out.append('\n')
+
+    if el.tail:
+        out.append(el.tail)
+
+
+def html_to_text(raw_html):
+    """
+    공지사항 HTML을 텍스트로 변환합니다. (캐시 없이 항상 변환)
+
+    Args:
+        raw_html (str): 넥슨 API의 공지사항 본문 HTML
+
+    Returns:
+        str: 표는 Markdown으로, 나머지는 줄 단위 텍스트로 변환된 본문
+    """
+    if not raw_html or not raw_html.strip():
+        return ''
+
+    try:
+        doc = lxml.html.document_fromstring(raw_html)
+    except (etree.ParserError, ValueError):
+        return ''
+
+    for bad in doc.xpath('|'.join(f'//{tag}' for tag in DROP_TAGS)):
+        bad.drop_tree()
+
+    body = doc.find('body')
+    root = body if body is not None else doc
+
+    out = []
+    if root.text:
+        out.append(root.text)
+    for child in root:
+        _render(child, out)
+
+    lines = []
+    for line in ''.join(out).split('\n'):
+        # Markdown 표 행은 그대로 두고 일반 텍스트만 공백 정리
+        lines.append(line.strip() if line.startswith('|') else _inline_space_re.sub(' ', line).strip())
+    return _blank_lines_re.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def convert_notice_html(notice_id, raw_html):
+    """
+    공지사항 HTML을 텍스트로 변환하되, (notice_id, 본문 해시)가 같으면 캐시된 결과를 반환합니다.
+
+    Args:
+        notice_id: 공지사항 ID
+        raw_html (str): 공지사항 본문 HTML
+
+    Returns:
+        str: 변환된 본문 텍스트
+    """
+    digest = hashlib.sha1((raw_html or '').encode('utf-8')).hexdigest()
+    key = (notice_id, digest)
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    text = html_to_text(raw_html)
+
+    with _cache_lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+    return text
+
+
+def clear_cache():
+    """변환 결과 캐시를 비웁니다."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,171 @@
+"""
+메인 페이지 데이터 백그라운드 갱신기
+
+공지사항, 랭킹, 캐러셀 데이터를 사용자 요청과 분리하여 주기적으로 갱신합니다.
+뷰는 여기서 미리 준비해 둔 JSON 파일만 읽습니다.
+
+실행 방법:
+    - 관리 명령: python manage.py refresh_data
+    - 프로세스 내 asyncio 서비스: asyncio.create_task(DataRefresher().run_forever())
+
+각 작업의 마지막 갱신 시각과 소요 시간은 REFRESH_STATUS_PATH에 기록되며,
+/api/home/refresh-status/ 에서 조회할 수 있습니다.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from . import services
+
+logger = logging.getLogger(__name__)
+
+REFRESH_STATUS_PATH = os.path.join(settings.BASE_DIR, 'runtime', 'refresh_status.json')
+
+# 기본 갱신 주기(초)와 지터 비율 - settings.DATA_REFRESH_INTERVALS / DATA_REFRESH_JITTER로 덮어쓸 수 있음
+DEFAULT_INTERVALS = {
+    'notices': 1800,
+    'rankings': 3600,
+    'carousel': 1800,
+}
+DEFAULT_JITTER = 0.1
+
+
+def _refresh_rankings():
+    data = services.get_ranking_list()
+    if not data.get('overall_ranking'):
+        raise RuntimeError('랭킹 데이터를 가져오지 못했습니다.')
+    return data
+
+
+async def _refresh_notices():
+    data = await services.refresh_notice_list_async()
+    if not any(data.values()):
+        raise RuntimeError('공지사항 데이터를 가져오지 못했습니다.')
+    return data
+
+
+# 작업 이름 : 갱신 함수 (순서대로 실행되므로 캐러셀은 공지사항 다음에 둠)
+REFRESH_JOBS = {
+    'notices': _refresh_notices,
+    'rankings': _refresh_rankings,
+    'carousel': services.refresh_carousel_data,
+}
+
+
+def load_refresh_status():
+    """
+    마지막으로 기록된 갱신 상태를 반환합니다. 기록이 없으면 빈 딕셔너리를 반환합니다.
+    """
+    try:
+        if os.path.exists(REFRESH_STATUS_PATH):
+            return services._load_json_cached(REFRESH_STATUS_PATH)
+    except Exception as e:
+        logger.error(f"갱신 상태 로드 중 오류 발생: {e}")
+    return {}
+
+
+class DataRefresher:
+    """
+    데이터셋별 주기에 지터를 더해 갱신 작업을 반복 실행하는 asyncio 스케줄러
+    """
+
+    def __init__(self, jobs=None, intervals=None, jitter=None):
+        """
+        Args:
+            jobs (list): 실행할 작업 이름 목록 (기본값: 전체)
+            intervals (dict): 작업별 갱신 주기(초)
+            jitter (float): 주기에 더할 무작위 편차 비율 (0.1 = ±10%)
+        """
+        self.jobs = list(jobs or REFRESH_JOBS.keys())
+        unknown = [name for name in self.jobs if name not in REFRESH_JOBS]
+        if unknown:
+            raise ValueError(f"알 수 없는 갱신 작업: {', '.join(unknown)}")
+
+        self.intervals = dict(DEFAULT_INTERVALS)
+        self.intervals.update(getattr(settings, 'DATA_REFRESH_INTERVALS', {}))
+        self.intervals.update(intervals or {})
+        self.jitter = jitter if jitter is not None else getattr(settings, 'DATA_REFRESH_JITTER', DEFAULT_JITTER)
+
+        self.status = dict(load_refresh_status())
+        # 상태 파일은 여러 작업이 동시에 갱신하므로 기록 순서를 직렬화
+        self._status_lock = asyncio.Lock()
+
+    def next_delay(self, name):
+        """다음 실행까지 대기할 시간(초)을 지터를 적용하여 계산합니다."""
+        interval = self.intervals[name]
+        return max(1.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def refresh(self, name):
+        """
+        작업 하나를 실행하고 결과(시각, 소요 시간, 오류)를 상태 파일에 기록합니다.
+
+        Returns:
+            bool: 성공 여부
+        """
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        error = None
+        job = REFRESH_JOBS[name]
+        try:
+            if asyncio.iscoroutinefunction(job):
+                await job()
+            else:
+                # 동기 갱신 함수는 이벤트 루프를 막지 않도록 스레드에서 실행
+                await asyncio.to_thread(job)
+        except Exception as e:
+            error = str(e)
+            logger.error(f"데이터 갱신 실패 ({name}): {e}")
+        duration_ms = int((time.perf_counter() - start) * 1000)
+
+        async with self._status_lock:
+            entry = dict(self.status.get(name, {}))
+            entry.update({
+                'last_started_at': started_at.isoformat(),
+                'last_finished_at': datetime.now(timezone.utc).isoformat(),
+                'last_duration_ms': duration_ms,
+                'ok': error is None,
+                'error': error,
+                'interval_seconds': self.intervals[name],
+            })
+            if error is None:
+                entry['last_success_at'] = entry['last_finished_at']
+            self.status[name] = entry
+            try:
+                services._write_json_atomic(REFRESH_STATUS_PATH, self.status)
+            except Exception as e:
+                logger.error(f"갱신 상태 저장 중 오류 발생: {e}")
+
+        if error is None:
+            logger.info(f"데이터 갱신 완료 ({name}, {duration_ms}ms)")
+        return error is None
+
+    async def refresh_all(self):
+        """모든 작업을 순서대로 한 번씩 실행합니다."""
+        results = {}
+        for name in self.jobs:
+            results[name] = await self.refresh(name)
+        return results
+
+    async def _run_job(self, name):
+        while True:
+            await asyncio.sleep(self.next_delay(name))
+            await self.refresh(name)
+
+    async def run_forever(self):
+        """
+        시작 시 모든 작업을 한 번 실행한 뒤, 작업별 주기에 따라 계속 갱신합니다.
+        취소(cancel)되면 실행 중인 모든 작업을 정리하고 종료합니다.
+        """
+        await self.refresh_all()
+        tasks = [asyncio.create_task(self._run_job(name)) for name in self.jobs]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -4,26 +4,133 @@ import logging
 import json
 import os
 import requests
-from datetime import datetime, timedelta
-from .api_client import get_api_data
-from bs4 import BeautifulSoup
+from datetime import datetime, timedelta, timezone
+import aiohttp
+from .api_client import get_api_data, aget_api_data
+from .notice_html import convert_notice_html
+from .get_carousel_data import transform_to_carousel_format
 import time
+import mmap
+import tempfile
+import threading
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 CACHE_DURATION = timedelta(hours=1)  # 캐시 유효 기간 설정 (1시간)
 
+# RAG용 공지사항 문서 (sync_notices_to_rag가 씀, rag_corpus_version의 기준)
 NOTICE_JSON_PATH = os.path.join(settings.BASE_DIR, 'rag_documents', 'notices', 'notice_data_rag.json')
+# 공지사항 목록 4종 (백그라운드 갱신기가 주기적으로 씀) - RAG 문서와 형식이 다르므로 rag_documents 밖에 저장
+NOTICE_LIST_JSON_PATH = os.path.join(settings.BASE_DIR, 'runtime', 'notice_list.json')
 RANKING_JSON_PATH = os.path.join(settings.BASE_DIR, 'rag_documents', 'rankings', 'ranking_data_rag.json')
+# 캐러셀 데이터는 RAG 문서가 아니므로 rag_documents 밖에 저장
+CAROUSEL_JSON_PATH = os.path.join(settings.BASE_DIR, 'runtime', 'carousel_data.json')
 
-def get_notice_list():
+# 파싱된 JSON 캐시: {경로: ((mtime_ns, inode, size), 데이터)}
+# 프로세스 내 모든 요청이 공유하며, 파일이 교체(rename)되면 inode가 바뀌므로 자동으로 무효화됩니다.
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+
+
+def _load_json_cached(path):
     """
-    공지사항 데이터를 Nexon API에서 가져와서 JSON 파일로 저장하고 반환합니다.
-    JSON 파일이 있고 최신이면(1시간 이내) API 호출 없이 파일 내용을 반환합니다.
+    JSON 파일을 읽어 파싱 결과를 반환합니다.
+    파일의 (mtime, inode, 크기)가 바뀌지 않았다면 메모리에 캐시된 결과를 그대로 사용하고,
+    바뀌었다면 파일을 mmap으로 읽어 한 번만 파싱합니다.
+    반환된 객체는 여러 요청이 공유하므로 수정하지 말고 읽기 전용으로 사용해야 합니다.
     """
-    # 캐시 확인
-    if os.path.exists(NOTICE_JSON_PATH):
+    with open(path, 'rb') as f:
+        # 경로가 아닌 열린 파일 기준으로 stat을 구해야 읽는 도중 교체되어도 키와 내용이 일치합니다.
+        stat = os.fstat(f.fileno())
+        key = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+        cached = _json_cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        if stat.st_size == 0:
+            raise ValueError(f"빈 JSON 파일입니다: {path}")
+
+        # mmap으로 읽으면 여러 워커 프로세스가 같은 페이지 캐시를 공유합니다.
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = json.loads(mm.read())
+
+    with _json_cache_lock:
+        _json_cache[path] = (key, data)
+    return data
+
+
+def _write_json_atomic(path, data):
+    """
+    JSON 데이터를 같은 디렉토리의 임시 파일에 먼저 쓴 뒤 원자적으로 교체(rename)합니다.
+    읽는 쪽은 항상 이전 파일 또는 완성된 새 파일만 보게 됩니다.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp는 0600으로 만들기 때문에 일반 파일과 같은 권한으로 맞춰줍니다.
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def json_file_etag(path) -> Optional[str]:
+    """
+    JSON 파일의 mtime과 크기로 ETag 값을 만듭니다. 파일이 없으면 None을 반환합니다.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def rag_corpus_version() -> str:
+    """
+    RAG 공지사항 문서(sync_notices_to_rag가 쓰는 파일)의 버전 문자열을 반환합니다.
+    파일이 교체되면 값이 바뀌므로, 답변 캐시 등에서 코퍼스 변경 감지에 사용합니다.
+    """
+    return json_file_etag(NOTICE_JSON_PATH) or 'none'
+
+
+def json_file_last_modified(path) -> Optional[datetime]:
+    """
+    JSON 파일의 마지막 수정 시각(UTC)을 반환합니다. 파일이 없으면 None을 반환합니다.
+    """
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+    except OSError:
+        return None
+
+
+# 공지사항 목록 엔드포인트 (저장 키 : Nexon API 경로)
+NOTICE_LIST_ENDPOINTS = {
+    "notice_general": "/notice",
+    "notice_event": "/notice-event",
+    "notice_cashshop": "/notice-cashshop",
+    "notice_update": "/notice-update",
+}
+NOTICE_API_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+def _load_fresh_notice_cache():
+    """
+    JSON 파일이 있고 최신이면(1시간 이내) 파일 내용을 반환하고, 아니면 None을 반환합니다.
+    """
+    if os.path.exists(NOTICE_LIST_JSON_PATH):
         try:
-            modified_time = datetime.fromtimestamp(os.path.getmtime(NOTICE_JSON_PATH))
+            modified_time = datetime.fromtimestamp(os.path.getmtime(NOTICE_LIST_JSON_PATH))
             if datetime.now() - modified_time < CACHE_DURATION:
                 data = load_notice_data_from_json()
                 if data:
@@ -31,26 +138,67 @@ def get_notice_list():
                     return data
         except Exception as e:
             logger.warning(f"캐시 확인 중 오류: {e}")
+    return None
+
+
+async def fetch_notice_list_async():
+    """
+    4개의 공지사항 목록을 하나의 커넥션 풀(aiohttp 세션)로 동시에 가져옵니다.
+    전체 소요 시간은 가장 느린 요청 하나의 시간과 비슷합니다.
+    """
+    connector = aiohttp.TCPConnector(limit=len(NOTICE_LIST_ENDPOINTS))
+    async with aiohttp.ClientSession(connector=connector, timeout=NOTICE_API_TIMEOUT) as session:
+        results = await asyncio.gather(
+            *(aget_api_data(session, endpoint) for endpoint in NOTICE_LIST_ENDPOINTS.values())
+        )
+    return dict(zip(NOTICE_LIST_ENDPOINTS.keys(), results))
+
+
+async def get_notice_list_async():
+    """
+    공지사항 데이터를 Nexon API에서 동시에 가져와서 JSON 파일로 저장하고 반환합니다.
+    JSON 파일이 있고 최신이면(1시간 이내) API 호출 없이 파일 내용을 반환합니다.
+    """
+    # 캐시 확인
+    data = _load_fresh_notice_cache()
+    if data:
+        return data
+
+    return await refresh_notice_list_async()
+
+
+async def refresh_notice_list_async():
+    """
+    캐시 여부와 관계없이 공지사항 목록을 새로 가져와 JSON 파일로 저장하고 반환합니다.
+    (백그라운드 갱신 작업용)
+    """
+    # API 호출 (4개 목록 동시 요청)
+    notice_data = await fetch_notice_list_async()
+
+    # 일부 요청이 실패하면 기존 파일의 값을 유지하여 준비된 데이터를 덮어쓰지 않음
+    if not all(notice_data.values()):
+        previous = load_notice_data_from_json()
+        if isinstance(previous, dict):
+            for key, value in notice_data.items():
+                if not value and previous.get(key):
+                    notice_data[key] = previous[key]
+        if not any(notice_data.values()):
+            logger.warning("공지사항 데이터를 가져오지 못해 저장하지 않습니다.")
+            return notice_data
 
-    # API 호출
-    notice_general = get_api_data("/notice")
-    notice_event = get_api_data("/notice-event")
-    notice_cashshop = get_api_data("/notice-cashshop")
-    notice_update = get_api_data("/notice-update")
-
-    notice_data = {
-        "notice_general": notice_general,
-        "notice_event": notice_event,
-        "notice_cashshop": notice_cashshop,
-        "notice_update": notice_update
-    }
-    
     # JSON 파일로 저장
     save_notice_data_to_json(notice_data)
 
     return notice_data
 
 
+def get_notice_list():
+    """
+    get_notice_list_async의 동기 래퍼입니다. (HomeDataAPIView, sync_notices_to_rag 등 동기 코드용)
+    """
+    return asyncio.run(get_notice_list_async())
+
+
 def save_notice_data_to_json(notice_data):
     """
     공지사항 데이터를 JSON 파일로 저장합니다.
@@ -59,14 +207,10 @@ def save_notice_data_to_json(notice_data):
         notice_data (dict): 저장할 공지사항 데이터
     """
     try:
-        # character_data 디렉토리가 없으면 생성
-        os.makedirs(os.path.dirname(NOTICE_JSON_PATH), exist_ok=True)
-        
-        # JSON 파일로 저장 (한글 지원)
-        with open(NOTICE_JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(notice_data, f, ensure_ascii=False, indent=2)
+        # 임시 파일에 쓴 뒤 원자적으로 교체 (한글 지원)
+        _write_json_atomic(NOTICE_LIST_JSON_PATH, notice_data)
         
-        logger.info(f"공지사항 데이터가 {NOTICE_JSON_PATH}에 저장되었습니다.")
+        logger.info(f"공지사항 데이터가 {NOTICE_LIST_JSON_PATH}에 저장되었습니다.")
     except Exception as e:
         logger.error(f"공지사항 데이터 저장 중 오류 발생: {e}")
 
@@ -79,9 +223,8 @@ def load_notice_data_from_json():
         dict: 로드된 공지사항 데이터, 파일이 없으면 빈 딕셔너리
     """
     try:
-        if os.path.exists(NOTICE_JSON_PATH):
-            with open(NOTICE_JSON_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        if os.path.exists(NOTICE_LIST_JSON_PATH):
+            return _load_json_cached(NOTICE_LIST_JSON_PATH)
     except Exception as e:
         logger.error(f"공지사항 데이터 로드 중 오류 발생: {e}")
     
@@ -96,12 +239,8 @@ def save_ranking_data_to_json(ranking_data):
         ranking_data (dict): 저장할 랭킹 데이터
     """
     try:
-        # character_data 디렉토리가 없으면 생성
-        os.makedirs(os.path.dirname(RANKING_JSON_PATH), exist_ok=True)
-        
-        # JSON 파일로 저장 (한글 지원)
-        with open(RANKING_JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(ranking_data, f, ensure_ascii=False, indent=2)
+        # 임시 파일에 쓴 뒤 원자적으로 교체 (한글 지원)
+        _write_json_atomic(RANKING_JSON_PATH, ranking_data)
         
         logger.info(f"랭킹 데이터가 {RANKING_JSON_PATH}에 저장되었습니다.")
     except Exception as e:
@@ -117,8 +256,7 @@ def load_ranking_data_from_json():
     """
     try:
         if os.path.exists(RANKING_JSON_PATH):
-            with open(RANKING_JSON_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json_cached(RANKING_JSON_PATH)
     except Exception as e:
         logger.error(f"랭킹 데이터 로드 중 오류 발생: {e}")
     
@@ -146,12 +284,42 @@ def get_ranking_list():
         "overall_ranking": ranking_list
     }
     
-    # JSON 파일로 저장
-    save_ranking_data_to_json(ranking_data)
+    # JSON 파일로 저장 (가져오지 못했다면 기존 파일 유지)
+    if ranking_list:
+        save_ranking_data_to_json(ranking_data)
+    else:
+        logger.warning("랭킹 데이터를 가져오지 못해 저장하지 않습니다.")
     
     return ranking_data
 
 
+def refresh_carousel_data():
+    """
+    저장된 공지사항 데이터로 메인 페이지 캐러셀 데이터를 만들어 JSON 파일로 저장하고 반환합니다.
+    """
+    notice_data = load_notice_data_from_json()
+    carousel_data = transform_to_carousel_format(notice_data if isinstance(notice_data, dict) else None)
+    _write_json_atomic(CAROUSEL_JSON_PATH, carousel_data)
+    logger.info(f"캐러셀 데이터가 {CAROUSEL_JSON_PATH}에 저장되었습니다.")
+    return carousel_data
+
+
+def load_carousel_data_from_json():
+    """
+    JSON 파일에서 캐러셀 데이터를 로드합니다.
+
+    Returns:
+        dict: 로드된 캐러셀 데이터, 파일이 없으면 빈 딕셔너리
+    """
+    try:
+        if os.path.exists(CAROUSEL_JSON_PATH):
+            return _load_json_cached(CAROUSEL_JSON_PATH)
+    except Exception as e:
+        logger.error(f"캐러셀 데이터 로드 중 오류 발생: {e}")
+
+    return {}
+
+
 def get_notice_detail(endpoint: str, notice_id: int) -> str:
     """
     Nexon API의 /detail 엔드포인트를 호출하여 공지사항 본문 내용을 가져옵니다.
@@ -164,9 +332,8 @@ def get_notice_detail(endpoint: str, notice_id: int) -> str:
             raw_content = detail_data.get("contents") or detail_data.get("content")
             
             if raw_content:
-                # HTML 태그 제거
-                soup = BeautifulSoup(raw_content, 'html.parser')
-                content = soup.get_text(separator='\n').strip()
+                # HTML 태그 제거 (표는 Markdown으로 유지, 결과는 notice_id + 본문 해시로 캐시)
+                content = convert_notice_html(notice_id, raw_content)
                 return content
             else:
                 logger.warning(f"상세 데이터에 내용 필드가 없습니다: {detail_data.keys()}")
@@ -184,6 +351,7 @@ def sync_notices_to_rag() -> bool:
     """
     최신 공지사항/이벤트를 가져와서 RAG용 JSON 파일로 저장합니다.
     넥슨 API의 상세 페이지 엔드포인트를 활용합니다.
+    파일이 교체되면 rag_corpus_version()이 바뀌어 채팅 답변 캐시가 무효화됩니다.
     """
     print("🚀 RAG용 공지사항 동기화 시작...")
     logger.info("RAG용 공지사항 동기화 시작")
@@ -248,9 +416,7 @@ def sync_notices_to_rag() -> bool:
         abs_path = os.path.abspath(NOTICE_JSON_PATH)
         print(f"💾 파일 저장 시도: {abs_path}")
         
-        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-        with open(abs_path, 'w', encoding='utf-8') as f:
-            json.dump(rag_docs, f, ensure_ascii=False, indent=2)
+        _write_json_atomic(abs_path, rag_docs)
         
         print(f"✅ 동기화 완료! 총 {len(rag_docs)}건이 저장되었습니다.")
         logger.info(f"RAG용 공지사항 데이터가 {abs_path}에 저장되었습니다. (총 {len(rag_docs)}건)")
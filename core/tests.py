@@ -1,3 +1,198 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
 from django.test import TestCase
 
-# Create your tests here.
+from core import refresher, services
+from core.notice_html import clear_cache, convert_notice_html, html_to_text
+
+
+class JsonDataApiTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.notice_path = os.path.join(self.tmp_dir, 'notice_list.json')
+        with open(self.notice_path, 'w', encoding='utf-8') as f:
+            json.dump({'notice_event': {'event_notice': [{'title': '이벤트'}]}}, f, ensure_ascii=False)
+
+        patcher = patch.object(services, 'NOTICE_LIST_JSON_PATH', self.notice_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_notice_json_returns_validators(self):
+        resp = self.client.get('/api/notices/json/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('ETag', resp)
+        self.assertIn('Last-Modified', resp)
+        self.assertEqual(resp.json()['data']['notice_event']['event_notice'][0]['title'], '이벤트')
+
+    def test_notice_json_not_modified(self):
+        etag = self.client.get('/api/notices/json/')['ETag']
+
+        resp = self.client.get('/api/notices/json/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b'')
+
+    def test_notice_json_changed_file_invalidates_etag(self):
+        etag = self.client.get('/api/notices/json/')['ETag']
+
+        with open(self.notice_path, 'w', encoding='utf-8') as f:
+            json.dump({'notice_event': {'event_notice': []}, 'notice_update': {}}, f)
+        stat = os.stat(self.notice_path)
+        os.utime(self.notice_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        resp = self.client.get('/api/notices/json/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['data']['notice_event']['event_notice'], [])
+
+
+class JsonFileCacheTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'rankings', 'ranking_data_rag.json')
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        services._write_json_atomic(self.path, {'overall_ranking': [{'ranking': 1}]})
+
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['ranking_data_rag.json'])
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'overall_ranking': [{'ranking': 1}]})
+
+    def test_reader_parses_once_until_file_is_replaced(self):
+        services._write_json_atomic(self.path, {'overall_ranking': []})
+
+        first = services._load_json_cached(self.path)
+        self.assertIs(services._load_json_cached(self.path), first)
+
+        services._write_json_atomic(self.path, {'overall_ranking': [{'ranking': 1}]})
+        second = services._load_json_cached(self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second['overall_ranking'][0]['ranking'], 1)
+
+
+class NoticeHtmlTests(TestCase):
+    def test_table_is_kept_as_markdown(self):
+        html = (
+            '<p>보상 안내</p><table><tr><th>보상</th><th>조건</th></tr>'
+            '<tr><td>경험치 <b>2배</b></td><td>레벨 200 | 이상</td></tr></table>'
+        )
+        self.assertEqual(html_to_text(html), (
+            '보상 안내\n\n'
+            '| 보상 | 조건 |\n'
+            '| --- | --- |\n'
+            '| 경험치 2배 | 레벨 200 \\| 이상 |'
+        ))
+
+    def test_images_and_scripts_are_dropped(self):
+        html = '<div>기간<img src="a.png" alt="배너">안내<script>alert(1)</script><style>p{}</style></div>'
+        self.assertEqual(html_to_text(html), '기간안내')
+
+    def test_convert_is_cached_by_notice_id_and_content(self):
+        clear_cache()
+        with patch('core.notice_html.html_to_text', wraps=html_to_text) as mock_convert:
+            convert_notice_html(1, '<p>본문</p>')
+            convert_notice_html(1, '<p>본문</p>')
+            self.assertEqual(mock_convert.call_count, 1)
+
+            self.assertEqual(convert_notice_html(1, '<p>수정된 본문</p>'), '수정된 본문')
+            self.assertEqual(mock_convert.call_count, 2)
+
+
+class NoticeListFetchTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        patcher = patch.object(services, 'NOTICE_LIST_JSON_PATH', os.path.join(self.tmp_dir, 'notice_list.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_notice_lists_are_fetched_concurrently(self):
+        async def fake_aget_api_data(session, endpoint, params=None):
+            await asyncio.sleep(0.2)
+            return {'endpoint': endpoint}
+
+        with patch('core.services.aget_api_data', side_effect=fake_aget_api_data):
+            start = time.perf_counter()
+            notice_data = services.get_notice_list()
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(notice_data['notice_event'], {'endpoint': '/notice-event'})
+        self.assertEqual(notice_data['notice_update'], {'endpoint': '/notice-update'})
+        # 저장된 파일이 최신이므로 두 번째 호출은 API를 다시 부르지 않음
+        with patch('core.services.aget_api_data') as mock_fetch:
+            self.assertEqual(services.get_notice_list(), notice_data)
+            mock_fetch.assert_not_called()
+
+
+class DataRefresherTests(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        paths = {
+            'NOTICE_JSON_PATH': os.path.join(self.tmp_dir, 'notice_data_rag.json'),
+            'NOTICE_LIST_JSON_PATH': os.path.join(self.tmp_dir, 'notice_list.json'),
+            'RANKING_JSON_PATH': os.path.join(self.tmp_dir, 'ranking_data_rag.json'),
+            'CAROUSEL_JSON_PATH': os.path.join(self.tmp_dir, 'carousel_data.json'),
+        }
+        for name, path in paths.items():
+            patcher = patch.object(services, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(refresher, 'REFRESH_STATUS_PATH', os.path.join(self.tmp_dir, 'refresh_status.json'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def test_refresh_records_status_and_home_reads_prepared_data(self):
+        async def fake_aget_api_data(session, endpoint, params=None):
+            if endpoint == '/notice-update':
+                return {'update_notice': [{'title': '업데이트'}]}
+            return {}
+
+        with patch('core.services.aget_api_data', side_effect=fake_aget_api_data), \
+                patch('core.services.get_api_data', return_value={'ranking': [{'character_name': '랭커'}]}):
+            results = asyncio.run(refresher.DataRefresher(jitter=0).refresh_all())
+        self.assertEqual(results, {'notices': True, 'rankings': True, 'carousel': True})
+
+        # 메인 페이지 API는 Nexon API를 호출하지 않고 준비된 파일만 읽음
+        with patch('core.services.get_api_data') as mock_get, patch('core.services.aget_api_data') as mock_aget:
+            data = self.client.get('/api/home/data/').json()
+            mock_get.assert_not_called()
+            mock_aget.assert_not_called()
+        self.assertEqual(data['notices']['updates'], [{'title': '업데이트'}])
+        self.assertEqual(data['ranking'], [{'character_name': '랭커'}])
+
+        status = self.client.get('/api/home/refresh-status/').json()['jobs']
+        self.assertTrue(status['rankings']['ok'])
+        self.assertIn('last_duration_ms', status['notices'])
+        self.assertIsNotNone(status['carousel']['age_seconds'])
+
+    def test_notice_refresh_does_not_touch_rag_corpus(self):
+        rag_docs = [{'title': '[event] 이벤트', 'content': '본문', 'content_type': 'notice'}]
+        services._write_json_atomic(services.NOTICE_JSON_PATH, rag_docs)
+        version = services.rag_corpus_version()
+
+        with patch('core.services.aget_api_data', return_value={'event_notice': [{'title': '이벤트'}]}):
+            ok = asyncio.run(refresher.DataRefresher(jobs=['notices']).refresh('notices'))
+
+        self.assertTrue(ok)
+        self.assertEqual(services._load_json_cached(services.NOTICE_JSON_PATH), rag_docs)
+        # RAG 문서가 그대로이므로 답변 캐시/시맨틱 캐시가 무효화되지 않음
+        self.assertEqual(services.rag_corpus_version(), version)
+        self.assertEqual(services.load_notice_data_from_json()['notice_event'], {'event_notice': [{'title': '이벤트'}]})
+
+    def test_failed_refresh_keeps_previous_data(self):
+        services.save_ranking_data_to_json({'overall_ranking': [{'character_name': '랭커'}]})
+
+        with patch('core.services.get_api_data', return_value=None):
+            ok = asyncio.run(refresher.DataRefresher(jobs=['rankings']).refresh('rankings'))
+
+        self.assertFalse(ok)
+        self.assertEqual(services.load_ranking_data_from_json()['overall_ranking'], [{'character_name': '랭커'}])
+        self.assertFalse(refresher.load_refresh_status()['rankings']['ok'])
@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views
-from .api.views import HomeDataAPIView
+from .api.views import HomeDataAPIView, RefreshStatusAPIView
 
 app_name = 'core'
 
@@ -10,6 +10,7 @@ urlpatterns = [
     
     # API - Home Data (통합 데이터)
     path('api/home/data/', HomeDataAPIView.as_view(), name='home_data_api'),
+    path('api/home/refresh-status/', RefreshStatusAPIView.as_view(), name='refresh_status_api'),
 
     # API - Notices (개별, 레거시)
     path('api/notices/cashshop/', views.notice_cashshop_api, name='notice_cashshop_api'),
@@ -1,11 +1,10 @@
-from django.http.request import HttpRequest
 from django.http import JsonResponse, HttpResponse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
 from django.views.decorators.csrf import csrf_exempt
 import logging
 import json
-import os
 from django.conf import settings
+from . import services
 from .services import get_api_data
 from pathlib import Path
 
@@ -130,10 +129,30 @@ def notice_update_api(request):
 # JSON 데이터 API
 # ============================================================================
 
+# 조건부 GET(ETag / Last-Modified) 처리용 함수
+# 파일이 바뀌지 않았으면 Django의 condition 데코레이터가 뷰 실행 없이 304를 반환합니다.
+def _notice_json_etag(request):
+    return services.json_file_etag(services.NOTICE_LIST_JSON_PATH)
+
+
+def _notice_json_last_modified(request):
+    return services.json_file_last_modified(services.NOTICE_LIST_JSON_PATH)
+
+
+def _ranking_json_etag(request):
+    return services.json_file_etag(services.RANKING_JSON_PATH)
+
+
+def _ranking_json_last_modified(request):
+    return services.json_file_last_modified(services.RANKING_JSON_PATH)
+
+
 @require_http_methods(["GET"])
+@condition(etag_func=_notice_json_etag, last_modified_func=_notice_json_last_modified)
 def notice_json_api(request):
     """
     JSON 파일에서 공지사항 데이터를 로드하여 반환하는 API
+    파일의 mtime 기반 ETag/Last-Modified 헤더를 포함하며, 변경이 없으면 304를 반환합니다.
     
     Returns:
         JSON: {
@@ -143,8 +162,7 @@ def notice_json_api(request):
         }
     """
     try:
-        from .services import load_notice_data_from_json
-        notice_data = load_notice_data_from_json()
+        notice_data = services.load_notice_data_from_json()
         
         return JsonResponse({
             'data': notice_data,
@@ -160,9 +178,11 @@ def notice_json_api(request):
 
 
 @require_http_methods(["GET"])
+@condition(etag_func=_ranking_json_etag, last_modified_func=_ranking_json_last_modified)
 def ranking_json_api(request):
     """
     JSON 파일에서 랭킹 데이터를 로드하여 반환하는 API
+    파일의 mtime 기반 ETag/Last-Modified 헤더를 포함하며, 변경이 없으면 304를 반환합니다.
     
     Returns:
         JSON: {
@@ -170,8 +190,7 @@ def ranking_json_api(request):
         }
     """
     try:
-        from .services import load_ranking_data_from_json
-        ranking_data = load_ranking_data_from_json()
+        ranking_data = services.load_ranking_data_from_json()
         
         return JsonResponse({
             'data': ranking_data,
@@ -4,15 +4,19 @@ import client from './client';
 export const createSession = () =>
   client.post('/mai_chat/api/chat/sessions/create/');
 
-// 세션 목록 조회
-export const getSessions = () =>
-  client.get('/mai_chat/api/chat/sessions/');
+// 세션 목록 조회 (cursor: 이전 응답의 next_cursor, 없으면 최신 페이지)
+export const getSessions = (cursor) =>
+  client.get('/mai_chat/api/chat/sessions/', { params: cursor ? { cursor } : {} });
 
 
 
-// 세션의 메시지 목록 조회
-export const getMessages = (sessionId) =>
-  client.get(`/mai_chat/api/chat/sessions/${sessionId}/messages/`);
+// 세션의 메시지 목록 조회 (before: 이전 응답의 next_before, 없으면 최신 페이지)
+export const getMessages = (sessionId, before) =>
+  client.get(`/mai_chat/api/chat/sessions/${sessionId}/messages/`, { params: before ? { before } : {} });
+
+// 메시지의 사고 과정(thinking) 조회
+export const getMessageThinking = (sessionId, messageId) =>
+  client.get(`/mai_chat/api/chat/sessions/${sessionId}/messages/${messageId}/thinking/`);
 
 // 메시지 전송
 export const sendMessage = (sessionId, content) =>
@@ -34,7 +38,9 @@ export const streamMessage = async (sessionId, content, onChunk, onDone, onError
     });
 
     if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+      const error = new Error(`HTTP error! status: ${response.status}`);
+      error.status = response.status;  // 429: 대기열이 가득 참
+      throw error;
     }
 
     const reader = response.body.getReader();
@@ -7,22 +7,40 @@ import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import '../styles/pages/chat.css';
 
+// 메시지 API 응답을 화면용 메시지 형태로 변환 (thinking은 펼칠 때 따로 불러옴)
+const formatMessages = (data) => data.map(msg => ({
+  role: msg.role,  // 백엔드가 이제 role을 직접 반환
+  content: msg.content,
+  messageId: msg.message_id,
+  hasThinking: !!msg.has_thinking,
+  thinking: msg.thinking || ''
+}));
+
+// thinking 펼침 상태 키 (저장된 메시지는 ID, 방금 보낸 메시지는 인덱스 사용)
+const thinkingKey = (msg, idx) => (msg.messageId ? `${msg.messageId}-${msg.role}` : `local-${idx}`);
+
 const ChatPage = () => {
   const { user, logout, isLoggedIn } = useAuth();
   const navigate = useNavigate();
   const location = useLocation();
 
   const [sessions, setSessions] = useState([]);
+  // 세션 목록 다음 페이지 커서 (null이면 더 불러올 세션 없음)
+  const [sessionsCursor, setSessionsCursor] = useState(null);
   const [currentSessionId, setCurrentSessionId] = useState(null);
   const [messages, setMessages] = useState([]);
+  // 이전 메시지 페이지 커서 (null이면 더 불러올 메시지 없음)
+  const [messagesBefore, setMessagesBefore] = useState(null);
   const [input, setInput] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   // eslint-disable-next-line no-unused-vars
   const [isInitializing, setIsInitializing] = useState(true);
-  // Thinking 표시 상태 관리 (메시지 인덱스별로 확장 여부 저장)
+  // Thinking 표시 상태 관리 (thinkingKey별로 확장 여부 저장)
   const [expandedThinking, setExpandedThinking] = useState({});
 
   const messagesEndRef = useRef(null);
+  // 이전 메시지를 앞에 붙이거나 thinking을 불러올 때는 자동 스크롤하지 않음
+  const skipAutoScrollRef = useRef(false);
 
   // 홈에서 전달된 초기 메시지 처리
   useEffect(() => {
@@ -40,12 +58,8 @@ const ChatPage = () => {
         setIsLoading(true);
         try {
           const response = await chatApi.getMessages(sessionId);
-          const formattedMessages = response.data.data.map(msg => ({
-            role: msg.role,  // 백엔드가 이제 role을 직접 반환
-            content: msg.content,
-            thinking: msg.thinking || ''  // thinking 필드 추가
-          }));
-          setMessages(formattedMessages);
+          setMessages(formatMessages(response.data.data));
+          setMessagesBefore(response.data.next_before || null);
         } catch (error) {
           console.error("Failed to load messages:", error);
         } finally {
@@ -61,6 +75,7 @@ const ChatPage = () => {
           setSessions(prev => [newSession, ...prev]);
           setCurrentSessionId(newSession.id);
           setMessages([]);
+          setMessagesBefore(null);
         } catch (error) {
           console.error("Failed to create session:", error);
           // 세션 생성 실패 시에도 임시 ID로 채팅 가능하도록 설정
@@ -77,6 +92,7 @@ const ChatPage = () => {
           try {
             const response = await chatApi.getSessions();
             sessionList = response.data.data;
+            setSessionsCursor(response.data.next_cursor || null);
           } catch (error) {
             console.error("Failed to load sessions:", error);
           }
@@ -106,21 +122,33 @@ const ChatPage = () => {
 
   // 2. 스크롤 자동 이동
   useEffect(() => {
+    if (skipAutoScrollRef.current) {
+      skipAutoScrollRef.current = false;
+      return;
+    }
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages]);
 
+  // 이전 세션 더 불러오기
+  const loadMoreSessions = async () => {
+    if (!sessionsCursor) return;
+    try {
+      const response = await chatApi.getSessions(sessionsCursor);
+      setSessions(prev => [...prev, ...response.data.data]);
+      setSessionsCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error("Failed to load more sessions:", error);
+    }
+  };
+
   // 세션 선택 함수
   const selectSession = async (sessionId) => {
     setCurrentSessionId(sessionId);
     setIsLoading(true);
     try {
       const response = await chatApi.getMessages(sessionId);
-      const formattedMessages = response.data.data.map(msg => ({
-        role: msg.role,  // 백엔드가 이제 role을 직접 반환
-        content: msg.content,
-        thinking: msg.thinking || ''  // thinking 필드 추가
-      }));
-      setMessages(formattedMessages);
+      setMessages(formatMessages(response.data.data));
+      setMessagesBefore(response.data.next_before || null);
       setExpandedThinking({});  // 세션 변경 시 thinking 상태 초기화
     } catch (error) {
       console.error("Failed to load messages:", error);
@@ -129,6 +157,39 @@ const ChatPage = () => {
     }
   };
 
+  // 이전 메시지 더 불러오기
+  const loadOlderMessages = async () => {
+    if (!messagesBefore || !currentSessionId) return;
+    try {
+      const response = await chatApi.getMessages(currentSessionId, messagesBefore);
+      skipAutoScrollRef.current = true;
+      setMessages(prev => [...formatMessages(response.data.data), ...prev]);
+      setMessagesBefore(response.data.next_before || null);
+    } catch (error) {
+      console.error("Failed to load older messages:", error);
+    }
+  };
+
+  // thinking 토글 (저장된 메시지는 처음 펼칠 때 서버에서 불러옴)
+  const toggleThinking = async (msg, idx) => {
+    const key = thinkingKey(msg, idx);
+    const willExpand = !expandedThinking[key];
+    setExpandedThinking(prev => ({ ...prev, [key]: willExpand }));
+
+    if (!willExpand || msg.thinking || !msg.hasThinking || !msg.messageId) return;
+    try {
+      const response = await chatApi.getMessageThinking(currentSessionId, msg.messageId);
+      skipAutoScrollRef.current = true;
+      setMessages(prev => prev.map(m => (
+        m.messageId === msg.messageId && m.role === 'assistant'
+          ? { ...m, thinking: response.data.data.thinking }
+          : m
+      )));
+    } catch (error) {
+      console.error("Failed to load thinking:", error);
+    }
+  };
+
   // 새 채팅 시작 함수
   const handleNewChat = async () => {
     try {
@@ -137,6 +198,7 @@ const ChatPage = () => {
       setSessions(prev => [newSession, ...prev]);
       setCurrentSessionId(newSession.id);
       setMessages([]);
+      setMessagesBefore(null);
     } catch (error) {
       console.error("Failed to create session:", error);
       // 세션 생성 실패 시에도 임시 ID로 채팅 가능하도록 설정
@@ -183,6 +245,33 @@ const ChatPage = () => {
             }
             return newMessages;
           });
+        } else if (chunk.type === 'queued') {
+          // 다른 요청이 처리 중이면 첫 토큰이 오기 전까지 대기 순번 표시
+          setMessages(prev => {
+            const newMessages = [...prev];
+            const lastIdx = newMessages.length - 1;
+            if (newMessages[lastIdx].role === 'assistant' && !accumulatedContent) {
+              newMessages[lastIdx] = {
+                ...newMessages[lastIdx],
+                content: `⏳ 요청이 많아 대기 중입니다... (대기 순번: ${chunk.position})`
+              };
+            }
+            return newMessages;
+          });
+        } else if (chunk.type === 'summary') {
+          // 스트림 종료 직전 최종 답변(사고 과정 분리됨)으로 교체
+          setMessages(prev => {
+            const newMessages = [...prev];
+            const lastIdx = newMessages.length - 1;
+            if (newMessages[lastIdx].role === 'assistant') {
+              newMessages[lastIdx] = {
+                ...newMessages[lastIdx],
+                content: chunk.response || accumulatedContent,
+                thinking: chunk.thinking || ''
+              };
+            }
+            return newMessages;
+          });
         } else if (chunk.type === 'error') {
           console.error("Stream error:", chunk.content);
         }
@@ -199,7 +288,9 @@ const ChatPage = () => {
           const lastIdx = newMessages.length - 1;
           newMessages[lastIdx] = {
             ...newMessages[lastIdx],
-            content: newMessages[lastIdx].content + "\n[오류가 발생했습니다]"
+            content: error.status === 429
+              ? "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."
+              : newMessages[lastIdx].content + "\n[오류가 발생했습니다]"
           };
           return newMessages;
         });
@@ -313,6 +404,16 @@ const ChatPage = () => {
               </div>
             ))
           )}
+
+          {isLoggedIn && sessionsCursor && (
+            <button
+              className="btn btn-outline"
+              style={{ width: '100%', marginTop: '10px' }}
+              onClick={loadMoreSessions}
+            >
+              이전 채팅 더 보기
+            </button>
+          )}
         </div>
       </div>
     </>
@@ -351,6 +452,16 @@ const ChatPage = () => {
           </div>
         )}
 
+        {messagesBefore && (
+          <button
+            className="btn btn-outline"
+            style={{ alignSelf: 'center', marginBottom: '10px' }}
+            onClick={loadOlderMessages}
+          >
+            이전 메시지 더 보기
+          </button>
+        )}
+
         {messages.map((msg, idx) => (
           <div
             key={idx}
@@ -364,21 +475,18 @@ const ChatPage = () => {
                 {msg.content}
               </ReactMarkdown>
               {/* AI 메시지이고 thinking이 있을 경우 토글 표시 */}
-              {msg.role === 'assistant' && msg.thinking && (
+              {msg.role === 'assistant' && (msg.thinking || msg.hasThinking) && (
                 <div className="thinking-container">
                   <button
                     className="thinking-toggle"
-                    onClick={() => setExpandedThinking(prev => ({
-                      ...prev,
-                      [idx]: !prev[idx]
-                    }))}
+                    onClick={() => toggleThinking(msg, idx)}
                   >
-                    <span className={`thinking-toggle-icon ${expandedThinking[idx] ? 'expanded' : ''}`}>
+                    <span className={`thinking-toggle-icon ${expandedThinking[thinkingKey(msg, idx)] ? 'expanded' : ''}`}>
                       🧠
                     </span>
-                    {expandedThinking[idx] ? '사고 과정 숨기기' : '사고 과정 보기'}
+                    {expandedThinking[thinkingKey(msg, idx)] ? '사고 과정 숨기기' : '사고 과정 보기'}
                   </button>
-                  {expandedThinking[idx] && (
+                  {expandedThinking[thinkingKey(msg, idx)] && (
                     <div className="thinking-content">
                       <div className="thinking-label">
                         <span className="thinking-label-icon">💭</span>
@@ -8,7 +8,7 @@ class ChatMessageInline(admin.TabularInline):
 
 @admin.register(ChatSession)
 class ChatSessionAdmin(admin.ModelAdmin):
-    list_display = ('session_id', 'user', 'created_at')
+    list_display = ('session_id', 'user', 'title', 'message_count', 'last_activity_at', 'created_at')
     inlines = [ChatMessageInline] # 세션 상세 화면에서 메시지 내역을 같이 보여줌
 
 @admin.register(ChatMessage)
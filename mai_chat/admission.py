@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+AI 서버 요청 수 제한(Admission Control)
+
+동시에 AI 서버로 보내는 요청 수를 CHAT_MAX_CONCURRENCY로 제한하고,
+나머지는 크기가 제한된 대기열에서 순서를 기다리게 합니다.
+
+- 대기열은 사용자별 FIFO이며, 사용자 사이에서는 돌아가며(round-robin) 한 건씩 처리하므로
+  한 사용자가 요청을 몰아 보내도 다른 사용자의 대기 순번이 밀리지 않음
+- 대기열이 가득 차면 기다리지 않고 바로 QueueFull을 발생 (뷰에서 429 응답)
+- 여러 이벤트 루프/스레드에서 동시에 사용할 수 있도록 threading.RLock으로 상태를 보호하고,
+  대기 중인 요청은 wait()를 호출한 이벤트 루프에서 깨움
+  (WSGI에서는 뷰와 스트리밍 응답 본문이 서로 다른 async_to_sync 이벤트 루프에서 실행되므로
+  Waiter를 특정 루프에 묶지 않음)
+
+사용 예:
+    waiter = get_controller().enqueue(user_key)   # QueueFull 발생 가능
+    try:
+        await waiter.wait()
+        ...  # AI 서버 호출
+    finally:
+        waiter.release()
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+
+class QueueFull(Exception):
+    """대기열이 가득 차서 요청을 받을 수 없을 때 발생합니다."""
+
+
+class Waiter:
+    """대기열에 들어간 요청 하나. release()는 처리 완료/취소 모두에서 한 번 호출해야 합니다."""
+
+    def __init__(self, controller, user_key):
+        self._controller = controller
+        # 마지막으로 wait()를 호출한 이벤트 루프와 그 루프의 future
+        self._loop = None
+        self._future = None
+        self._released = False
+        self.user_key = user_key
+        self.admitted = False
+
+    def _admit_locked(self):
+        self.admitted = True
+        if self._future is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._resolve, self._future)
+            except RuntimeError:
+                # 기다리던 루프가 이미 닫힘 - 다음 wait()가 admitted를 보고 바로 반환
+                pass
+
+    @staticmethod
+    def _resolve(future):
+        if not future.done():
+            future.set_result(None)
+
+    @property
+    def position(self) -> int:
+        """대기 순번 (1부터 시작). 이미 처리 차례가 되었으면 0을 반환합니다."""
+        return self._controller._position(self)
+
+    async def wait(self, timeout=None) -> bool:
+        """
+        처리 차례가 될 때까지 기다립니다.
+
+        Returns:
+            bool: 차례가 되었으면 True, timeout 안에 차례가 오지 않았으면 False
+        """
+        loop = asyncio.get_running_loop()
+        with self._controller._lock:
+            if self.admitted:
+                return True
+            if self._loop is not loop:
+                self._loop = loop
+                self._future = loop.create_future()
+            future = self._future
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return self.admitted
+        return True
+
+    def release(self):
+        """처리 중이었다면 자리를 반납하고, 대기 중이었다면 대기열에서 빠집니다."""
+        self._controller._release(self)
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency, max_queue, max_queue_per_user):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_queue_per_user = max(1, max_queue_per_user)
+
+        # 가비지 컬렉션 중(응답 객체 정리)에 release()가 호출될 수 있으므로 재진입 가능한 잠금 사용
+        self._lock = threading.RLock()
+        self._active = 0
+        self._queued = 0
+        # 사용자 키 : 대기 요청 deque (순서 = 다음에 처리할 사용자 순서)
+        self._queues = OrderedDict()
+
+    def enqueue(self, user_key) -> Waiter:
+        """
+        요청을 등록합니다. 여유가 있으면 바로 처리 차례가 된 Waiter를 반환합니다.
+
+        Raises:
+            QueueFull: 전체 또는 사용자별 대기열이 가득 찬 경우
+        """
+        waiter = Waiter(self, user_key)
+        with self._lock:
+            if self._active < self.max_concurrency and self._queued == 0:
+                self._active += 1
+                waiter._admit_locked()
+                return waiter
+
+            user_queue = self._queues.get(user_key)
+            if self._queued >= self.max_queue or (user_queue and len(user_queue) >= self.max_queue_per_user):
+                raise QueueFull()
+
+            if user_queue is None:
+                user_queue = self._queues[user_key] = deque()
+            user_queue.append(waiter)
+            self._queued += 1
+        return waiter
+
+    def snapshot(self) -> dict:
+        """현재 처리 중/대기 중인 요청 수를 반환합니다."""
+        with self._lock:
+            return {
+                'active': self._active,
+                'queued': self._queued,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+            }
+
+    def _grant_next_locked(self):
+        while self._active < self.max_concurrency and self._queues:
+            user_key, user_queue = next(iter(self._queues.items()))
+            waiter = user_queue.popleft()
+            self._queued -= 1
+            # 한 건 처리한 사용자는 순서의 맨 뒤로 보냄
+            if user_queue:
+                self._queues.move_to_end(user_key)
+            else:
+                del self._queues[user_key]
+
+            waiter._admit_locked()
+            self._active += 1
+
+    def _release(self, waiter):
+        with self._lock:
+            if waiter._released:
+                return
+            waiter._released = True
+            if waiter.admitted:
+                self._active -= 1
+            else:
+                user_queue = self._queues.get(waiter.user_key)
+                if user_queue is not None and waiter in user_queue:
+                    user_queue.remove(waiter)
+                    self._queued -= 1
+                    if not user_queue:
+                        del self._queues[waiter.user_key]
+            self._grant_next_locked()
+
+    def _position(self, waiter) -> int:
+        with self._lock:
+            if waiter.admitted or waiter._released:
+                return 0
+            user_queue = self._queues[waiter.user_key]
+            index = user_queue.index(waiter)
+            # round-robin 순서에서 앞선 라운드(index회)에 처리될 요청 수 + 같은 라운드에서 앞선 사용자 수
+            position = 1
+            before_own_user = True
+            for user_key, other in self._queues.items():
+                position += min(len(other), index)
+                if user_key == waiter.user_key:
+                    before_own_user = False
+                elif before_own_user and len(other) > index:
+                    position += 1
+            return position
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller() -> AdmissionController:
+    """설정값(CHAT_MAX_CONCURRENCY 등)으로 만든 프로세스 공용 컨트롤러를 반환합니다."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    settings.CHAT_MAX_CONCURRENCY,
+                    settings.CHAT_QUEUE_MAX,
+                    settings.CHAT_QUEUE_MAX_PER_USER,
+                )
+    return _controller
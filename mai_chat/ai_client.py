@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+AI 서버(FastAPI) 비동기 HTTP 클라이언트
+
+ASGI 서버(uvicorn 등)에서는 서버 이벤트 루프에 하나의 aiohttp 세션(커넥션 풀)을 만들어 재사용합니다.
+요청마다 연결을 새로 맺지 않으며, 응답을 기다리는 동안 워커 스레드를 점유하지 않습니다.
+세션은 ASGI lifespan(maple_chatbot/asgi.py)의 시작/종료에 맞춰 열고 닫습니다.
+
+WSGI(runserver 등)에서는 비동기 뷰가 요청마다 새 이벤트 루프(async_to_sync)에서 실행되어
+루프에 묶인 풀을 재사용할 수 없으므로, 요청마다 세션을 열고 응답을 다 읽으면 닫습니다.
+"""
+
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+
+import aiohttp
+from django.conf import settings
+
+from core.services import rag_corpus_version
+
+# ASGI lifespan이 시작된 서버 이벤트 루프와 그 루프의 공유 세션 (세션은 생성된 루프에서만 사용할 수 있음)
+_pool_loop = None
+_session = None
+# 실행 중인 백그라운드 태스크 (끝나기 전에 가비지 컬렉션되지 않도록 참조 유지)
+_background_tasks = set()
+
+# /stream의 마지막 요약 이벤트 시작 부분 (json.dumps 기본 구분자 기준)
+# 토큰 내용 안의 따옴표는 이스케이프되므로 토큰 이벤트와 겹치지 않음
+SUMMARY_EVENT_PREFIX = b'data: {"type": "summary"'
+
+
+class AIServerError(Exception):
+    """AI 서버가 200이 아닌 응답을 반환했을 때 발생합니다."""
+
+    def __init__(self, status, body):
+        super().__init__(f"AI Server Error: {status} - {body}")
+        self.status = status
+        self.body = body
+
+
+def ai_server_url(path: str) -> str:
+    return settings.AI_SERVER_URL.rstrip('/') + path
+
+
+def _new_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.AI_SERVER_MAX_CONNECTIONS,
+        keepalive_timeout=30,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=settings.AI_SERVER_TIMEOUT, sock_connect=10),
+    )
+
+
+def _shared_session():
+    """
+    서버 이벤트 루프(ASGI lifespan)에서 호출되면 공유 세션을 반환합니다. 없거나 닫혀 있으면 새로 만듭니다.
+    그 밖의 루프(WSGI의 요청별 루프, 관리 명령 등)에서는 None을 반환합니다.
+    """
+    global _session
+    if _pool_loop is None or asyncio.get_running_loop() is not _pool_loop:
+        return None
+    if _session is None or _session.closed:
+        _session = _new_session()
+    return _session
+
+
+@asynccontextmanager
+async def _request(method: str, path: str, **kwargs):
+    """AI 서버에 요청을 보내고 응답을 반환하는 컨텍스트 매니저. 블록을 벗어나면 응답(과 임시 세션)을 닫습니다."""
+    session = _shared_session()
+    if session is not None:
+        async with session.request(method, ai_server_url(path), **kwargs) as response:
+            yield response
+        return
+    async with _new_session() as session:
+        async with session.request(method, ai_server_url(path), **kwargs) as response:
+            yield response
+
+
+async def close_session():
+    """공유 세션을 닫습니다. (ASGI lifespan 종료 시 호출)"""
+    global _session
+    session, _session = _session, None
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def lifespan(scope, receive, send):
+    """
+    ASGI lifespan 이벤트를 처리합니다. (maple_chatbot/asgi.py)
+    시작 시 현재 이벤트 루프를 공유 세션용 루프로 등록하고, 종료 시 공유 세션을 닫습니다.
+    """
+    global _pool_loop
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            _pool_loop = asyncio.get_running_loop()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_session()
+            _pool_loop = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def run_in_background(coro):
+    """
+    응답과 관계없는 AI 서버 호출(대화 기록 추가 등)을 응답이 기다리지 않도록 따로 실행합니다.
+    ASGI 서버 루프에서는 태스크로 실행하고, 그 밖의 루프(WSGI)는 응답과 함께 닫히므로
+    별도 스레드의 새 이벤트 루프에서 실행합니다.
+
+    Returns:
+        asyncio.Task 또는 threading.Thread
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None and loop is _pool_loop:
+        task = loop.create_task(coro)
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        return task
+    thread = threading.Thread(target=asyncio.run, args=(coro,), name='ai-client-background', daemon=True)
+    thread.start()
+    return thread
+
+
+def _payload(session_id: str, message: str) -> dict:
+    return {
+        "session_id": session_id,  # LangGraph 대화 기억(thread_id)에 사용
+        "message": message,
+        "corpus_version": rag_corpus_version(),  # AI 서버 시맨틱 캐시 범위 (RAG 문서가 바뀌면 무효화)
+    }
+
+
+async def generate(session_id: str, message: str) -> dict:
+    """
+    AI 서버 /generate 에 메시지를 보내고 응답(JSON)을 반환합니다.
+
+    Raises:
+        AIServerError: AI 서버가 200이 아닌 응답을 반환한 경우
+        aiohttp.ClientError, asyncio.TimeoutError: 연결 실패 또는 시간 초과
+    """
+    async with _request('POST', '/generate', json=_payload(session_id, message)) as response:
+        if response.status != 200:
+            raise AIServerError(response.status, await response.text())
+        return await response.json()
+
+
+async def append_history(session_id: str, message: str, response: str):
+    """
+    AI 서버를 거치지 않고 응답한 대화(질문/답변)를 AI 서버의 대화 기억에 추가합니다.
+    다음 질문에서 앞선 대화 맥락을 사용할 수 있도록 합니다.
+
+    Raises:
+        AIServerError, aiohttp.ClientError, asyncio.TimeoutError
+    """
+    payload = {**_payload(session_id, message), "response": response}
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with _request('POST', '/history', json=payload, timeout=timeout) as resp:
+        if resp.status != 200:
+            raise AIServerError(resp.status, await resp.text())
+
+
+async def delete_history(session_id: str):
+    """
+    AI 서버에 저장된 세션의 대화 기억을 삭제합니다. (세션 삭제 시)
+
+    Raises:
+        AIServerError, aiohttp.ClientError, asyncio.TimeoutError
+    """
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with _request('DELETE', f'/sessions/{session_id}', timeout=timeout) as resp:
+        if resp.status != 200:
+            raise AIServerError(resp.status, await resp.text())
+
+
+def stream(session_id: str, message: str):
+    """
+    AI 서버 /stream 요청을 엽니다. `async with ai_client.stream(...) as response:` 형태로 사용하며,
+    블록을 벗어나면 (다 읽지 않았더라도) 업스트림 연결을 닫습니다.
+
+    스트림은 전체 시간 제한 없이, 청크 사이 대기 시간에만 AI_SERVER_TIMEOUT을 적용합니다.
+    """
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=settings.AI_SERVER_TIMEOUT)
+    return _request('POST', '/stream', json=_payload(session_id, message), timeout=timeout)
+
+
+class SummaryScanner:
+    """
+    SSE 바이트 스트림에서 마지막 요약(summary) 이벤트만 찾아 파싱합니다.
+    토큰 이벤트마다 JSON을 파싱하지 않고, 청크 경계를 고려한 바이트 검색만 수행합니다.
+    """
+
+    def __init__(self):
+        self._tail = b''
+        self._buffer = None
+
+    def feed(self, chunk: bytes):
+        if self._buffer is not None:
+            self._buffer += chunk
+            return
+        data = self._tail + chunk
+        index = data.find(SUMMARY_EVENT_PREFIX)
+        if index >= 0:
+            self._buffer = data[index:]
+        else:
+            # 접두어가 청크 경계에 걸칠 수 있으므로 끝부분만 남겨 둠
+            self._tail = data[-(len(SUMMARY_EVENT_PREFIX) - 1):]
+
+    def result(self):
+        """요약 이벤트 딕셔너리를 반환합니다. 없거나 불완전하면 None을 반환합니다."""
+        if self._buffer is None:
+            return None
+        event, sep, _ = self._buffer.partition(b'\n\n')
+        if not sep:
+            return None
+        try:
+            return json.loads(event[len(b'data: '):])
+        except ValueError:
+            return None
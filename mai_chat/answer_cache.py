@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+정확히 일치하는 질문에 대한 답변 캐시
+
+이벤트 기간, 보스 초기화 시간처럼 여러 사용자가 똑같이 묻는 질문은
+AI 서버(라우팅/검색/생성)를 거치지 않고 캐시된 답변으로 바로 응답합니다.
+
+- 키: 정규화된 질문 텍스트 + RAG 코퍼스 버전 (core.services.rag_corpus_version)
+- sync_notices_to_rag가 코퍼스 파일을 교체하면 버전이 바뀌어 캐시 전체가 무효화됨
+- TTL이 지나거나 최대 개수를 넘으면 (가장 오래 사용하지 않은 항목부터) 제거
+- 대화 맥락에 따라 답이 달라질 수 있으므로 세션의 첫 질문에만 사용
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.services import rag_corpus_version
+
+_cache = OrderedDict()  # 질문 키 : (만료 시각, 답변 딕셔너리)
+_cache_lock = threading.Lock()
+_cache_version = None
+
+_space_re = re.compile(r'\s+')
+# 질문 끝의 물음표, 마침표 등은 같은 질문으로 취급
+_trailing_punct_re = re.compile(r'[\s?!.~…？！。]+$')
+
+
+def normalize_question(text: str) -> str:
+    """대소문자, 전각/반각, 공백, 끝 문장부호 차이를 없앤 질문 키를 만듭니다."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = _space_re.sub(' ', text).strip()
+    return _trailing_punct_re.sub('', text)
+
+
+def _sync_version():
+    """코퍼스 버전이 바뀌었으면 캐시를 비웁니다. (_cache_lock을 잡은 상태에서 호출)"""
+    global _cache_version
+    version = rag_corpus_version()
+    if version != _cache_version:
+        _cache.clear()
+        _cache_version = version
+
+
+def get(question: str):
+    """
+    캐시된 답변을 반환합니다. 없거나 만료되었으면 None을 반환합니다.
+
+    Returns:
+        dict: {'response': str, 'thinking': str}
+    """
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    key = normalize_question(question)
+    if not key:
+        return None
+
+    with _cache_lock:
+        _sync_version()
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires_at, answer = entry
+        if expires_at <= time.monotonic():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return answer
+
+
+def put(question: str, response: str, thinking: str = ""):
+    """답변을 캐시에 저장합니다. 빈 답변은 저장하지 않습니다."""
+    if not settings.ANSWER_CACHE_ENABLED or not response:
+        return
+    key = normalize_question(question)
+    if not key:
+        return
+
+    with _cache_lock:
+        _sync_version()
+        _cache[key] = (
+            time.monotonic() + settings.ANSWER_CACHE_TTL,
+            {'response': response, 'thinking': thinking or ""},
+        )
+        _cache.move_to_end(key)
+        while len(_cache) > settings.ANSWER_CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear():
+    """답변 캐시를 비웁니다."""
+    with _cache_lock:
+        _cache.clear()
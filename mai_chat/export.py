@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+채팅 기록 NDJSON 내보내기
+
+메시지 한 건을 JSON 한 줄로 직렬화해 스트리밍합니다. (선택적으로 gzip 압축)
+QuerySet.iterator(chunk_size=...)로 일정 개수씩만 읽고, 출력도 일정 크기마다 내보내므로
+세션/메시지 수와 관계없이 메모리 사용량이 일정합니다.
+
+export_messages_view(HTTP)와 export_chat_history(관리 명령)에서 함께 사용합니다.
+"""
+
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+
+from .models import ChatMessage
+
+# DB에서 한 번에 읽어 올 메시지 수 (PostgreSQL에서는 서버 사이드 커서의 fetch 크기)
+EXPORT_CHUNK_SIZE = 2000
+# 이 크기만큼 모이면 한 번에 내보냄 (작은 줄 단위 write/전송 방지)
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+# 내보내는 필드 : ChatMessage.values() 경로
+EXPORT_FIELDS = {
+    'message_id': 'id',
+    'session_id': 'session_id',
+    'user_id': 'session_id__user_id',
+    'created_at': 'created_at',
+    'user_message': 'user_message',
+    'ai_response': 'ai_response',
+    'thinking': 'thinking',
+    'response_time': 'response_time',
+}
+
+
+def export_queryset(sessions=None, since=None, include_thinking=True):
+    """
+    내보낼 메시지 QuerySet을 만듭니다. 세션별로 묶어 시간순으로 정렬합니다.
+
+    Args:
+        sessions (QuerySet[ChatSession]): 내보낼 세션 (None이면 전체)
+        since (datetime): 이 시각 이후에 생성된 메시지만 내보냄
+        include_thinking (bool): 사고 과정(thinking) 포함 여부
+    """
+    fields = {key: path for key, path in EXPORT_FIELDS.items() if include_thinking or key != 'thinking'}
+
+    messages = ChatMessage.objects.all()
+    if sessions is not None:
+        messages = messages.filter(session_id__in=sessions.values('pk'))
+    if since is not None:
+        messages = messages.filter(created_at__gte=since)
+    # 모델 인스턴스를 만들지 않도록 values()로 필요한 컬럼만 조회
+    return messages.order_by('session_id', 'created_at', 'id').values(*fields.values())
+
+
+def _record(row: dict) -> dict:
+    record = {}
+    for key, path in EXPORT_FIELDS.items():
+        if path not in row:
+            continue
+        value = row[path]
+        if key == 'session_id':
+            value = str(value)
+        elif key == 'created_at':
+            value = value.isoformat()
+        elif key == 'thinking':
+            value = value or ""
+        record[key] = value
+    return record
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """export_queryset 결과를 NDJSON 바이트 청크(약 EXPORT_FLUSH_BYTES 단위)로 생성합니다."""
+    buffer = []
+    size = 0
+    for row in queryset.iterator(chunk_size=chunk_size):
+        line = json.dumps(_record(row), ensure_ascii=False).encode('utf-8') + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_FLUSH_BYTES:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks):
+    """바이트 청크를 gzip 형식으로 압축하며 생성합니다. (전체를 메모리에 모으지 않음)"""
+    # wbits=31: gzip 헤더/트레일러를 포함한 deflate 스트림
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def aiter_sync(iterator):
+    """
+    동기 이터레이터를 비동기 이터레이터로 감쌉니다.
+
+    ASGI에서 StreamingHttpResponse에 동기 이터레이터를 넘기면 전체를 list로 모은 뒤 전송하므로,
+    청크 하나씩 sync_to_async로 꺼내 전달합니다. DB 커서를 연 스레드에서 계속 읽도록
+    thread_sensitive=True(기본값)로 실행합니다.
+    """
+    next_chunk = sync_to_async(next)
+    try:
+        while True:
+            chunk = await next_chunk(iterator, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # 클라이언트 연결이 끊겨도 DB 커서를 정리
+        await sync_to_async(iterator.close)()
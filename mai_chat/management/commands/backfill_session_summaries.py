@@ -0,0 +1,49 @@
+"""
+채팅 세션 요약 컬럼(title, last_message, message_count, last_activity_at) 백필 명령
+
+요약 컬럼이 추가되기 전에 생성된 세션이나, 값이 어긋난 세션을 ChatMessage 기준으로 다시 계산합니다.
+
+사용 예:
+    python manage.py backfill_session_summaries
+    python manage.py backfill_session_summaries --batch-size 500
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mai_chat.models import ChatSession
+from mai_chat.services import annotate_session_summaries, make_session_title
+
+SUMMARY_FIELDS = ['title', 'last_message', 'message_count', 'last_activity_at']
+
+
+class Command(BaseCommand):
+    help = 'ChatMessage를 기준으로 ChatSession 요약 컬럼을 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 갱신할 세션 수')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        sessions = annotate_session_summaries(ChatSession.objects.order_by('pk'))
+
+        total = 0
+        batch = []
+        for session in sessions.iterator(chunk_size=batch_size):
+            session.title = make_session_title(session.first_user_message)
+            session.last_message = session.last_user_message or ""
+            session.message_count = session.num_messages
+            session.last_activity_at = session.last_message_at
+            batch.append(session)
+            if len(batch) >= batch_size:
+                total += self._flush(batch)
+                batch = []
+        if batch:
+            total += self._flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'{total}개 세션의 요약 컬럼을 갱신했습니다.'))
+
+    def _flush(self, batch):
+        with transaction.atomic():
+            ChatSession.objects.bulk_update(batch, SUMMARY_FIELDS)
+        return len(batch)
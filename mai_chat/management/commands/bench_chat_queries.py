@@ -0,0 +1,168 @@
+"""
+채팅 기록 조회 쿼리 벤치마크
+
+대량의 세션/메시지를 생성한 뒤 주요 조회 경로의 실행 계획(EXPLAIN)과 지연 시간을 출력합니다.
+생성한 데이터는 하나의 트랜잭션 안에서 만들고 종료 시 롤백하므로 DB에 남지 않습니다.
+
+측정 대상 (뷰와 같은 쿼리 생성 함수 사용):
+    - session_lookup: 세션 조회 (send_message_view, stream_message_view)
+    - message_page: 세션의 최신 메시지 페이지 (get_messages_view)
+    - message_page_before: 이전 메시지 페이지 (get_messages_view ?before=)
+    - session_page: 사용자의 세션 목록 첫 페이지 (get_sessions_view)
+    - session_page_next: 세션 목록 다음 페이지 (get_sessions_view ?cursor=)
+
+대량 삽입과 --compare의 DROP INDEX는 테이블 잠금을 잡으므로 운영 DB에서 실행하면 안 됩니다.
+settings.DATABASES에 벤치마크 전용 DB를 추가하고 --database로 지정하세요.
+(default DB에서 실행하려면 --allow-default-database를 함께 지정해야 합니다.)
+
+사용 예:
+    # 메시지 100만 건 기준, 복합 인덱스 유무 비교
+    python manage.py bench_chat_queries --database bench --messages 1000000 --compare
+"""
+
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from mai_chat.models import ChatMessage, ChatSession
+from mai_chat.views import (
+    MESSAGE_PAGE_SIZE,
+    SESSION_PAGE_SIZE,
+    _message_page_queryset,
+    _session_page_queryset,
+)
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = '대량 데이터에서 채팅 기록 조회 쿼리의 실행 계획과 지연 시간을 측정합니다. (데이터는 롤백됨)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='벤치마크 전용 DB 별칭 (settings.DATABASES)')
+        parser.add_argument(
+            '--allow-default-database', action='store_true',
+            help='default DB에서 실행 (운영 DB가 아닐 때만 사용)',
+        )
+        parser.add_argument('--messages', type=int, default=1000000, help='생성할 메시지 수')
+        parser.add_argument('--sessions', type=int, default=20000, help='생성할 세션 수')
+        parser.add_argument('--users', type=int, default=500, help='생성할 사용자 수')
+        parser.add_argument('--repeat', type=int, default=50, help='쿼리별 반복 측정 횟수')
+        parser.add_argument('--compare', action='store_true', help='복합 인덱스를 제거한 상태도 함께 측정')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        if self.using not in connections:
+            raise CommandError(f"settings.DATABASES에 '{self.using}' DB가 없습니다.")
+        if self.using == DEFAULT_DB_ALIAS and not options['allow_default_database']:
+            raise CommandError(
+                '대량 삽입과 인덱스 제거가 서비스 트래픽을 막을 수 있어 default DB에서는 실행하지 않습니다. '
+                '--database로 벤치마크 전용 DB를 지정하세요.'
+            )
+        self.connection = connections[self.using]
+
+        random.seed(options['seed'])
+        with transaction.atomic(using=self.using):
+            users, sessions = self._populate(options)
+            self._analyze()
+
+            self.stdout.write(self.style.MIGRATE_HEADING('\n[복합 인덱스 사용]'))
+            self._run_queries(users, sessions, options['repeat'])
+
+            if options['compare']:
+                # PostgreSQL/SQLite는 DDL도 트랜잭션에 포함되므로 롤백 시 인덱스가 복구됨
+                with self.connection.cursor() as cursor:
+                    for model in (ChatMessage, ChatSession):
+                        for index in model._meta.indexes:
+                            cursor.execute(f'DROP INDEX {self.connection.ops.quote_name(index.name)}')
+                self._analyze()
+                self.stdout.write(self.style.MIGRATE_HEADING('\n[복합 인덱스 제거]'))
+                self._run_queries(users, sessions, options['repeat'])
+
+            transaction.set_rollback(True, using=self.using)
+        self.stdout.write('\n생성한 데이터를 롤백했습니다.')
+
+    def _populate(self, options):
+        user_model = get_user_model()
+        prefix = uuid.uuid4().hex[:8]
+        start = time.perf_counter()
+
+        users = user_model.objects.using(self.using).bulk_create(
+            [user_model(username=f'bench_{prefix}_{i}') for i in range(max(1, options['users']))],
+            batch_size=BATCH_SIZE,
+        )
+        sessions = ChatSession.objects.using(self.using).bulk_create(
+            [ChatSession(user=random.choice(users)) for _ in range(max(1, options['sessions']))],
+            batch_size=BATCH_SIZE,
+        )
+
+        remaining = options['messages']
+        while remaining > 0:
+            count = min(BATCH_SIZE, remaining)
+            ChatMessage.objects.using(self.using).bulk_create([
+                ChatMessage(
+                    session_id=random.choice(sessions),
+                    user_message='보스 초기화 시간이 언제야?',
+                    ai_response='매주 목요일 자정에 초기화됩니다.',
+                ) for _ in range(count)
+            ])
+            remaining -= count
+
+        self.stdout.write(
+            f"데이터 생성: 사용자 {len(users)}명, 세션 {len(sessions)}개, "
+            f"메시지 {options['messages']}건 ({time.perf_counter() - start:.1f}s)"
+        )
+        return users, sessions
+
+    def _analyze(self):
+        # 대량 삽입 직후 통계를 갱신해야 플래너가 실제 분포에 맞는 계획을 선택함
+        if self.connection.vendor in ('postgresql', 'sqlite'):
+            with self.connection.cursor() as cursor:
+                for model in (ChatSession, ChatMessage):
+                    cursor.execute(f'ANALYZE {self.connection.ops.quote_name(model._meta.db_table)}')
+
+    def _queries(self, user, session):
+        messages = ChatMessage.objects.using(self.using).filter(session_id=session)
+        sessions = ChatSession.objects.using(self.using).filter(user=user)
+
+        # 다음 페이지 쿼리의 커서는 첫 페이지의 마지막 행 (뷰의 next_before / next_cursor와 같음)
+        last_message = _message_page_queryset(messages).values_list('created_at', 'id')[MESSAGE_PAGE_SIZE - 1:MESSAGE_PAGE_SIZE]
+        last_session = _session_page_queryset(sessions).values_list('created_at', 'session_id')[SESSION_PAGE_SIZE - 1:SESSION_PAGE_SIZE]
+        before_values = next(iter(last_message), None)
+        cursor_values = next(iter(last_session), None)
+
+        return {
+            'session_lookup': ChatSession.objects.using(self.using).filter(session_id=session.session_id),
+            'message_page': _message_page_queryset(messages)[:MESSAGE_PAGE_SIZE + 1],
+            'message_page_before': _message_page_queryset(messages, before_values)[:MESSAGE_PAGE_SIZE + 1],
+            'session_page': _session_page_queryset(sessions)[:SESSION_PAGE_SIZE + 1],
+            'session_page_next': _session_page_queryset(sessions, cursor_values)[:SESSION_PAGE_SIZE + 1],
+        }
+
+    def _run_queries(self, users, sessions, repeat):
+        sample = self._queries(random.choice(users), random.choice(sessions))
+        for name, queryset in sample.items():
+            self.stdout.write(self.style.SQL_KEYWORD(f'\n-- {name}'))
+            self.stdout.write(queryset.explain())
+
+        timings = {name: [] for name in sample}
+        for _ in range(max(1, repeat)):
+            queries = self._queries(random.choice(users), random.choice(sessions))
+            for name, queryset in queries.items():
+                start = time.perf_counter()
+                list(queryset)
+                timings[name].append((time.perf_counter() - start) * 1000)
+
+        self.stdout.write('')
+        for name, values in timings.items():
+            values.sort()
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            self.stdout.write(
+                f'{name:<20} median {statistics.median(values):8.3f}ms  p95 {p95:8.3f}ms  max {values[-1]:8.3f}ms'
+            )
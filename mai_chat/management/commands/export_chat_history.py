@@ -0,0 +1,89 @@
+"""
+채팅 기록 NDJSON 내보내기 명령
+
+메시지 한 건을 JSON 한 줄로 내보냅니다. 메시지 수와 관계없이 메모리 사용량이 일정합니다.
+
+사용 예:
+    python manage.py export_chat_history --output chat_history.ndjson
+    python manage.py export_chat_history --gzip --since 2025-01-01 --output chat_history.ndjson.gz
+    python manage.py export_chat_history --user alice --no-thinking | jq .
+"""
+
+import sys
+import uuid
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from mai_chat import export
+from mai_chat.models import ChatSession
+
+
+class Command(BaseCommand):
+    help = '채팅 기록을 NDJSON(메시지 한 건당 JSON 한 줄)으로 내보냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default='-', help='출력 파일 경로 (기본값: 표준 출력)')
+        parser.add_argument('--gzip', action='store_true', help='gzip으로 압축하여 출력')
+        parser.add_argument('--user', help='이 사용자(username)의 세션만 내보냄')
+        parser.add_argument('--session', help='이 세션 ID만 내보냄')
+        parser.add_argument('--since', help='이 시각(ISO 8601 날짜/시각) 이후의 메시지만 내보냄')
+        parser.add_argument('--no-thinking', action='store_true', help='사고 과정(thinking) 제외')
+        parser.add_argument('--chunk-size', type=int, default=export.EXPORT_CHUNK_SIZE, help='DB에서 한 번에 읽을 메시지 수')
+
+    def handle(self, *args, **options):
+        sessions = None
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"사용자를 찾을 수 없습니다: {options['user']}")
+            sessions = ChatSession.objects.filter(user=user)
+        if options['session']:
+            try:
+                session_id = uuid.UUID(options['session'])
+            except ValueError:
+                raise CommandError(f"세션 ID 형식이 올바르지 않습니다: {options['session']}")
+            sessions = (sessions if sessions is not None else ChatSession.objects.all()).filter(session_id=session_id)
+
+        queryset = export.export_queryset(
+            sessions,
+            since=self._parse_since(options['since']),
+            include_thinking=not options['no_thinking'],
+        )
+        chunks = export.iter_ndjson(queryset, chunk_size=max(1, options['chunk_size']))
+        if options['gzip']:
+            chunks = export.gzip_chunks(chunks)
+
+        if options['output'] == '-':
+            written = self._write(sys.stdout.buffer, chunks)
+        else:
+            with open(options['output'], 'wb') as output:
+                written = self._write(output, chunks)
+            self.stderr.write(self.style.SUCCESS(f"{options['output']}에 {written:,}바이트를 저장했습니다."))
+
+    def _parse_since(self, value):
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+            if since is None:
+                date = parse_date(value)
+                if date is None:
+                    raise ValueError(value)
+                since = datetime.combine(date, datetime.min.time())
+        except ValueError:
+            raise CommandError(f'--since 형식이 올바르지 않습니다: {value}')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def _write(self, output, chunks):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        return written
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mai_chat", "0002_enable_pgvector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatsession",
+            name="last_activity_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="마지막 활동 시각"
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="last_message",
+            field=models.TextField(
+                blank=True, default="", verbose_name="마지막 메시지"
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="message_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="메시지 수"),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="title",
+            field=models.CharField(
+                blank=True, default="", max_length=50, verbose_name="제목"
+            ),
+        ),
+    ]
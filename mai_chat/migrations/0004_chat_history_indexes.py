@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mai_chat", "0003_chatsession_summary_fields"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["session_id", "created_at"], name="chatmsg_session_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chatsession",
+            index=models.Index(
+                fields=["user", "created_at", "session_id"],
+                name="chatsession_user_created_idx",
+            ),
+        ),
+    ]
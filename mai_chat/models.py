@@ -34,6 +34,18 @@ class ChatSession(models.Model):
 
     created_at = models.DateTimeField(auto_now_add = True)
 
+    # 세션 목록 조회용 요약 컬럼 (메시지 저장 시 mai_chat.services.record_session_message로 갱신)
+    title = models.CharField(max_length = 50, blank = True, default = "", verbose_name = "제목")
+    last_message = models.TextField(blank = True, default = "", verbose_name = "마지막 메시지")
+    message_count = models.PositiveIntegerField(default = 0, verbose_name = "메시지 수")
+    last_activity_at = models.DateTimeField(null = True, blank = True, verbose_name = "마지막 활동 시각")
+
+    class Meta:
+        indexes = [
+            # 세션 목록: user로 필터링 후 (-created_at, -session_id) 순 커서 페이지네이션
+            models.Index(fields = ["user", "created_at", "session_id"], name = "chatsession_user_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.session_id[:8]}"
 
@@ -57,6 +69,12 @@ class ChatMessage(models.Model):
 
     created_at = models.DateTimeField(auto_now_add = True)
 
+    class Meta:
+        indexes = [
+            # 세션별 메시지 조회 / 마지막 메시지 조회: session_id로 필터링 후 created_at 순 정렬
+            models.Index(fields = ["session_id", "created_at"], name = "chatmsg_session_created_idx"),
+        ]
+
     def __str__(self):
         return f"Msg {self.id} in {str(self.session.session_id)[:8]}"
     
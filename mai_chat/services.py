@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+MAI Chat 서비스 로직
+
+세션 요약 컬럼(title, last_message, message_count, last_activity_at) 관리를 담당합니다.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Now
+
+from .models import ChatSession, ChatMessage
+
+# 세션 제목으로 사용할 첫 메시지 길이
+TITLE_LENGTH = 20
+
+
+def make_session_title(user_message: str) -> str:
+    """제목 생성: 첫 번째 메시지 내용의 앞부분"""
+    if not user_message:
+        return ""
+    return user_message[:TITLE_LENGTH] + "..." if len(user_message) > TITLE_LENGTH else user_message
+
+
+def _summary_update_kwargs(user_message: str) -> dict:
+    return {
+        # 제목은 첫 메시지일 때만 채움
+        'title': Case(
+            When(title="", then=Value(make_session_title(user_message))),
+            default=F('title'),
+        ),
+        'last_message': user_message,
+        'message_count': F('message_count') + 1,
+        'last_activity_at': Now(),
+    }
+
+
+def record_session_message(session_pk, user_message: str) -> int:
+    """
+    세션에 메시지가 하나 추가되었음을 요약 컬럼에 반영합니다.
+    F-expression을 사용한 단일 UPDATE이므로 동시에 여러 메시지가 저장되어도 개수가 어긋나지 않습니다.
+    """
+    return ChatSession.objects.filter(pk=session_pk).update(**_summary_update_kwargs(user_message))
+
+
+def save_chat_message(session, user_message: str, **fields) -> ChatMessage:
+    """
+    메시지를 저장하고 세션 요약 컬럼을 같은 트랜잭션에서 갱신합니다.
+
+    Args:
+        session (ChatSession): 메시지를 저장할 세션
+        user_message (str): 사용자 메시지
+        **fields: ai_response, thinking, response_time 등 ChatMessage 필드
+    """
+    with transaction.atomic():
+        message = ChatMessage.objects.create(session_id=session, user_message=user_message, **fields)
+        record_session_message(session.pk, user_message)
+    return message
+
+
+async def asave_chat_message(session, user_message: str, **fields) -> ChatMessage:
+    """
+    save_chat_message의 비동기 버전
+    async 컨텍스트에서는 transaction.atomic을 직접 쓸 수 없으므로 하나의 동기 작업으로 묶어 실행합니다.
+    """
+    return await sync_to_async(save_chat_message)(session, user_message, **fields)
+
+
+def annotate_session_summaries(queryset):
+    """
+    ChatMessage에서 세션 요약 값을 다시 계산하여 주석(annotate)으로 붙입니다. (백필용)
+    """
+    messages = ChatMessage.objects.filter(session_id=OuterRef('pk'))
+    return queryset.annotate(
+        first_user_message=Subquery(messages.order_by('created_at').values('user_message')[:1]),
+        last_user_message=Subquery(messages.order_by('-created_at').values('user_message')[:1]),
+        last_message_at=Subquery(messages.order_by('-created_at').values('created_at')[:1]),
+        num_messages=Coalesce(
+            Subquery(messages.order_by().values('session_id').annotate(n=Count('pk')).values('n')[:1]),
+            0,
+        ),
+    )
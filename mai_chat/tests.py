@@ -1,3 +1,756 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import AsyncMock, patch
 
-# Create your tests here.
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import services as core_services
+
+from . import admission, ai_client, answer_cache, export, views
+from .models import ChatSession, ChatMessage
+from .services import record_session_message
+
+
+@contextmanager
+def _joined_background():
+    """뷰가 ai_client.run_in_background로 넘긴 작업이 블록을 벗어나기 전에 끝나도록 기다림"""
+    started = []
+    run_in_background = ai_client.run_in_background
+
+    def run(coro):
+        started.append(run_in_background(coro))
+        return started[-1]
+
+    with patch.object(ai_client, 'run_in_background', side_effect=run):
+        yield
+        for thread in started:
+            thread.join(5)
+
+
+def _create_session(user, created_at, messages=()):
+    session = ChatSession.objects.create(user=user)
+    ChatSession.objects.filter(pk=session.pk).update(created_at=created_at)
+    for i, text in enumerate(messages):
+        msg = ChatMessage.objects.create(session_id=session, user_message=text, ai_response=f'답변 {i}')
+        ChatMessage.objects.filter(pk=msg.pk).update(created_at=created_at + timedelta(seconds=i))
+        record_session_message(session.pk, text)
+    return session
+
+
+class SessionListViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chatuser', password='Chat1!aaa')
+        self.client.force_login(self.user)
+        self.base_time = timezone.now() - timedelta(days=1)
+
+    def test_session_list_query_count_does_not_grow(self):
+        for i in range(5):
+            _create_session(self.user, self.base_time + timedelta(minutes=i), ['첫 질문', '둘째 질문'])
+
+        # 세션 인증 조회 2회 + 세션 목록 1회
+        with self.assertNumQueries(3):
+            resp = self.client.get('/mai_chat/api/chat/sessions/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()['data']), 5)
+
+        for i in range(5, 20):
+            _create_session(self.user, self.base_time + timedelta(minutes=i), ['질문'])
+        with self.assertNumQueries(3):
+            self.client.get('/mai_chat/api/chat/sessions/?limit=50')
+
+    def test_session_summary_fields(self):
+        session = _create_session(
+            self.user, self.base_time, ['메이플스토리 보스 초기화 시간이 언제야?', '마지막 질문'])
+        _create_session(self.user, self.base_time - timedelta(minutes=1))
+
+        data = self.client.get('/mai_chat/api/chat/sessions/').json()['data']
+        self.assertEqual(data[0]['id'], str(session.session_id))
+        self.assertEqual(data[0]['title'], '메이플스토리 보스 초기화 시간이 언제...')
+        self.assertEqual(data[0]['last_message'], '마지막 질문')
+        self.assertEqual(data[0]['message_count'], 2)
+        self.assertEqual(data[1]['title'], '새로운 대화')
+        self.assertEqual(data[1]['message_count'], 0)
+
+    def test_cursor_pagination(self):
+        created = [
+            _create_session(self.user, self.base_time + timedelta(minutes=i)) for i in range(5)
+        ]
+        other_user = User.objects.create_user(username='other', password='Other1!aa')
+        _create_session(other_user, self.base_time)
+
+        first = self.client.get('/mai_chat/api/chat/sessions/?limit=2').json()
+        second = self.client.get(f"/mai_chat/api/chat/sessions/?limit=2&cursor={first['next_cursor']}").json()
+        third = self.client.get(f"/mai_chat/api/chat/sessions/?limit=2&cursor={second['next_cursor']}").json()
+
+        ids = [s['id'] for page in (first, second, third) for s in page['data']]
+        self.assertEqual(ids, [str(s.session_id) for s in reversed(created)])
+        self.assertIsNone(third['next_cursor'])
+
+    def test_invalid_cursor(self):
+        resp = self.client.get('/mai_chat/api/chat/sessions/?cursor=not-a-cursor')
+        self.assertEqual(resp.status_code, 400)
+
+
+class SessionSummaryTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.user = User.objects.create_user(username='chatuser', password='Chat1!aaa')
+        self.client.force_login(self.user)
+        self.session = ChatSession.objects.create(user=self.user)
+
+    def _send(self, content):
+        ai_response = {'response': '답변', 'thinking': ''}
+        with patch('mai_chat.views.ai_client.generate', new=AsyncMock(return_value=ai_response)):
+            return self.client.post(
+                f'/mai_chat/api/chat/sessions/{self.session.session_id}/send/',
+                data=json.dumps({'content': content}),
+                content_type='application/json',
+            )
+
+    def test_send_message_updates_summary_columns(self):
+        self.assertEqual(self._send('첫 질문').status_code, 200)
+        self.assertEqual(self._send('두 번째 질문').status_code, 200)
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.title, '첫 질문')
+        self.assertEqual(self.session.last_message, '두 번째 질문')
+        self.assertEqual(self.session.message_count, 2)
+        self.assertIsNotNone(self.session.last_activity_at)
+
+    def test_backfill_command(self):
+        for text in ['메이플스토리 보스 초기화 시간이 언제야?', '마지막 질문']:
+            ChatMessage.objects.create(session_id=self.session, user_message=text, ai_response='답변')
+        empty = ChatSession.objects.create(user=self.user)
+
+        call_command('backfill_session_summaries', batch_size=1, stdout=StringIO())
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.title, '메이플스토리 보스 초기화 시간이 언제...')
+        self.assertEqual(self.session.last_message, '마지막 질문')
+        self.assertEqual(self.session.message_count, 2)
+        self.assertEqual(self.session.last_activity_at, self.session.messages.latest('created_at').created_at)
+        empty.refresh_from_db()
+        self.assertEqual((empty.title, empty.message_count, empty.last_activity_at), ('', 0, None))
+
+
+class MessageListViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chatuser', password='Chat1!aaa')
+        self.client.force_login(self.user)
+        self.session = _create_session(
+            self.user, timezone.now() - timedelta(days=1), [f'질문 {i}' for i in range(5)])
+        self.url = f'/mai_chat/api/chat/sessions/{self.session.session_id}/messages/'
+        self.last = self.session.messages.latest('created_at')
+        ChatMessage.objects.filter(pk=self.last.pk).update(thinking='긴 사고 과정')
+
+    def test_pages_are_returned_newest_first_in_chronological_order(self):
+        first = self.client.get(f'{self.url}?limit=2').json()
+        self.assertEqual([m['content'] for m in first['data'] if m['role'] == 'user'], ['질문 3', '질문 4'])
+        self.assertTrue(first['has_more'])
+
+        second = self.client.get(f"{self.url}?limit=2&before={first['next_before']}").json()
+        third = self.client.get(f"{self.url}?limit=2&before={second['next_before']}").json()
+        self.assertEqual([m['content'] for m in second['data'] if m['role'] == 'user'], ['질문 1', '질문 2'])
+        self.assertEqual([m['content'] for m in third['data'] if m['role'] == 'user'], ['질문 0'])
+        self.assertFalse(third['has_more'])
+        self.assertIsNone(third['next_before'])
+
+    def test_thinking_is_excluded_by_default(self):
+        data = self.client.get(self.url).json()['data']
+        answers = {m['message_id']: m for m in data if m['role'] == 'assistant'}
+        self.assertNotIn('thinking', answers[self.last.pk])
+        self.assertTrue(answers[self.last.pk]['has_thinking'])
+        self.assertEqual(sum(m['has_thinking'] for m in answers.values()), 1)
+
+        data = self.client.get(f'{self.url}?include_thinking=1').json()['data']
+        answers = {m['message_id']: m for m in data if m['role'] == 'assistant'}
+        self.assertEqual(answers[self.last.pk]['thinking'], '긴 사고 과정')
+
+    def test_thinking_endpoint(self):
+        resp = self.client.get(f'{self.url}{self.last.pk}/thinking/')
+        self.assertEqual(resp.json()['data'], {'message_id': self.last.pk, 'thinking': '긴 사고 과정'})
+
+        other = _create_session(self.user, timezone.now(), ['다른 세션'])
+        resp = self.client.get(f'/mai_chat/api/chat/sessions/{other.session_id}/messages/{self.last.pk}/thinking/')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_invalid_before_cursor(self):
+        self.assertEqual(self.client.get(f'{self.url}?before=not-a-cursor').status_code, 400)
+
+
+class BenchChatQueriesTests(TestCase):
+    def test_refuses_default_database(self):
+        with self.assertRaises(CommandError):
+            call_command('bench_chat_queries', messages=10, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('bench_chat_queries', database='missing', stdout=StringIO())
+
+    def test_runs_view_queries_and_rolls_back(self):
+        out = StringIO()
+        call_command(
+            'bench_chat_queries', allow_default_database=True, compare=True,
+            messages=200, sessions=5, users=2, repeat=2, stdout=out,
+        )
+        for name in ('session_lookup', 'message_page', 'message_page_before', 'session_page', 'session_page_next'):
+            self.assertIn(f'-- {name}', out.getvalue())
+        self.assertFalse(ChatMessage.objects.exists())
+        self.assertFalse(User.objects.filter(username__startswith='bench_').exists())
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chatuser', password='Chat1!aaa')
+        self.client.force_login(self.user)
+        self.now = timezone.now()
+        self.old = _create_session(self.user, self.now - timedelta(days=2), ['질문 0', '질문 1'])
+        self.new = _create_session(self.user, self.now - timedelta(hours=1), ['질문 2'])
+        _create_session(User.objects.create_user(username='other'), self.now, ['다른 사용자'])
+        ChatMessage.objects.filter(session_id=self.new).update(thinking='사고 과정')
+        self.url = '/mai_chat/api/chat/export/'
+
+    def _lines(self, resp):
+        body = b''.join(resp.streaming_content)
+        if resp['Content-Type'] == 'application/gzip':
+            body = gzip.decompress(body)
+        return [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+    def test_exports_only_own_sessions_as_ndjson(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        records = self._lines(resp)
+        self.assertCountEqual([r['user_message'] for r in records], ['질문 0', '질문 1', '질문 2'])
+        old = [r for r in records if r['session_id'] == str(self.old.session_id)]
+        self.assertEqual([r['user_message'] for r in old], ['질문 0', '질문 1'])
+        self.assertEqual({r['user_id'] for r in records}, {self.user.pk})
+        self.assertEqual([r['thinking'] for r in records if r['user_message'] == '질문 2'], ['사고 과정'])
+
+        records = self._lines(self.client.get(f'{self.url}?thinking=0'))
+        self.assertNotIn('thinking', records[0])
+
+    def test_gzip_session_and_since_filters(self):
+        plain = self._lines(self.client.get(f'{self.url}?session={self.new.session_id}'))
+        resp = self.client.get(f'{self.url}?session={self.new.session_id}&gzip=1')
+        self.assertIn('.ndjson.gz', resp['Content-Disposition'])
+        self.assertEqual(self._lines(resp), plain)
+        self.assertEqual([r['user_message'] for r in plain], ['질문 2'])
+
+        since = (self.now - timedelta(days=1)).isoformat()
+        records = self._lines(self.client.get(self.url, {'since': since}))
+        self.assertEqual([r['user_message'] for r in records], ['질문 2'])
+        self.assertEqual(self.client.get(f'{self.url}?since=yesterday').status_code, 400)
+
+    def test_anonymous_requires_session(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        records = self._lines(self.client.get(f'{self.url}?session={self.old.session_id}'))
+        self.assertEqual(len(records), 2)
+
+    def test_output_is_flushed_in_chunks(self):
+        with patch.object(export, 'EXPORT_FLUSH_BYTES', 1):
+            chunks = list(export.iter_ndjson(export.export_queryset(), chunk_size=1))
+        self.assertEqual(len(chunks), ChatMessage.objects.count())
+        self.assertEqual(gzip.decompress(b''.join(export.gzip_chunks(chunks))), b''.join(chunks))
+
+    def test_command_writes_file(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'history.ndjson.gz')
+        call_command('export_chat_history', '--gzip', '--user', 'chatuser', '--output', path, stderr=StringIO())
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 3)
+
+
+class SendMessageViewTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.session = ChatSession.objects.create()
+        self.url = f'/mai_chat/api/chat/sessions/{self.session.session_id}/send/'
+
+    def _post(self, content):
+        return self.client.post(self.url, data=json.dumps({'content': content}), content_type='application/json')
+
+    def test_response_is_saved_with_thinking_and_response_time(self):
+        generate = AsyncMock(return_value={'response': '목요일 자정입니다.', 'thinking': '초기화 규칙 확인'})
+        with patch('mai_chat.views.ai_client.generate', new=generate):
+            resp = self._post('보스 초기화 언제야?')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['data']['ai_message']['content'], '목요일 자정입니다.')
+        generate.assert_awaited_once_with(str(self.session.session_id), '보스 초기화 언제야?')
+        msg = self.session.messages.get()
+        self.assertEqual((msg.ai_response, msg.thinking), ('목요일 자정입니다.', '초기화 규칙 확인'))
+        self.assertGreaterEqual(msg.response_time, 0)
+
+    def test_ai_server_unreachable(self):
+        generate = AsyncMock(side_effect=aiohttp.ClientConnectionError('connection refused'))
+        with patch('mai_chat.views.ai_client.generate', new=generate):
+            resp = self._post('질문')
+
+        self.assertEqual(resp.status_code, 503)
+        self.assertFalse(self.session.messages.exists())
+
+
+class DeleteSessionViewTests(TestCase):
+    def setUp(self):
+        self.session = ChatSession.objects.create()
+        self.url = f'/mai_chat/api/chat/sessions/{self.session.session_id}/delete/'
+
+    def test_deletes_session_and_ai_server_history(self):
+        delete_history = AsyncMock()
+        with patch('mai_chat.views.ai_client.delete_history', new=delete_history):
+            resp = self.client.delete(self.url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ChatSession.objects.filter(pk=self.session.pk).exists())
+        delete_history.assert_awaited_once_with(str(self.session.session_id))
+
+    def test_ai_server_failure_does_not_fail_delete(self):
+        delete_history = AsyncMock(side_effect=aiohttp.ClientConnectionError('connection refused'))
+        with patch('mai_chat.views.ai_client.delete_history', new=delete_history):
+            resp = self.client.delete(self.url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ChatSession.objects.filter(pk=self.session.pk).exists())
+
+    def test_missing_session_skips_ai_server(self):
+        self.session.delete()
+        delete_history = AsyncMock()
+        with patch('mai_chat.views.ai_client.delete_history', new=delete_history):
+            resp = self.client.delete(self.url)
+
+        self.assertEqual(resp.status_code, 404)
+        delete_history.assert_not_awaited()
+
+
+class FakeUpstream:
+    """ai_client.stream()이 반환하는 응답을 흉내 내는 비동기 컨텍스트 매니저"""
+
+    def __init__(self, chunks, status=200):
+        self.chunks = chunks
+        self.status = status
+        self.closed = False
+        self.content = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    async def iter_any(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _sse(payload):
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+
+class StreamMessageViewTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.session = ChatSession.objects.create()
+        self.url = f'/mai_chat/api/chat/sessions/{self.session.session_id}/stream/'
+        summary = _sse({'type': 'summary', 'response': '목요일 자정입니다.', 'thinking': '규칙 확인', 'ok': True})
+        self.chunks = [
+            _sse({'type': 'token', 'content': '<think>규칙 확인</think>'}),
+            _sse({'type': 'token', 'content': '"type": "summary" 가 아닌 토큰'}),
+            summary[:10], summary[10:] + b'data: [DONE]\n\n',
+        ]
+
+    async def _stream(self, upstream):
+        with patch('mai_chat.views.ai_client.stream', return_value=upstream):
+            resp = await self.async_client.post(
+                self.url, data=json.dumps({'content': '보스 초기화 언제야?'}), content_type='application/json')
+            body = b''.join([chunk async for chunk in resp.streaming_content])
+        return resp, body
+
+    async def test_bytes_are_forwarded_and_summary_is_saved(self):
+        upstream = FakeUpstream(self.chunks)
+        resp, body = await self._stream(upstream)
+
+        self.assertEqual(resp['Content-Type'], 'text/event-stream')
+        self.assertEqual(body, b''.join(self.chunks))
+        self.assertTrue(upstream.closed)
+        msg = await self.session.messages.aget()
+        self.assertEqual((msg.ai_response, msg.thinking), ('목요일 자정입니다.', '규칙 확인'))
+        self.assertGreaterEqual(msg.response_time, 0)
+
+    async def test_answer_is_written_to_its_own_placeholder(self):
+        placeholder = await ChatMessage.objects.acreate(session_id=self.session, user_message='첫 질문', ai_response='')
+        # 같은 세션에서 더 늦게 시작된 다른 스트리밍 메시지
+        newer = await ChatMessage.objects.acreate(session_id=self.session, user_message='둘째 질문', ai_response='')
+
+        with patch('mai_chat.views.ai_client.stream', return_value=FakeUpstream(self.chunks)):
+            async for _ in views._proxy_ai_stream(self.session, '첫 질문', placeholder.pk):
+                pass
+
+        await placeholder.arefresh_from_db()
+        await newer.arefresh_from_db()
+        self.assertEqual(placeholder.ai_response, '목요일 자정입니다.')
+        self.assertEqual(newer.ai_response, '')
+
+    async def test_upstream_is_closed_when_client_disconnects(self):
+        upstream = FakeUpstream(self.chunks)
+        msg = await ChatMessage.objects.acreate(session_id=self.session, user_message='질문', ai_response='')
+        with patch('mai_chat.views.ai_client.stream', return_value=upstream):
+            # 브라우저 연결이 끊기면 ASGI 핸들러가 응답 제너레이터를 종료함
+            stream = views._proxy_ai_stream(self.session, '질문', msg.pk)
+            await anext(stream)
+            await stream.aclose()
+
+        self.assertTrue(upstream.closed)
+        msg = await self.session.messages.aget()
+        self.assertEqual(msg.ai_response, '')
+
+    async def test_cached_first_question_skips_ai_server(self):
+        await self._stream(FakeUpstream(self.chunks))
+
+        self.session = await ChatSession.objects.acreate()
+        self.url = f'/mai_chat/api/chat/sessions/{self.session.session_id}/stream/'
+        stream = AsyncMock(side_effect=AssertionError('AI 서버를 호출하면 안 됨'))
+        with patch('mai_chat.views.ai_client.append_history', new=AsyncMock()) as append_history, \
+                _joined_background():
+            resp, body = await self._stream(stream)
+        append_history.assert_awaited_once()
+
+        self.assertIn(b'"type": "summary"', body)
+        self.assertTrue(body.endswith(b'data: [DONE]\n\n'))
+        msg = await self.session.messages.aget()
+        self.assertEqual(msg.ai_response, '목요일 자정입니다.')
+
+    async def test_failed_answer_is_saved_but_not_cached(self):
+        chunks = [
+            _sse({'type': 'token', 'content': '목요일'}),
+            _sse({'type': 'error', 'content': 'CUDA out of memory'}),
+            _sse({'type': 'summary', 'response': '목요일', 'thinking': '', 'ok': False}),
+            b'data: [DONE]\n\n',
+        ]
+        await self._stream(FakeUpstream(chunks))
+
+        msg = await self.session.messages.aget()
+        self.assertEqual(msg.ai_response, '목요일')
+        self.assertIsNone(answer_cache.get('보스 초기화 언제야?'))
+
+    async def test_complete_first_answer_is_cached(self):
+        await self._stream(FakeUpstream(self.chunks))
+        self.assertEqual(answer_cache.get('보스 초기화 언제야?')['response'], '목요일 자정입니다.')
+
+    async def test_upstream_error_status(self):
+        resp, body = await self._stream(FakeUpstream([], status=500))
+        self.assertIn(b'AI Server Error: 500', body)
+
+
+class AIClientSessionTests(TestCase):
+    @asynccontextmanager
+    async def _ai_server(self):
+        async def generate(request):
+            return web.json_response({'response': '답', 'thinking': ''})
+
+        app = web.Application()
+        app.router.add_post('/generate', generate)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            with override_settings(AI_SERVER_URL=str(server.make_url(''))):
+                yield
+        finally:
+            await server.close()
+
+    async def _lifespan(self, messages):
+        queue = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait({'type': message})
+        sent = []
+
+        async def send(message):
+            sent.append(message['type'])
+
+        task = asyncio.create_task(ai_client.lifespan({'type': 'lifespan'}, queue.get, send))
+        return queue, sent, task
+
+    async def test_without_lifespan_each_call_closes_its_session(self):
+        # WSGI: 요청마다 새 이벤트 루프이므로 공유 세션을 만들지 않음
+        async with self._ai_server():
+            for _ in range(3):
+                self.assertEqual((await ai_client.generate('s', '질문'))['response'], '답')
+        self.assertIsNone(ai_client._session)
+
+    async def test_lifespan_shares_and_closes_session(self):
+        queue, sent, task = await self._lifespan(['lifespan.startup'])
+        await asyncio.sleep(0)
+        async with self._ai_server():
+            try:
+                await ai_client.generate('s', '질문')
+                session = ai_client._session
+                await ai_client.generate('s', '질문')
+                self.assertIs(ai_client._session, session)
+            finally:
+                queue.put_nowait({'type': 'lifespan.shutdown'})
+                await task
+        self.assertTrue(session.closed)
+        self.assertIsNone(ai_client._session)
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+
+class SummaryScannerTests(TestCase):
+    def test_summary_split_across_chunks(self):
+        event = _sse({'type': 'summary', 'response': '답변', 'thinking': ''})
+        scanner = ai_client.SummaryScanner()
+        for i in range(0, len(event), 3):
+            scanner.feed(event[i:i + 3])
+        self.assertEqual(scanner.result(), {'type': 'summary', 'response': '답변', 'thinking': ''})
+
+    def test_incomplete_summary(self):
+        scanner = ai_client.SummaryScanner()
+        scanner.feed(_sse({'type': 'token', 'content': '답'}))
+        self.assertIsNone(scanner.result())
+        scanner.feed(b'data: {"type": "summary", "resp')
+        self.assertIsNone(scanner.result())
+
+
+class AnswerCacheTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus_path = os.path.join(self.tmp_dir, 'notice_data_rag.json')
+        core_services._write_json_atomic(self.corpus_path, [{'title': '공지'}])
+        patcher = patch.object(core_services, 'NOTICE_JSON_PATH', self.corpus_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def _send(self, session, content, generate):
+        with patch('mai_chat.views.ai_client.generate', new=generate), \
+                patch('mai_chat.views.ai_client.append_history', new=AsyncMock()) as append_history, \
+                _joined_background():
+            resp = self.client.post(
+                f'/mai_chat/api/chat/sessions/{session.session_id}/send/',
+                data=json.dumps({'content': content}),
+                content_type='application/json',
+            )
+        return resp.json()['data']['ai_message'], append_history
+
+    def test_first_question_is_served_from_cache(self):
+        generate = AsyncMock(return_value={'response': '목요일 자정입니다.', 'thinking': '규칙'})
+        self._send(ChatSession.objects.create(), '보스 초기화 언제야?', generate)
+
+        other = ChatSession.objects.create()
+        answer, append_history = self._send(other, '  보스  초기화 언제야 ', generate)
+
+        self.assertEqual(generate.await_count, 1)
+        self.assertEqual((answer['content'], answer['thinking']), ('목요일 자정입니다.', '규칙'))
+        append_history.assert_awaited_once_with(str(other.session_id), '보스  초기화 언제야', '목요일 자정입니다.')
+        self.assertEqual(other.messages.get().ai_response, '목요일 자정입니다.')
+
+    def test_cache_hit_does_not_wait_for_history_append(self):
+        generate = AsyncMock(return_value={'response': '목요일 자정입니다.', 'thinking': ''})
+        self._send(ChatSession.objects.create(), '보스 초기화 언제야?', generate)
+
+        # AI 서버가 바빠 대화 기록 추가가 오래 걸려도 캐시 적중 응답은 바로 반환
+        appended = threading.Event()
+        release = threading.Event()
+
+        async def slow_append(*args):
+            await asyncio.to_thread(release.wait, 5)
+            appended.set()
+
+        session = ChatSession.objects.create()
+        with patch('mai_chat.views.ai_client.append_history', side_effect=slow_append), _joined_background():
+            start = time.perf_counter()
+            resp = self.client.post(
+                f'/mai_chat/api/chat/sessions/{session.session_id}/send/',
+                data=json.dumps({'content': '보스 초기화 언제야?'}),
+                content_type='application/json',
+            )
+            elapsed = time.perf_counter() - start
+            self.assertFalse(appended.is_set())
+            release.set()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertLess(elapsed, 1)
+        self.assertTrue(appended.is_set())
+
+    def test_follow_up_questions_are_not_cached(self):
+        session = ChatSession.objects.create()
+        generate = AsyncMock(return_value={'response': '답변', 'thinking': ''})
+        self._send(session, '첫 질문', generate)
+        self._send(session, '보상은?', generate)
+        self._send(ChatSession.objects.create(), '보상은?', generate)
+        self.assertEqual(generate.await_count, 3)
+
+    def test_corpus_update_invalidates_cache(self):
+        answer_cache.put('이벤트 기간', '이번 주까지')
+        self.assertEqual(answer_cache.get('이벤트 기간?')['response'], '이번 주까지')
+
+        core_services._write_json_atomic(self.corpus_path, [{'title': '새 공지'}, {'title': '추가 공지'}])
+        self.assertIsNone(answer_cache.get('이벤트 기간'))
+
+    @override_settings(ANSWER_CACHE_TTL=60, ANSWER_CACHE_MAX_SIZE=2)
+    def test_ttl_and_lru_eviction(self):
+        with patch('mai_chat.answer_cache.time.monotonic', return_value=1000):
+            answer_cache.put('a', '1')
+            answer_cache.put('b', '2')
+            answer_cache.get('a')
+            answer_cache.put('c', '3')
+            self.assertIsNone(answer_cache.get('b'))
+            self.assertIsNotNone(answer_cache.get('a'))
+
+        with patch('mai_chat.answer_cache.time.monotonic', return_value=1061):
+            self.assertIsNone(answer_cache.get('a'))
+
+
+class AdmissionControllerTests(TestCase):
+    async def test_concurrency_limit_and_fifo(self):
+        controller = admission.AdmissionController(max_concurrency=1, max_queue=10, max_queue_per_user=5)
+        first = controller.enqueue('a')
+        second = controller.enqueue('b')
+
+        self.assertTrue(first.admitted)
+        self.assertFalse(await second.wait(timeout=0.01))
+        self.assertEqual(second.position, 1)
+
+        first.release()
+        self.assertTrue(await second.wait(timeout=1))
+        self.assertEqual(controller.snapshot()['active'], 1)
+        second.release()
+        self.assertEqual(controller.snapshot()['active'], 0)
+
+    async def test_round_robin_between_users(self):
+        controller = admission.AdmissionController(max_concurrency=1, max_queue=10, max_queue_per_user=5)
+        running = controller.enqueue('x')
+        heavy = [controller.enqueue('heavy') for _ in range(3)]
+        light = controller.enqueue('light')
+
+        self.assertEqual([w.position for w in heavy], [1, 3, 4])
+        self.assertEqual(light.position, 2)
+
+        order = []
+        current = running
+        for _ in range(4):
+            current.release()
+            current = next(w for w in heavy + [light] if w.admitted and w not in order)
+            order.append(current)
+        self.assertEqual(order, [heavy[0], light, heavy[1], heavy[2]])
+
+    async def test_queue_limits(self):
+        controller = admission.AdmissionController(max_concurrency=1, max_queue=2, max_queue_per_user=1)
+        controller.enqueue('a')
+        controller.enqueue('b')
+        with self.assertRaises(admission.QueueFull):
+            controller.enqueue('b')
+        controller.enqueue('c')
+        with self.assertRaises(admission.QueueFull):
+            controller.enqueue('d')
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        controller = admission.AdmissionController(max_concurrency=1, max_queue=10, max_queue_per_user=5)
+        running = controller.enqueue('a')
+        cancelled = controller.enqueue('b')
+        waiting = controller.enqueue('c')
+
+        cancelled.release()
+        self.assertEqual(waiting.position, 1)
+        running.release()
+        self.assertTrue(await waiting.wait(timeout=1))
+        self.assertFalse(cancelled.admitted)
+
+
+class AdmissionViewTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.session = ChatSession.objects.create()
+        self.controller = admission.AdmissionController(max_concurrency=1, max_queue=1, max_queue_per_user=1)
+        patcher = patch('mai_chat.views.admission.get_controller', return_value=self.controller)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, action):
+        return self.client.post(
+            f'/mai_chat/api/chat/sessions/{self.session.session_id}/{action}/',
+            data=json.dumps({'content': '질문'}),
+            content_type='application/json',
+        )
+
+    async def _fill(self):
+        return [self.controller.enqueue('other-1'), self.controller.enqueue('other-2')]
+
+    def test_full_queue_returns_429_without_saving(self):
+        waiters = asyncio.run(self._fill())
+        for action in ('send', 'stream'):
+            resp = self._post(action)
+            self.assertEqual(resp.status_code, 429)
+            self.assertEqual(resp['Retry-After'], '5')
+        self.assertFalse(self.session.messages.exists())
+        for waiter in waiters:
+            waiter.release()
+
+    async def test_stream_reports_queue_position_until_admitted(self):
+        running = self.controller.enqueue('other')
+        url = f'/mai_chat/api/chat/sessions/{self.session.session_id}/stream/'
+        upstream = FakeUpstream([_sse({'type': 'token', 'content': '답'}), b'data: [DONE]\n\n'])
+
+        with patch('mai_chat.views.ai_client.stream', return_value=upstream), \
+                patch('mai_chat.views.QUEUE_POSITION_INTERVAL', 0.01):
+            resp = await self.async_client.post(url, data=json.dumps({'content': '질문'}), content_type='application/json')
+            stream = resp.streaming_content
+            self.assertEqual(await anext(stream), _sse({'type': 'queued', 'position': 1}))
+
+            running.release()
+            rest = b''.join([chunk async for chunk in stream])
+
+        self.assertIn(b'"type": "token"', rest)
+        self.assertEqual(self.controller.snapshot(), {'active': 0, 'queued': 0, 'max_concurrency': 1, 'max_queue': 1})
+
+    def test_sync_client_queued_stream_is_saved(self):
+        # WSGI: 뷰와 응답 본문이 서로 다른 async_to_sync 이벤트 루프에서 실행됨
+        running = self.controller.enqueue('other')
+        summary = _sse({'type': 'summary', 'response': '답', 'thinking': ''})
+        upstream = FakeUpstream([_sse({'type': 'token', 'content': '답'}), summary, b'data: [DONE]\n\n'])
+
+        with patch('mai_chat.views.ai_client.stream', return_value=upstream), \
+                patch('mai_chat.views.QUEUE_POSITION_INTERVAL', 0.01):
+            resp = self._post('stream')
+            timer = threading.Timer(0.05, running.release)
+            timer.start()
+            # WSGI 핸들러처럼 응답을 동기로 순회 (비동기 본문을 async_to_sync로 모은다는 경고는 무시)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                body = b''.join(resp)
+            timer.join()
+            resp.close()
+
+        self.assertTrue(body.startswith(_sse({'type': 'queued', 'position': 1})))
+        self.assertTrue(body.endswith(b'data: [DONE]\n\n'))
+        self.assertEqual(self.session.messages.get().ai_response, '답')
+        self.assertEqual(self.controller.snapshot()['active'], 0)
+
+    def test_unread_stream_releases_slot_on_close(self):
+        running = self.controller.enqueue('other')
+        resp = self._post('stream')
+        self.assertEqual(self.controller.snapshot()['queued'], 1)
+
+        # 본문을 읽기 전에 브라우저 연결이 끊겨 응답이 닫힘
+        resp.close()
+        self.assertEqual(self.controller.snapshot()['queued'], 0)
+        running.release()
+        self.assertEqual(self.controller.snapshot()['active'], 0)
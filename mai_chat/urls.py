@@ -18,8 +18,10 @@ urlpatterns = [
     path('api/chat/sessions/', views.get_sessions_view, name='get_sessions'),
     path('api/chat/sessions/create/', views.create_session_view, name='create_session'),
     path('api/chat/sessions/<uuid:session_id>/messages/', views.get_messages_view, name='get_messages'),
+    path('api/chat/sessions/<uuid:session_id>/messages/<int:message_id>/thinking/', views.get_message_thinking_view, name='get_message_thinking'),
     path('api/chat/sessions/<uuid:session_id>/send/', views.send_message_view, name='send_message'),
     path('api/chat/sessions/<uuid:session_id>/stream/', views.stream_message_view, name='stream_message'),
     path('api/chat/sessions/<uuid:session_id>/delete/', views.delete_session_view, name='delete_session'),
+    path('api/chat/export/', views.export_messages_view, name='export_messages'),
 ]
 
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 import json
 import uuid
+import base64
+import binascii
+import asyncio
 import logging
 import time
-import requests 
+import aiohttp
 from datetime import datetime
 from typing import Dict, Any
 
@@ -12,14 +15,20 @@ from django.http import JsonResponse, HttpRequest, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.db.models import BooleanField, Case, Q, Value, When
 
 # 기존 모델은 그대로 사용합니다
 from .models import ChatSession, ChatMessage
+from . import admission, ai_client, answer_cache, export
+from .services import asave_chat_message
 
 logger = logging.getLogger(__name__)
 
-# FastAPI AI 서버 주소
-AI_SERVER_URL = "http://127.0.0.1:8001/generate"
+# 대기 중인 스트리밍 요청에 대기 순번을 확인해 알려주는 주기(초)
+QUEUE_POSITION_INTERVAL = 1.0
 
 
 # 1. 화면 렌더링 (HTML)
@@ -31,43 +40,112 @@ def chat_page(request: HttpRequest):
     return render(request, 'mai_chat/chat.html')
 
 
+# 세션 목록 페이지 크기 (기본값 / 최대값)
+SESSION_PAGE_SIZE = 20
+SESSION_PAGE_SIZE_MAX = 100
+
+# 메시지 목록 페이지 크기 (ChatMessage 행 기준, 기본값 / 최대값)
+MESSAGE_PAGE_SIZE = 30
+MESSAGE_PAGE_SIZE_MAX = 100
+
+
+def _encode_cursor(created_at, pk) -> str:
+    """(생성 시각, PK)를 페이지 커서 문자열로 인코딩합니다."""
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str):
+    """
+    페이지 커서 문자열을 (생성 시각, PK 문자열)로 디코딩합니다.
+    잘못된 커서이면 ValueError를 발생시킵니다.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, pk = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), pk
+    except (UnicodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _parse_limit(value, default: int, maximum: int) -> int:
+    """limit 쿼리 파라미터를 1 ~ maximum 범위의 정수로 변환합니다."""
+    if value in (None, ''):
+        return default
+    return max(1, min(int(value), maximum))
+
+
+def _session_page_queryset(sessions, cursor_values=None):
+    """세션 목록 한 페이지 쿼리 (다음 페이지 확인용으로 limit + 1개를 잘라 사용)"""
+    if cursor_values:
+        created_at, pk = cursor_values
+        sessions = sessions.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, session_id__lt=pk)
+        )
+    return sessions.order_by('-created_at', '-session_id')
+
+
+def _message_page_queryset(messages, before_values=None, include_thinking=False):
+    """메시지 목록 한 페이지 쿼리 (최신순, 이전 페이지 확인용으로 limit + 1개를 잘라 사용)"""
+    if before_values:
+        created_at, pk = before_values
+        messages = messages.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    messages = messages.annotate(
+        has_thinking=Case(
+            When(Q(thinking__isnull=True) | Q(thinking=''), then=Value(False)),
+            default=Value(True),
+            output_field=BooleanField(),
+        )
+    ).order_by('-created_at', '-id')
+    if not include_thinking:
+        messages = messages.defer('thinking')
+    return messages
+
+
 # 2. 세션 관리 API (기존 코드 유지)
 @require_http_methods(["GET"])
 def get_sessions_view(request: HttpRequest) -> JsonResponse:
     """
-    사용자의 채팅 세션 목록을 조회합니다.
-    GET /api/chat/sessions/
+    사용자의 채팅 세션 목록을 최신순으로 조회합니다.
+    GET /api/chat/sessions/?limit=20&cursor=<next_cursor>
+
+    제목, 마지막 메시지, 메시지 수는 ChatSession의 요약 컬럼을 그대로 읽으며,
+    (created_at, session_id) 기준 커서 페이지네이션을 사용합니다.
     """
     try:
+        try:
+            limit = _parse_limit(request.GET.get('limit'), SESSION_PAGE_SIZE, SESSION_PAGE_SIZE_MAX)
+            cursor = request.GET.get('cursor')
+            cursor_values = None
+            if cursor:
+                created_at, pk = _decode_cursor(cursor)
+                cursor_values = (created_at, uuid.UUID(pk))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid limit or cursor'}, status=400)
+
         if request.user.is_authenticated:
-            if hasattr(request.user, 'profile'):
-                sessions = ChatSession.objects.filter(user=request.user.profile)
-            else:
-                sessions = ChatSession.objects.none()
+            sessions = ChatSession.objects.filter(user=request.user)
         else:
             sessions = ChatSession.objects.none()
-
-        sessions = sessions.order_by('-created_at')
-        session_list = []
-        for session in sessions:
-            first_message = session.messages.order_by('created_at').first()
-            last_message = session.messages.order_by('-created_at').first()
-            
-            # 제목 생성: 첫 번째 메시지 내용의 앞부분
-            if first_message and first_message.user_message:
-                title = first_message.user_message[:20] + "..." if len(first_message.user_message) > 20 else first_message.user_message
-            else:
-                title = "새로운 대화"
-
-            session_list.append({
-                'id': str(session.session_id),
-                'created_at': session.created_at.isoformat(),
-                'title': title, # 제목 필드 추가
-                'last_message': last_message.user_message if last_message else "대화 없음",
-                'message_count': session.messages.count()
-            })
-
-        return JsonResponse({'data': session_list})
+        sessions = _session_page_queryset(sessions, cursor_values)
+
+        # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+        page = list(sessions[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        session_list = [{
+            'id': str(session.session_id),
+            'created_at': session.created_at.isoformat(),
+            'title': session.title or "새로운 대화", # 제목 필드 추가
+            'last_message': session.last_message or "대화 없음",
+            'message_count': session.message_count,
+            'last_activity_at': session.last_activity_at.isoformat() if session.last_activity_at else None
+        } for session in page]
+
+        next_cursor = _encode_cursor(page[-1].created_at, page[-1].session_id) if has_more else None
+        return JsonResponse({'data': session_list, 'next_cursor': next_cursor})
     except Exception as e:
         logger.error(f"세션 조회 중 오류 발생: {e}")
         return JsonResponse({'error': '세션 조회 중 오류가 발생했습니다.'}, status=500)
@@ -81,11 +159,10 @@ def create_session_view(request: HttpRequest) -> JsonResponse:
     POST /api/chat/sessions/create/
     """
     try:
-        user_profile = None
-        if request.user.is_authenticated and hasattr(request.user, 'profile'):
-            user_profile = request.user.profile
+        # ChatSession.user는 User를 참조하므로 프로필이 아닌 User를 연결
+        user = request.user if request.user.is_authenticated else None
             
-        session = ChatSession.objects.create(user=user_profile)
+        session = ChatSession.objects.create(user=user)
         logger.info(f"새로운 세션 생성: {session.session_id}")
         
         return JsonResponse({
@@ -104,47 +181,171 @@ def create_session_view(request: HttpRequest) -> JsonResponse:
 @require_http_methods(["GET"])
 def get_messages_view(request: HttpRequest, session_id: str) -> JsonResponse:
     """
-    특정 세션의 메시지 목록을 조회합니다.
+    특정 세션의 메시지 목록을 최신 페이지부터 조회합니다.
+    GET /api/chat/sessions/<session_id>/messages/?limit=30&before=<next_before>&include_thinking=1
+
+    (created_at, id) 기준 역순 커서 페이지네이션을 사용하며, 각 페이지는 시간순으로 정렬해 반환합니다.
+    thinking은 기본적으로 제외하고 has_thinking만 알려주며,
+    필요할 때 get_message_thinking_view로 메시지별로 가져옵니다.
     """
     try:
+        try:
+            limit = _parse_limit(request.GET.get('limit'), MESSAGE_PAGE_SIZE, MESSAGE_PAGE_SIZE_MAX)
+            before = request.GET.get('before')
+            before_values = None
+            if before:
+                created_at, pk = _decode_cursor(before)
+                before_values = (created_at, int(pk))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid limit or cursor'}, status=400)
+        include_thinking = request.GET.get('include_thinking') in ('1', 'true')
+
         session = ChatSession.objects.get(session_id=session_id)
-        messages = session.messages.all().order_by('created_at')
-        
+        messages = _message_page_queryset(session.messages.all(), before_values, include_thinking)
+
+        # 이전 페이지 존재 여부 확인을 위해 하나 더 조회
+        page = list(messages[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        next_before = _encode_cursor(page[-1].created_at, page[-1].id) if has_more else None
+
         message_list = []
-        for msg in messages:
+        for msg in reversed(page):
             # 사용자 메시지
             if msg.user_message:
                 message_list.append({
+                    'message_id': msg.id,
                     'role': 'user',
                     'content': msg.user_message,
                     'created_at': msg.created_at.isoformat()
                 })
             # AI 응답
             if msg.ai_response:
-                message_list.append({
+                item = {
+                    'message_id': msg.id,
                     'role': 'assistant',
                     'content': msg.ai_response,
                     'created_at': msg.created_at.isoformat(),
-                    # DB에 thinking 필드가 없다면 빈값, 있다면 추가
-                    'thinking': getattr(msg, 'thinking', "") 
-                })
-                
-        return JsonResponse({'data': message_list})
+                    'has_thinking': msg.has_thinking,
+                }
+                if include_thinking:
+                    item['thinking'] = msg.thinking or ""
+                message_list.append(item)
+
+        return JsonResponse({'data': message_list, 'next_before': next_before, 'has_more': has_more})
     except ChatSession.DoesNotExist:
         return JsonResponse({'error': 'Session not found'}, status=404)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@require_http_methods(["GET"])
+def get_message_thinking_view(request: HttpRequest, session_id: str, message_id: int) -> JsonResponse:
+    """
+    메시지 하나의 사고 과정(thinking)을 조회합니다.
+    GET /api/chat/sessions/<session_id>/messages/<message_id>/thinking/
+    """
+    try:
+        thinking = ChatMessage.objects.filter(
+            session_id=session_id, id=message_id
+        ).values_list('thinking', flat=True).get()
+        return JsonResponse({'data': {'message_id': message_id, 'thinking': thinking or ""}})
+    except ChatMessage.DoesNotExist:
+        return JsonResponse({'error': 'Message not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_http_methods(["GET"])
+def export_messages_view(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    채팅 기록을 NDJSON(메시지 한 건당 JSON 한 줄)으로 스트리밍합니다.
+    GET /api/chat/export/?session=<session_id>&since=<ISO 8601>&thinking=0&gzip=1
+
+    로그인 사용자는 자신의 세션 전체(또는 session으로 지정한 세션)를,
+    비로그인 사용자는 session으로 지정한 세션만 내보낼 수 있습니다.
+    """
+    session_id = request.GET.get('session')
+    since = request.GET.get('since')
+    try:
+        if session_id:
+            session_id = uuid.UUID(session_id)
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                raise ValueError(since)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid session or since'}, status=400)
+
+    if request.user.is_authenticated:
+        sessions = ChatSession.objects.filter(user=request.user)
+    elif session_id:
+        sessions = ChatSession.objects.all()
+    else:
+        return JsonResponse({'error': 'Login or session is required'}, status=401)
+    if session_id:
+        sessions = sessions.filter(session_id=session_id)
+        if not sessions.exists():
+            return JsonResponse({'error': 'Session not found'}, status=404)
+
+    queryset = export.export_queryset(
+        sessions, since=since, include_thinking=request.GET.get('thinking') not in ('0', 'false'),
+    )
+    chunks = export.iter_ndjson(queryset)
+    filename = 'chat_history.ndjson'
+    if request.GET.get('gzip') in ('1', 'true'):
+        chunks = export.gzip_chunks(chunks)
+        filename += '.gz'
+        content_type = 'application/gzip'
+    else:
+        content_type = 'application/x-ndjson; charset=utf-8'
+
+    # ASGI는 동기 이터레이터를 통째로 모은 뒤 보내므로 비동기 이터레이터로 감싸서 전달
+    if isinstance(request, ASGIRequest):
+        chunks = export.aiter_sync(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _admission_key(session: ChatSession) -> str:
+    """대기열 공정성 기준 키 (로그인 사용자는 사용자별, 비로그인은 채팅 세션별)"""
+    return f"user:{session.user_id}" if session.user_id else f"session:{session.session_id}"
+
+
+def _queue_full_response() -> JsonResponse:
+    response = JsonResponse({'error': '요청이 많아 잠시 후 다시 시도해주세요.'}, status=429)
+    response['Retry-After'] = '5'
+    return response
+
+
+async def _append_ai_history(session: ChatSession, content: str, answer: str):
+    """
+    답변 캐시로 응답한 대화를 AI 서버의 대화 기억에 추가합니다.
+    응답을 기다리게 하지 않도록 ai_client.run_in_background로 실행하며,
+    실패해도 사용자 응답에는 영향을 주지 않습니다. (다음 질문의 맥락만 빠짐)
+    """
+    try:
+        await ai_client.append_history(str(session.session_id), content, answer)
+    except (ai_client.AIServerError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"AI 서버 대화 기록 추가 실패: {e}")
+
+
 # ==========================================
 # 3. 메시지 전송 (여기가 핵심 변경!)
 # ==========================================
 @csrf_exempt
 @require_http_methods(["POST"])
-def send_message_view(request: HttpRequest, session_id: str) -> JsonResponse:
+async def send_message_view(request: HttpRequest, session_id: str) -> JsonResponse:
     """
     세션에 메시지를 전송하고 AI 서버(FastAPI)로부터 응답을 받습니다.
     POST /api/chat/sessions/<session_id>/send/
+
+    AI 서버 응답을 기다리는 동안 워커 스레드를 점유하지 않도록 비동기로 처리합니다.
     """
     try:
         # 1. 요청 데이터 파싱
@@ -163,44 +364,50 @@ def send_message_view(request: HttpRequest, session_id: str) -> JsonResponse:
                 s_uuid = uuid.UUID(session_id)
             else:
                 s_uuid = session_id
-            session = ChatSession.objects.get(session_id=s_uuid)
+            session = await ChatSession.objects.aget(session_id=s_uuid)
         except (ValueError, ChatSession.DoesNotExist):
              return JsonResponse({'error': 'Invalid session ID or Session not found'}, status=404)
 
         start_time = time.time()
+
+        # 세션의 첫 질문이면 답변 캐시 확인 (대화 맥락이 없을 때만 같은 질문 = 같은 답)
+        first_turn = session.message_count == 0
+        cached = answer_cache.get(content) if first_turn else None
         
-        # ==================================================================
-        # 3. [핵심 수정] AI 서버(FastAPI)로 요청 보내기
-        # LangGraph가 기억을 하려면 'session_id'가 반드시 필요합니다!
-        # ==================================================================
-        try:
-            payload = {
-                "session_id": str(session.session_id),  # ★ UUID를 문자열로 변환해서 추가
-                "message": content
-            }
-            
-            # timeout을 넉넉히 줍니다 (로컬 LLM 고려)
-            response = requests.post(AI_SERVER_URL, json=payload, timeout=1200)
-            
-            if response.status_code == 200:
-                ai_data = response.json()
+        if cached:
+            ai_text, ai_thinking = cached['response'], cached['thinking']
+            ai_client.run_in_background(_append_ai_history(session, content, ai_text))
+        else:
+            # ==================================================================
+            # 3. [핵심 수정] AI 서버(FastAPI)로 요청 보내기
+            # LangGraph가 기억을 하려면 'session_id'가 반드시 필요합니다!
+            # 공유 커넥션 풀을 사용하며, timeout은 AI_SERVER_TIMEOUT (로컬 LLM 고려)
+            # ==================================================================
+            try:
+                waiter = admission.get_controller().enqueue(_admission_key(session))
+            except admission.QueueFull:
+                return _queue_full_response()
+
+            try:
+                await waiter.wait()
+                ai_data = await ai_client.generate(str(session.session_id), content)
                 ai_text = ai_data.get("response", "")
                 ai_thinking = ai_data.get("thinking", "")
-            else:
-                # 422 에러 등이 나면 여기서 잡힙니다.
-                raise Exception(f"AI Server Error: {response.status_code} - {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"AI 서버 연결 실패: {e}")
-            return JsonResponse({'error': 'AI 서버에 연결할 수 없습니다.'}, status=503)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"AI 서버 연결 실패: {e}")
+                return JsonResponse({'error': 'AI 서버에 연결할 수 없습니다.'}, status=503)
+            finally:
+                waiter.release()
+
+            if first_turn:
+                answer_cache.put(content, ai_text, ai_thinking)
 
         response_time = int((time.time() - start_time) * 1000)
 
-        # 4. DB에 저장 (동기 방식)
-        # models.py에 thinking 필드를 추가하셨다면 여기서 같이 저장해야 합니다.
-        chat_msg = ChatMessage.objects.create(
-            session_id=session,
-            user_message=content,
+        # 4. DB에 저장 (메시지 저장과 세션 요약 컬럼 갱신은 하나의 트랜잭션으로 처리)
+        await asave_chat_message(
+            session,
+            content,
             ai_response=ai_text,
             thinking=ai_thinking,  # ★ 사고 과정(Thinking)도 DB에 저장!
             response_time=response_time
@@ -229,28 +436,132 @@ def send_message_view(request: HttpRequest, session_id: str) -> JsonResponse:
 
 @csrf_exempt
 @require_http_methods(["DELETE"])
-def delete_session_view(request: HttpRequest, session_id: str) -> JsonResponse:
+async def delete_session_view(request: HttpRequest, session_id: str) -> JsonResponse:
     """
-    채팅 세션을 삭제합니다.
+    채팅 세션을 삭제합니다. AI 서버에 저장된 세션의 대화 기억도 함께 삭제합니다.
     """
     try:
-        session = ChatSession.objects.get(session_id=session_id)
-        session.delete()
-        # 메모리 삭제 로직은 이제 AI 서버 쪽 관할이거나, DB 삭제로 충분하므로 생략 가능
-        return JsonResponse({'status': 'deleted', 'session_id': str(session_id)})
+        session = await ChatSession.objects.aget(session_id=session_id)
+        await session.adelete()
     except ChatSession.DoesNotExist:
         return JsonResponse({'error': 'Session not found'}, status=404)
     except Exception as e:
         logger.error(f"세션 삭제 중 오류 발생: {e}")
         return JsonResponse({'error': '세션 삭제 중 오류가 발생했습니다.'}, status=500)
 
+    # 실패해도 세션 삭제는 완료된 것으로 응답 (남은 대화 기억은 AI 서버의 TTL 정리로 삭제됨)
+    try:
+        await ai_client.delete_history(str(session_id))
+    except (ai_client.AIServerError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"AI 서버 대화 기억 삭제 실패: {e}")
+    return JsonResponse({'status': 'deleted', 'session_id': str(session_id)})
+
+
+def _sse_event(payload) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _cached_answer_stream(answer: dict):
+    """캐시된 답변을 AI 서버 스트림과 같은 형식(token → summary → [DONE])으로 보냅니다."""
+    yield _sse_event({'type': 'token', 'content': answer['response']})
+    yield _sse_event({'type': 'summary', **answer, 'ok': True})
+    yield "data: [DONE]\n\n"
+
+
+class _QueuedStream:
+    """
+    대기열 자리를 잡아 둔 스트리밍 응답 본문
+
+    처리 차례가 될 때까지 대기 순번(queued) 이벤트를 보낸 뒤 stream을 이어서 전달합니다.
+    스트림이 끝나거나 브라우저 연결이 끊기면 자리를 반납하고, 본문을 읽기 전에 응답이 닫혀도
+    (Django가 응답을 닫을 때 close() 호출) 반납합니다.
+    Waiter는 이벤트 루프에 묶이지 않으므로 WSGI에서 본문을 다른 async_to_sync 루프로 읽어도 됩니다.
+    """
+
+    def __init__(self, waiter: admission.Waiter, stream):
+        self._waiter = waiter
+        self._stream = stream
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        waiter = self._waiter
+        try:
+            last_position = None
+            while not waiter.admitted:
+                position = waiter.position
+                if position and position != last_position:
+                    last_position = position
+                    yield _sse_event({'type': 'queued', 'position': position})
+                await waiter.wait(QUEUE_POSITION_INTERVAL)
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            await self._stream.aclose()
+            waiter.release()
+
+    def close(self):
+        self._waiter.release()
+
+    # 응답이 닫히지 않고 버려진 경우 (ASGI에서 본문 전송 전에 요청 태스크가 취소됨)
+    __del__ = close
+
+
+async def _proxy_ai_stream(session: ChatSession, content: str, message_pk: int, cache_answer: bool = False):
+    """
+    AI 서버의 SSE 응답을 바이트 그대로 브라우저에 전달하는 비동기 제너레이터
+
+    - 토큰마다 JSON을 파싱하지 않고, 마지막 요약(summary) 이벤트만 찾아
+      미리 저장해 둔 메시지(message_pk)에 한 번의 UPDATE로 저장
+    - cache_answer가 True이면 (세션의 첫 질문) 오류 없이 끝난(요약 이벤트의 ok) 최종 답변만 답변 캐시에 저장
+    - 브라우저가 다음 청크를 받아 갈 때만 업스트림에서 읽으므로 자연스럽게 백프레셔가 걸림
+    - 브라우저 연결이 끊기면 (제너레이터 취소/종료) async with를 벗어나며 업스트림 연결도 닫힘
+    """
+    scanner = ai_client.SummaryScanner()
+    start_time = time.time()
+    try:
+        async with ai_client.stream(str(session.session_id), content) as upstream:
+            if upstream.status != 200:
+                yield _sse_event({'type': 'error', 'content': f'AI Server Error: {upstream.status}'})
+                return
+
+            async for chunk in upstream.content.iter_any():
+                scanner.feed(chunk)
+                yield chunk
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"AI 서버 스트리밍 실패: {e}")
+        yield _sse_event({'type': 'error', 'content': str(e)})
+        return
+
+    # 5. 스트리밍 완료 후 AI 답변 DB 저장 (Update)
+    summary = scanner.result()
+    if summary is None:
+        logger.error("AI 서버 스트림에 요약 이벤트가 없어 답변을 저장하지 않습니다.")
+        return
+    try:
+        await ChatMessage.objects.filter(pk=message_pk).aupdate(
+            ai_response=summary.get('response', ""),
+            thinking=summary.get('thinking', ""),
+            response_time=int((time.time() - start_time) * 1000),
+        )
+    except Exception as e:
+        logger.error(f"DB Update Failed: {e}")
+
+    # 생성 중 오류가 난 답변(중간에 끊긴 답변)은 같은 질문을 하는 모든 사용자에게 가지 않도록 캐시하지 않음
+    if cache_answer and summary.get('ok'):
+        answer_cache.put(content, summary.get('response', ""), summary.get('thinking', ""))
+
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def stream_message_view(request: HttpRequest, session_id: str) -> StreamingHttpResponse:
+async def stream_message_view(request: HttpRequest, session_id: str) -> StreamingHttpResponse:
     """
     세션에 메시지를 전송하고 AI 서버로부터 스트리밍 응답을 받습니다.
     POST /api/chat/sessions/<session_id>/stream/
+
+    ASGI 서버에서 실행하면 스트리밍 동안 워커 스레드를 점유하지 않습니다.
+    (WSGI에서는 Django가 비동기 스트림을 모두 모은 뒤 한 번에 전송합니다.)
     """
     try:
         # 1. 요청 데이터 파싱
@@ -269,70 +580,44 @@ def stream_message_view(request: HttpRequest, session_id: str) -> StreamingHttpR
                 s_uuid = uuid.UUID(session_id)
             else:
                 s_uuid = session_id
-            session = ChatSession.objects.get(session_id=s_uuid)
+            session = await ChatSession.objects.aget(session_id=s_uuid)
         except (ValueError, ChatSession.DoesNotExist):
              return JsonResponse({'error': 'Invalid session ID or Session not found'}, status=404)
 
-        # 3. 사용자 메시지 DB 저장 (우선 저장)
-        ChatMessage.objects.create(
-            session_id=session,
-            user_message=content,
-            ai_response="", # 나중에 채움
-        )
-
-        # 4. AI 서버 스트리밍 요청
-        def event_stream():
-            ai_accumulated_text = []
-            ai_server_stream_url = "http://127.0.0.1:8001/stream"
-            
-            payload = {
-                "session_id": str(session.session_id),
-                "message": content
-            }
+        # 세션의 첫 질문이면 답변 캐시 확인 (캐시 적중 시 AI 서버를 거치지 않음)
+        first_turn = session.message_count == 0
+        cached = answer_cache.get(content) if first_turn else None
 
+        if cached:
+            await asave_chat_message(
+                session, content, ai_response=cached['response'], thinking=cached['thinking'], response_time=0
+            )
+            ai_client.run_in_background(_append_ai_history(session, content, cached['response']))
+            stream = _cached_answer_stream(cached)
+        else:
+            # AI 서버 동시 요청 수 제한 (대기열이 가득 차면 메시지를 저장하지 않고 429)
             try:
-                with requests.post(ai_server_stream_url, json=payload, stream=True, timeout=60) as r:
-                    if r.status_code != 200:
-                        yield f"data: {json.dumps({'type': 'error', 'content': f'AI Server Error: {r.status_code}'})}\n\n"
-                        return
-
-                    # 청크 단위로 읽어서 클라이언트에 전달 & 누적
-                    for line in r.iter_lines():
-                        if line:
-                            decoded_line = line.decode('utf-8')
-                            yield decoded_line + "\n\n"
-                            
-                            # SSE 데이터 파싱하여 텍스트 누적
-                            if decoded_line.startswith("data: "):
-                                try:
-                                    json_str = decoded_line[6:] # "data: " 제거
-                                    if json_str.strip() == "[DONE]":
-                                        continue
-                                        
-                                    chunk_data = json.loads(json_str)
-                                    if chunk_data.get("type") == "token":
-                                        ai_accumulated_text.append(chunk_data.get("content", ""))
-                                except Exception:
-                                    pass
-                                    
-            except Exception as e:
-                yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
-            
-            # 5. 스트리밍 완료 후 AI 답변 DB 저장 (Update)
-            final_text = "".join(ai_accumulated_text)
-            # 가장 최근 메시지(방금 user가 보낸 것)를 찾아서 업뎃하거나, 새로 만들지 않고...
-            # 방금 위에서 user msg만 만들고 ai_response=""로 뒀음.
-            # 정확히 그 메시지를 잡아야 함.
-            try:
-                last_msg = ChatMessage.objects.filter(session_id=session).order_by('-created_at').first()
-                if last_msg:
-                    last_msg.ai_response = final_text
-                    last_msg.save()
-            except Exception as e:
-                logger.error(f"DB Update Failed: {e}")
+                waiter = admission.get_controller().enqueue(_admission_key(session))
+            except admission.QueueFull:
+                return _queue_full_response()
 
-        return StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+            try:
+                # 3. 사용자 메시지 DB 저장 (우선 저장) + 세션 요약 컬럼 갱신
+                placeholder = await asave_chat_message(session, content, ai_response="") # ai_response는 나중에 채움
+            except BaseException:
+                waiter.release()
+                raise
+
+            # 4. 차례가 오면 AI 서버 스트리밍 프록시 (완료 후 placeholder 행에 답변 저장)
+            stream = _QueuedStream(
+                waiter, _proxy_ai_stream(session, content, placeholder.pk, cache_answer=first_turn)
+            )
+
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx 등 리버스 프록시의 응답 버퍼링 비활성화
+        return response
 
     except Exception as e:
         logger.error(f"스트리밍 처리 중 오류: {e}")
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
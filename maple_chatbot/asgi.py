@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "maple_chatbot.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Django 설정이 끝난 뒤에 불러와야 함
+from mai_chat import ai_client  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Django는 lifespan 이벤트를 처리하지 않으므로 여기서 AI 서버 커넥션 풀을 열고 닫음
+    if scope["type"] == "lifespan":
+        await ai_client.lifespan(scope, receive, send)
+        return
+    await django_application(scope, receive, send)
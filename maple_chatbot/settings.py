@@ -124,6 +124,31 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 NEXON_API_KEY = config('NEXON_API_KEY', default='')
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 
+# Background data refresher (python manage.py refresh_data)
+# 데이터셋별 갱신 주기(초)와 주기에 더할 무작위 편차 비율
+DATA_REFRESH_INTERVALS = {
+    'notices': config('REFRESH_NOTICES_INTERVAL', default=1800, cast=int),
+    'rankings': config('REFRESH_RANKINGS_INTERVAL', default=3600, cast=int),
+    'carousel': config('REFRESH_CAROUSEL_INTERVAL', default=1800, cast=int),
+}
+DATA_REFRESH_JITTER = config('REFRESH_JITTER', default=0.1, cast=float)
+
+# AI server (FastAPI) connection
+# 주소, 워커당 최대 동시 연결 수, 응답 대기 시간(초)
+AI_SERVER_URL = config('AI_SERVER_URL', default='http://127.0.0.1:8001')
+AI_SERVER_MAX_CONNECTIONS = config('AI_SERVER_MAX_CONNECTIONS', default=500, cast=int)
+AI_SERVER_TIMEOUT = config('AI_SERVER_TIMEOUT', default=1200, cast=int)
+
+# Chat answer cache (정확히 일치하는 첫 질문의 답변 재사용)
+ANSWER_CACHE_ENABLED = config('ANSWER_CACHE_ENABLED', default=True, cast=bool)
+ANSWER_CACHE_TTL = config('ANSWER_CACHE_TTL', default=600, cast=int)
+ANSWER_CACHE_MAX_SIZE = config('ANSWER_CACHE_MAX_SIZE', default=1000, cast=int)
+
+# Chat admission control (워커 프로세스당 AI 서버 동시 요청 수와 대기열 크기)
+CHAT_MAX_CONCURRENCY = config('CHAT_MAX_CONCURRENCY', default=8, cast=int)
+CHAT_QUEUE_MAX = config('CHAT_QUEUE_MAX', default=100, cast=int)
+CHAT_QUEUE_MAX_PER_USER = config('CHAT_QUEUE_MAX_PER_USER', default=3, cast=int)
+
 # Ads settings
 ADS_ENABLED = config('ADS_ENABLED', default=False, cast=bool)
 ADS_PROVIDER = config('ADS_PROVIDER', default='mock')